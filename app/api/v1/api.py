@@ -1,12 +1,28 @@
-from fastapi import APIRouter
-from app.api.v1.endpoints import auth, pacientes, consultas, especialidades, profissionais, disponibilidade
+from fastapi import APIRouter, Depends
+from app.core.config import settings
+from app.security.core import get_current_user
+
+# O caminho assíncrono (pool async + endpoints 'async def') é escolhido por configuração,
+# para que os dois possam ser comparados sob a mesma carga
+if settings.DB_ASYNC:
+    from app.api.v1.endpoints.aio import auth, pacientes, consultas, especialidades, profissionais, disponibilidade
+else:
+    from app.api.v1.endpoints import auth, pacientes, consultas, especialidades, profissionais, disponibilidade
+from app.api.v1.endpoints import referencias, health
 
 api_router = APIRouter()
 
 # Inclui os roteadores dos endpoints
 api_router.include_router(auth.router, prefix="/auth", tags=["Autenticação"])
-api_router.include_router(pacientes.router, prefix="/pacientes", tags=["Pacientes"])
-api_router.include_router(consultas.router, prefix="/consultas", tags=["Consultas"])
+# Pacientes e consultas exigem um token válido (Authorization: Bearer)
+api_router.include_router(
+    pacientes.router, prefix="/pacientes", tags=["Pacientes"], dependencies=[Depends(get_current_user)]
+)
+api_router.include_router(
+    consultas.router, prefix="/consultas", tags=["Consultas"], dependencies=[Depends(get_current_user)]
+)
 api_router.include_router(especialidades.router, prefix="/especialidades", tags=["Especialidades"])
 api_router.include_router(profissionais.router, prefix="/profissionais", tags=["Profissionais"])
-api_router.include_router(disponibilidade.router, prefix="/especialidades", tags=["Disponibilidade"])
\ No newline at end of file
+api_router.include_router(disponibilidade.router, prefix="/especialidades", tags=["Disponibilidade"])
+api_router.include_router(referencias.router, prefix="/referencias", tags=["Referências"])
+api_router.include_router(health.router, prefix="/health", tags=["Saúde"])
@@ -0,0 +1,136 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from app.db.database import get_async_read_connection, get_async_write_connection
+from app.schemas.consulta import ConsultaRead, ConsultaCreate, ConsultaStatusUpdate, ConsultaDetalhada, ConsultaBulkResponse
+from app.schemas.msg import Msg
+from app.schemas.pagination import Page
+from app.core.config import settings
+from app.core.pagination import decode_cursor, build_page
+from app.core.responses import RecordsJSONResponse
+from app.crud.aio import crud_consulta
+from app.api.v1.endpoints import consultas as consultas_sync
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from datetime import date
+import oracledb
+
+router = APIRouter()
+
+@router.get("", response_model=Page[ConsultaRead])
+async def read_consultas(
+    conn: oracledb.AsyncConnection = Depends(get_async_read_connection),
+    limit: int = Query(settings.PAGINATION_DEFAULT_LIMIT, ge=1, le=settings.PAGINATION_MAX_LIMIT, description="Itens por página"),
+    cursor: Optional[str] = Query(None, description="Token 'next_cursor' da página anterior"),
+    id_profissional: Optional[int] = Query(None, description="Filtra pelo profissional"),
+    id_status: Optional[int] = Query(None, description="Filtra pelo status da consulta"),
+    data_inicio: Optional[date] = Query(None, description="Consultas a partir desta data (YYYY-MM-DD)"),
+    data_fim: Optional[date] = Query(None, description="Consultas até esta data, inclusiva (YYYY-MM-DD)"),
+    todos: bool = Query(False, description="Retorna a listagem completa, sem paginação")
+):
+    """
+    Lista as consultas em ordem de ID, paginadas por cursor e com filtros aplicados no banco.
+    """
+    try:
+        after_id = decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    page_limit = None if todos else limit
+    try:
+        consultas_db = await crud_consulta.get_page(
+            conn, after_id, None if todos else limit + 1,
+            id_profissional=id_profissional,
+            id_status=id_status,
+            data_inicio=data_inicio,
+            data_fim=data_fim
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=f"Erro no acesso ao banco de dados: {e}")
+    return RecordsJSONResponse(build_page(consultas_db, page_limit, "id_consulta"))
+
+# A exportação usa o pool síncrono: a conexão (e a vaga da admissão) é
+# adquirida antes do streaming começar e liberada quando ele termina
+router.add_api_route(
+    "/export",
+    consultas_sync.export_consultas,
+    methods=["GET"],
+    response_class=StreamingResponse,
+    summary="Exporta consultas (NDJSON ou CSV)",
+)
+
+@router.get("/paciente/{paciente_id}", response_model=List[ConsultaDetalhada])
+async def read_consultas_por_paciente(
+    paciente_id: int,
+    conn: oracledb.AsyncConnection = Depends(get_async_read_connection)
+):
+    """
+    Lista todas as consultas de um paciente específico.
+    """
+    consultas_db = await crud_consulta.get_by_paciente_id(conn, paciente_id)
+
+    if not consultas_db:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Nenhuma consulta encontrada para o paciente ID {paciente_id}"
+        )
+
+    return RecordsJSONResponse(consultas_db)
+
+@router.post("/", response_model=ConsultaRead, status_code=201)
+async def create_consulta(
+    consulta_in: ConsultaCreate,
+    conn: oracledb.AsyncConnection = Depends(get_async_write_connection)
+):
+    """
+    Agenda uma nova consulta e retorna a linha gravada no banco.
+    """
+    try:
+        consulta_db = await crud_consulta.create(conn, consulta_in)
+
+    except oracledb.IntegrityError as e:
+        error_obj, = e.args
+        error_code = error_obj.code
+        if error_code == 1:  # Unique constraint violation
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Já existe uma consulta agendada para este horário"
+            )
+        elif error_code == 2291:  # Foreign key violation
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Paciente ou profissional não encontrado"
+            )
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Erro de integridade no banco: {error_obj.message}"
+            )
+
+    if not consulta_db:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erro interno ao agendar consulta"
+        )
+
+    return consulta_db
+
+# O agendamento em lote usa executemany no pool síncrono
+router.add_api_route(
+    "/bulk",
+    consultas_sync.create_consultas_bulk,
+    methods=["POST"],
+    response_model=ConsultaBulkResponse,
+)
+
+@router.put("/status", response_model=Msg)
+async def update_consulta_status(
+    consulta_id: int,
+    status_update: ConsultaStatusUpdate,
+    conn: oracledb.AsyncConnection = Depends(get_async_write_connection)
+):
+    """
+    Atualiza o status de uma consulta.
+    """
+    success = await crud_consulta.update_status(conn, consulta_id, status_update.id_status)
+    if not success:
+        raise HTTPException(status_code=404, detail="Consulta não encontrada ou falha ao atualizar")
+    return {"detail": "Status da consulta atualizado com sucesso"}
@@ -0,0 +1,126 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.db.database import get_async_read_connection
+from app.crud.aio import crud_disponibilidade
+from app.api.v1.endpoints.disponibilidade import (
+    _validar_parametros, _validar_intervalo, _gerar_relatorio, _gerar_ndjson,
+    _inicio_da_busca, _sem_horarios_livres, get_disponibilidade_cache_stats
+)
+from app.core.config import settings
+from app.schemas.disponibilidade import ProximosHorarios
+import oracledb
+from datetime import date, datetime
+from typing import Optional, Dict, Any
+
+router = APIRouter()
+
+@router.get(
+    "/disponibilidade",
+    response_model=Dict[str, Any],
+    summary="Verifica disponibilidade por especialidade e data",
+)
+async def get_disponibilidade(
+    especialidade: int = Query(..., alias="especialidade", description="ID da especialidade médica"),
+    data: Optional[date] = Query(None, description="Data para buscar disponibilidade (YYYY-MM-DD)")
+):
+    data = data if data is not None else date.today()
+
+    try:
+        _validar_parametros(data, especialidade)
+
+        disponibilidade_dia = await crud_disponibilidade.get_disponibilidade_do_dia_compartilhada(data, especialidade)
+
+        if not any(h.has_disponibilidade for h in disponibilidade_dia.horarios):
+            raise HTTPException(
+                status_code=404,
+                detail="Nenhuma disponibilidade encontrada para os parâmetros informados"
+            )
+
+        return {
+            "disponibilidade": disponibilidade_dia,
+            "relatorio": _gerar_relatorio(disponibilidade_dia)
+        }
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=f"Erro no acesso ao banco de dados: {e}")
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Erro inesperado no endpoint de disponibilidade: {e}")
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+
+@router.get(
+    "/disponibilidade/intervalo",
+    summary="Verifica disponibilidade por especialidade em um intervalo de datas (NDJSON)",
+    response_class=StreamingResponse,
+)
+async def get_disponibilidade_intervalo(
+    conn: oracledb.AsyncConnection = Depends(get_async_read_connection),
+    especialidade: int = Query(..., alias="especialidade", description="ID da especialidade médica"),
+    data_inicio: date = Query(..., description="Data inicial do intervalo (YYYY-MM-DD)"),
+    data_fim: date = Query(..., description="Data final do intervalo, inclusiva (YYYY-MM-DD)")
+):
+    """
+    Retorna um dia por linha (NDJSON), no mesmo formato de /disponibilidade.
+    """
+    try:
+        _validar_intervalo(data_inicio, data_fim, especialidade)
+
+        dias = await crud_disponibilidade.get_disponibilidade_intervalo(conn, data_inicio, data_fim, especialidade)
+
+        return StreamingResponse(_gerar_ndjson(dias), media_type="application/x-ndjson")
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=f"Erro no acesso ao banco de dados: {e}")
+    except Exception as e:
+        print(f"❌ Erro inesperado no endpoint de disponibilidade por intervalo: {e}")
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+
+@router.get(
+    "/disponibilidade/proximos",
+    response_model=ProximosHorarios,
+    summary="Próximos horários livres de uma especialidade",
+)
+async def get_proximos_horarios(
+    conn: oracledb.AsyncConnection = Depends(get_async_read_connection),
+    especialidade: int = Query(..., alias="especialidade", description="ID da especialidade médica"),
+    a_partir_de: Optional[datetime] = Query(None, description="Início da busca; padrão e mínimo: agora"),
+    quantidade: int = Query(
+        5, ge=1, le=settings.DISPONIBILIDADE_BUSCA_MAX_RESULTADOS,
+        description="Quantidade de pares (profissional, horário) a retornar"
+    )
+):
+    """
+    Primeiros horários livres com qualquer profissional da especialidade, em ordem de horário.
+    """
+    try:
+        inicio = _inicio_da_busca(a_partir_de)
+        _validar_parametros(inicio.date(), especialidade)
+
+        proximos = await crud_disponibilidade.get_proximos_horarios(conn, especialidade, inicio, quantidade)
+        if not proximos.horarios:
+            raise _sem_horarios_livres()
+        return proximos
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=f"Erro no acesso ao banco de dados: {e}")
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Erro inesperado na busca de próximos horários: {e}")
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+
+# Estatísticas do cache não acessam o banco: reaproveita o endpoint síncrono
+router.add_api_route(
+    "/disponibilidade/cache",
+    get_disponibilidade_cache_stats,
+    methods=["GET"],
+    response_model=Dict[str, Any],
+    summary="Estatísticas do cache de disponibilidade",
+)
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends
+from app.db.database import get_async_read_connection
+from app.schemas.especialidade import EspecialidadeRead
+from app.crud.aio import crud_especialidade
+from typing import List
+from app.core.responses import RecordsJSONResponse
+import oracledb
+
+router = APIRouter()
+
+@router.get("", response_model=List[EspecialidadeRead], summary="Lista todas as especialidades médicas")
+async def read_especialidades(conn: oracledb.AsyncConnection = Depends(get_async_read_connection)):
+    """
+    Lista todas as especialidades médicas.
+    """
+    return RecordsJSONResponse(await crud_especialidade.get_all(conn))
@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.db.database import get_async_read_connection, get_async_write_connection
+from app.schemas.paciente import PacienteRead, PacienteUpdate
+from app.schemas.msg import Msg
+from app.schemas.pagination import Page
+from app.core.config import settings
+from app.core.pagination import decode_cursor, build_page
+from app.core.responses import RecordsJSONResponse
+from app.crud.aio import crud_paciente
+from app.api.v1.endpoints import pacientes as pacientes_sync
+from fastapi.responses import StreamingResponse
+from typing import Optional
+import oracledb
+
+router = APIRouter()
+
+@router.get("", response_model=Page[PacienteRead])
+async def read_pacientes(
+    conn: oracledb.AsyncConnection = Depends(get_async_read_connection),
+    limit: int = Query(settings.PAGINATION_DEFAULT_LIMIT, ge=1, le=settings.PAGINATION_MAX_LIMIT, description="Itens por página"),
+    cursor: Optional[str] = Query(None, description="Token 'next_cursor' da página anterior"),
+    todos: bool = Query(False, description="Retorna a listagem completa, sem paginação")
+):
+    """
+    Lista os pacientes em ordem de ID, paginados por cursor.
+    """
+    try:
+        after_id = decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    page_limit = None if todos else limit
+    try:
+        pacientes_db = await crud_paciente.get_page(conn, after_id, None if todos else limit + 1)
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=f"Erro no acesso ao banco de dados: {e}")
+    return RecordsJSONResponse(build_page(pacientes_db, page_limit, "id_paciente"))
+
+# A exportação usa o pool síncrono: a conexão (e a vaga da admissão) é
+# adquirida antes do streaming começar e liberada quando ele termina;
+# declarada antes de /{paciente_id} para não ser capturada por ele
+router.add_api_route(
+    "/export",
+    pacientes_sync.export_pacientes,
+    methods=["GET"],
+    response_class=StreamingResponse,
+    summary="Exporta todos os pacientes (NDJSON ou CSV)",
+)
+
+@router.get("/{paciente_id}", response_model=PacienteRead)
+async def read_paciente(
+    paciente_id: int,
+    conn: oracledb.AsyncConnection = Depends(get_async_write_connection)
+):
+    """
+    Obtém um paciente por ID.
+    """
+    paciente_db = await crud_paciente.get_by_id(conn, paciente_id)
+    if not paciente_db:
+        raise HTTPException(status_code=404, detail="Paciente não encontrado")
+    return paciente_db
+
+@router.put("/{paciente_id}", response_model=Msg)
+async def update_paciente_info(
+    paciente_id: int,
+    paciente_in: PacienteUpdate,
+    conn: oracledb.AsyncConnection = Depends(get_async_write_connection)
+):
+    """
+    Atualiza informações do paciente (nome, email, telefone).
+    """
+    success = await crud_paciente.update(conn, paciente_id, paciente_in)
+    if not success:
+        raise HTTPException(status_code=500, detail="Erro ao atualizar paciente")
+    return {"detail": "Paciente atualizado com sucesso"}
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends
+from app.db.database import get_async_read_connection
+from app.schemas.profissional import ProfissionalRead
+from app.crud.aio import crud_profissional
+from typing import List
+from app.core.responses import RecordsJSONResponse
+import oracledb
+
+router = APIRouter()
+
+@router.get("", response_model=List[ProfissionalRead])
+async def read_profissionais(conn: oracledb.AsyncConnection = Depends(get_async_read_connection)):
+    """
+    Lista todos os profissionais de saúde.
+    """
+    return RecordsJSONResponse(await crud_profissional.get_all(conn))
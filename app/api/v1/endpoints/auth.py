@@ -1,25 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from app.db.database import get_db_connection
+from app.db.database import get_write_connection
 from app.schemas.token import Token
-from app.schemas.paciente import PacienteCreate
+from app.schemas.paciente import PacienteCreate, PacienteBulkResponse
+from app.core.config import settings
 from app.schemas.msg import Msg
 from app.security.core import create_access_token, verify_password_simple 
 from app.crud import crud_user, crud_paciente
-from typing import Any
+from typing import Any, List
 import oracledb
 
 router = APIRouter()
 
 @router.post("/login", response_model=Token)
 def login_for_access_token(
-    conn: oracledb.Connection = Depends(get_db_connection),
+    conn: oracledb.Connection = Depends(get_write_connection),
     form_data: OAuth2PasswordRequestForm = Depends()
 ):
     """
     Autenticação de usuário (paciente ou colaborador).
     """
-    user = crud_user.get_user_from_db(conn, form_data.username)
+    user = crud_user.get_user_cached(conn, form_data.username)
     
     # !! MUDANÇA AQUI !!
     # Usa a verificação simples de string e a chave 'db_password'
@@ -38,7 +39,7 @@ def login_for_access_token(
 @router.post("/pacientes/register", response_model=Msg, status_code=201)
 def register_paciente(
     paciente_in: PacienteCreate,
-    conn: oracledb.Connection = Depends(get_db_connection)
+    conn: oracledb.Connection = Depends(get_write_connection)
 ):
     """
     Registro de um novo paciente.
@@ -68,4 +69,33 @@ def register_paciente(
     raise HTTPException(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         detail="Não foi possível criar o paciente."
-    )
\ No newline at end of file
+    )
+
+@router.post("/pacientes/register/bulk", response_model=PacienteBulkResponse)
+def register_pacientes_bulk(
+    pacientes_in: List[PacienteCreate],
+    conn: oracledb.Connection = Depends(get_write_connection)
+):
+    """
+    Registro de pacientes em lote (ex.: integração de uma clínica parceira).
+    Cada item é reportado individualmente; CPF ou e-mail duplicado não
+    interrompe o restante do lote.
+    """
+    if not pacientes_in:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Envie ao menos um paciente."
+        )
+    if len(pacientes_in) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"No máximo {settings.BULK_MAX_ITEMS} pacientes por requisição."
+        )
+
+    resultados = crud_paciente.create_many(conn, pacientes_in)
+    return {
+        "criados": sum(1 for r in resultados if r["status"] == "criado"),
+        "conflitos": sum(1 for r in resultados if r["status"] == "conflito"),
+        "erros": sum(1 for r in resultados if r["status"] == "erro"),
+        "resultados": resultados
+    }
\ No newline at end of file
@@ -1,25 +1,79 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from app.db.database import get_db_connection
-from app.schemas.consulta import ConsultaRead, ConsultaCreate, ConsultaStatusUpdate, ConsultaDetalhada
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from app.db.database import get_read_connection, get_write_connection
+from app.schemas.consulta import ConsultaRead, ConsultaCreate, ConsultaStatusUpdate, ConsultaDetalhada, ConsultaBulkResponse
 from app.schemas.msg import Msg
-from app.crud import crud_consulta
-from typing import List
+from app.schemas.pagination import Page
+from app.core.config import settings
+from app.core.pagination import decode_cursor, build_page
+from app.core.responses import RecordsJSONResponse
+from app.crud import crud_consulta, crud_export
+from fastapi.responses import StreamingResponse
+from typing import List, Literal, Optional
+from datetime import date
 import oracledb
 
 router = APIRouter()
 
-@router.get("", response_model=List[ConsultaRead])
-def read_consultas(conn: oracledb.Connection = Depends(get_db_connection)):
+@router.get("", response_model=Page[ConsultaRead])
+def read_consultas(
+    conn: oracledb.Connection = Depends(get_read_connection),
+    limit: int = Query(settings.PAGINATION_DEFAULT_LIMIT, ge=1, le=settings.PAGINATION_MAX_LIMIT, description="Itens por página"),
+    cursor: Optional[str] = Query(None, description="Token 'next_cursor' da página anterior"),
+    id_profissional: Optional[int] = Query(None, description="Filtra pelo profissional"),
+    id_status: Optional[int] = Query(None, description="Filtra pelo status da consulta"),
+    data_inicio: Optional[date] = Query(None, description="Consultas a partir desta data (YYYY-MM-DD)"),
+    data_fim: Optional[date] = Query(None, description="Consultas até esta data, inclusiva (YYYY-MM-DD)"),
+    todos: bool = Query(False, description="Retorna a listagem completa, sem paginação")
+):
     """
-    Lista todas as consultas.
+    Lista as consultas em ordem de ID, paginadas por cursor e com filtros aplicados no banco.
     """
-    consultas_db = crud_consulta.get_all(conn)
-    return consultas_db
+    try:
+        after_id = decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    page_limit = None if todos else limit
+    try:
+        consultas_db = crud_consulta.get_page(
+            conn, after_id, None if todos else limit + 1,
+            id_profissional=id_profissional,
+            id_status=id_status,
+            data_inicio=data_inicio,
+            data_fim=data_fim
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=f"Erro no acesso ao banco de dados: {e}")
+    return RecordsJSONResponse(build_page(consultas_db, page_limit, "id_consulta"))
+
+@router.get("/export", response_class=StreamingResponse, summary="Exporta consultas (NDJSON ou CSV)")
+def export_consultas(
+    conn: oracledb.Connection = Depends(get_read_connection),
+    formato: Literal["ndjson", "csv"] = Query("ndjson", description="Formato de saída"),
+    id_profissional: Optional[int] = Query(None, description="Filtra pelo profissional"),
+    id_status: Optional[int] = Query(None, description="Filtra pelo status da consulta"),
+    data_inicio: Optional[date] = Query(None, description="Consultas a partir desta data (YYYY-MM-DD)"),
+    data_fim: Optional[date] = Query(None, description="Consultas até esta data, inclusiva (YYYY-MM-DD)")
+):
+    """
+    Exporta as consultas em streaming, lendo o cursor em lotes.
+    A memória usada não cresce com o número de linhas.
+    """
+    try:
+        linhas = crud_export.export_consultas(conn, formato, id_profissional, id_status, data_inicio, data_fim)
+    except oracledb.DatabaseError as e:
+        print(f"❌ Erro ao exportar consultas: {e}")
+        raise HTTPException(status_code=500, detail="Erro no acesso ao banco de dados")
+    return StreamingResponse(
+        linhas,
+        media_type=crud_export.FORMATOS[formato],
+        headers={"Content-Disposition": f"attachment; filename=consultas.{formato}"}
+    )
 
 @router.get("/paciente/{paciente_id}", response_model=List[ConsultaDetalhada])
 def read_consultas_por_paciente(
     paciente_id: int,
-    conn: oracledb.Connection = Depends(get_db_connection)
+    conn: oracledb.Connection = Depends(get_read_connection)
 ):
     """
     Lista todas as consultas de um paciente específico.
@@ -32,35 +86,18 @@ def read_consultas_por_paciente(
             detail=f"Nenhuma consulta encontrada para o paciente ID {paciente_id}"
         )
     
-    return consultas_db
+    return RecordsJSONResponse(consultas_db)
 
 @router.post("/", response_model=ConsultaRead, status_code=201)
 def create_consulta(
     consulta_in: ConsultaCreate,
-    conn: oracledb.Connection = Depends(get_db_connection)
+    conn: oracledb.Connection = Depends(get_write_connection)
 ):
     """
-    Agenda uma nova consulta.
+    Agenda uma nova consulta e retorna a linha gravada no banco.
     """
     try:
-        consulta_id = crud_consulta.create(conn, consulta_in)
-        if not consulta_id:
-            raise HTTPException(status_code=500, detail="Erro ao agendar consulta")
-        
-        return ConsultaRead(
-            id_consulta=consulta_id or 999,  # Placeholder
-            id_status=1,
-            **consulta_in.model_dump()
-        )
-
-    except Exception as e:
-        print(f"❌ Erro detalhado no endpoint: {str(e)}")
-        import traceback
-        print(f"🔍 Stack trace completo: {traceback.format_exc()}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erro interno ao agendar consulta: {str(e)}"
-        )
+        consulta_db = crud_consulta.create(conn, consulta_in)
 
     except oracledb.IntegrityError as e:
         error_obj, = e.args
@@ -80,21 +117,50 @@ def create_consulta(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Erro de integridade no banco: {error_obj.message}"
             )
-            
-    except Exception as e:
-        print(f"❌ Erro detalhado no endpoint: {str(e)}")
-        import traceback
-        print(f"🔍 Stack trace completo: {traceback.format_exc()}")
+
+    if not consulta_db:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erro interno ao agendar consulta: {str(e)}"
+            detail="Erro interno ao agendar consulta"
         )
 
+    return consulta_db
+
+@router.post("/bulk", response_model=ConsultaBulkResponse)
+def create_consultas_bulk(
+    consultas_in: List[ConsultaCreate],
+    conn: oracledb.Connection = Depends(get_write_connection)
+):
+    """
+    Agenda consultas em lote (ex.: campanhas de vacinação).
+    Cada item é reportado individualmente; um horário já ocupado ou um
+    paciente/profissional inexistente não interrompe o restante do lote.
+    """
+    if not consultas_in:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Envie ao menos uma consulta."
+        )
+    if len(consultas_in) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"No máximo {settings.BULK_MAX_ITEMS} consultas por requisição."
+        )
+
+    resultados = crud_consulta.create_many(conn, consultas_in)
+    return {
+        "agendadas": sum(1 for r in resultados if r["status"] == "agendada"),
+        "conflitos": sum(1 for r in resultados if r["status"] == "conflito"),
+        "referencias_invalidas": sum(1 for r in resultados if r["status"] == "referencia_invalida"),
+        "erros": sum(1 for r in resultados if r["status"] == "erro"),
+        "resultados": resultados
+    }
+
 @router.put("/status", response_model=Msg)
 def update_consulta_status(
     consulta_id: int,
     status_update: ConsultaStatusUpdate,
-    conn: oracledb.Connection = Depends(get_db_connection)
+    conn: oracledb.Connection = Depends(get_write_connection)
 ):
     """
     Atualiza o status de uma consulta.
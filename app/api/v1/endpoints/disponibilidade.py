@@ -1,10 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from app.db.database import get_db_connection
-from app.schemas.disponibilidade import DisponibilidadeDia
+from fastapi.responses import StreamingResponse
+from app.core.config import settings
+from app.db.database import get_read_connection
+from app.schemas.disponibilidade import DisponibilidadeDia, ProximosHorarios
 from app.crud.crud_disponibilidade import crud_disponibilidade
 import oracledb
-from datetime import date
-from typing import Optional, Dict, Any
+import json
+from datetime import date, datetime
+from typing import Optional, Dict, Any, Iterator
 
 router = APIRouter()
 
@@ -16,6 +19,33 @@ def _validar_parametros(data: date, id_especialidade: int):
     if id_especialidade is None or id_especialidade <= 0:
         raise ValueError("ID da especialidade é obrigatório e deve ser maior que zero")
 
+def _validar_intervalo(data_inicio: date, data_fim: date, id_especialidade: int):
+    _validar_parametros(data_inicio, id_especialidade)
+    if data_fim is None:
+        raise ValueError("Data final não pode ser nula")
+    if data_fim < data_inicio:
+        raise ValueError("Data final não pode ser anterior à data inicial")
+    total_dias = (data_fim - data_inicio).days + 1
+    if total_dias > settings.DISPONIBILIDADE_MAX_DIAS_INTERVALO:
+        raise ValueError(
+            f"Intervalo não pode exceder {settings.DISPONIBILIDADE_MAX_DIAS_INTERVALO} dias"
+        )
+
+def _inicio_da_busca(a_partir_de: Optional[datetime]) -> datetime:
+    """Início da busca de próximos horários: nunca antes de agora, no horário local (como no banco)."""
+    agora = datetime.now()
+    if a_partir_de is None:
+        return agora
+    if a_partir_de.tzinfo is not None:
+        a_partir_de = a_partir_de.astimezone().replace(tzinfo=None)
+    return max(a_partir_de, agora)
+
+def _sem_horarios_livres() -> HTTPException:
+    return HTTPException(
+        status_code=404,
+        detail=f"Nenhum horário disponível nos próximos {settings.DISPONIBILIDADE_BUSCA_MAX_DIAS} dias"
+    )
+
 def _gerar_relatorio(disponibilidade: DisponibilidadeDia) -> str:
     if disponibilidade is None or not disponibilidade.horarios:
         return "Nenhuma disponibilidade encontrada"
@@ -39,7 +69,6 @@ def _gerar_relatorio(disponibilidade: DisponibilidadeDia) -> str:
     summary="Verifica disponibilidade por especialidade e data",
 )
 def get_disponibilidade(  # ✅ REMOVIDO 'async' - função síncrona
-    conn: oracledb.Connection = Depends(get_db_connection),
     especialidade: int = Query(..., alias="especialidade", description="ID da especialidade médica"),
     data: Optional[date] = Query(None, description="Data para buscar disponibilidade (YYYY-MM-DD)")
 ):
@@ -48,27 +77,12 @@ def get_disponibilidade(  # ✅ REMOVIDO 'async' - função síncrona
     try:
         _validar_parametros(data, especialidade)
         
-        nome_especialidade = crud_disponibilidade.find_nome_especialidade_by_id(conn, especialidade)
-        disponibilidade_dia = DisponibilidadeDia(
-            data=data, 
-            id_especialidade=especialidade, 
-            nome_especialidade=nome_especialidade
-        )
+        # Profissionais e consultas ocupadas são buscados uma única vez;
+        # a grade de horários é montada em memória. Requests simultâneos pela
+        # mesma especialidade e data compartilham o cálculo e uma só conexão
+        disponibilidade_dia = crud_disponibilidade.get_disponibilidade_do_dia_compartilhada(data, especialidade)
+        horarios = disponibilidade_dia.horarios
 
-        # Gera horários usando o método da classe CRUD
-        horarios = crud_disponibilidade._gerar_horarios_do_dia(data)
-
-        # Busca disponibilidade para cada horário
-        for horario in horarios:
-            profissionais = crud_disponibilidade.find_profissionais_disponiveis_no_horario(
-                conn, 
-                horario.data_hora, 
-                especialidade
-            )
-            horario.profissionais_disponiveis.extend(profissionais)
-
-        disponibilidade_dia.horarios = horarios
-        
         # Verifica se há pelo menos um horário com disponibilidade
         if not any(h.has_disponibilidade for h in horarios):
              raise HTTPException(
@@ -93,4 +107,94 @@ def get_disponibilidade(  # ✅ REMOVIDO 'async' - função síncrona
         raise
     except Exception as e:
         print(f"❌ Erro inesperado no endpoint de disponibilidade: {e}")
-        raise HTTPException(status_code=500, detail="Erro interno do servidor")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+
+def _gerar_ndjson(dias: Iterator[DisponibilidadeDia]) -> Iterator[str]:
+    """Serializa cada dia como uma linha JSON assim que ele é montado."""
+    for disponibilidade_dia in dias:
+        linha = {
+            "disponibilidade": disponibilidade_dia.model_dump(mode="json"),
+            "relatorio": _gerar_relatorio(disponibilidade_dia)
+        }
+        yield json.dumps(linha, ensure_ascii=False) + "\n"
+
+@router.get(
+    "/disponibilidade/intervalo",
+    summary="Verifica disponibilidade por especialidade em um intervalo de datas (NDJSON)",
+    response_class=StreamingResponse,
+)
+def get_disponibilidade_intervalo(
+    conn: oracledb.Connection = Depends(get_read_connection),
+    especialidade: int = Query(..., alias="especialidade", description="ID da especialidade médica"),
+    data_inicio: date = Query(..., description="Data inicial do intervalo (YYYY-MM-DD)"),
+    data_fim: date = Query(..., description="Data final do intervalo, inclusiva (YYYY-MM-DD)")
+):
+    """
+    Retorna um dia por linha (NDJSON), no mesmo formato de /disponibilidade.
+    Todos os dias são calculados a partir de uma única varredura das consultas
+    do intervalo; os dias sem horários livres também são enviados.
+    """
+    try:
+        _validar_intervalo(data_inicio, data_fim, especialidade)
+
+        # As consultas ao banco rodam aqui; o streaming só monta e serializa os dias
+        dias = crud_disponibilidade.get_disponibilidade_intervalo(conn, data_inicio, data_fim, especialidade)
+
+        return StreamingResponse(_gerar_ndjson(dias), media_type="application/x-ndjson")
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=f"Erro no acesso ao banco de dados: {e}")
+    except Exception as e:
+        print(f"❌ Erro inesperado no endpoint de disponibilidade por intervalo: {e}")
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+
+@router.get(
+    "/disponibilidade/proximos",
+    response_model=ProximosHorarios,
+    summary="Próximos horários livres de uma especialidade",
+)
+def get_proximos_horarios(
+    conn: oracledb.Connection = Depends(get_read_connection),
+    especialidade: int = Query(..., alias="especialidade", description="ID da especialidade médica"),
+    a_partir_de: Optional[datetime] = Query(None, description="Início da busca; padrão e mínimo: agora"),
+    quantidade: int = Query(
+        5, ge=1, le=settings.DISPONIBILIDADE_BUSCA_MAX_RESULTADOS,
+        description="Quantidade de pares (profissional, horário) a retornar"
+    )
+):
+    """
+    Primeiros horários livres com qualquer profissional da especialidade, em
+    ordem de horário. Horários passados nunca são retornados e a busca para
+    após DISPONIBILIDADE_BUSCA_MAX_DIAS dias.
+    """
+    try:
+        inicio = _inicio_da_busca(a_partir_de)
+        _validar_parametros(inicio.date(), especialidade)
+
+        proximos = crud_disponibilidade.get_proximos_horarios(conn, especialidade, inicio, quantidade)
+        if not proximos.horarios:
+            raise _sem_horarios_livres()
+        return proximos
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=f"Erro no acesso ao banco de dados: {e}")
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Erro inesperado na busca de próximos horários: {e}")
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+
+@router.get(
+    "/disponibilidade/cache",
+    response_model=Dict[str, Any],
+    summary="Estatísticas do cache de disponibilidade",
+)
+def get_disponibilidade_cache_stats():
+    """
+    Contadores de acertos, falhas, expulsões (LRU) e invalidações do cache de disponibilidade.
+    """
+    return crud_disponibilidade.cache.stats()
\ No newline at end of file
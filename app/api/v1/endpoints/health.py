@@ -0,0 +1,20 @@
+from fastapi import APIRouter, HTTPException, status
+from app.db.database import pool_status
+from typing import Dict, Any
+
+router = APIRouter()
+
+@router.get("/db", response_model=Dict[str, Any], summary="Estado dos pools de conexões")
+def read_db_health():
+    """
+    Conexões ocupadas, abertas e máximas de cada pool (escrita e leitura), sua
+    configuração, quanto tempo os acquires estão esperando por uma conexão e as
+    filas do controle de admissão.
+    """
+    pool = pool_status()
+    if pool is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Pool de conexões não inicializado"
+        )
+    return pool
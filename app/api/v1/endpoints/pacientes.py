@@ -1,25 +1,65 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from app.db.database import get_db_connection
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from app.db.database import get_read_connection, get_write_connection
 from app.schemas.paciente import PacienteRead, PacienteCreate, PacienteUpdate
 from app.schemas.msg import Msg
-from app.crud import crud_paciente
-from typing import List
+from app.schemas.pagination import Page
+from app.core.config import settings
+from app.core.pagination import decode_cursor, build_page
+from app.core.responses import RecordsJSONResponse
+from app.crud import crud_paciente, crud_export
+from fastapi.responses import StreamingResponse
+from typing import Literal, Optional
 import oracledb
 
 router = APIRouter()
 
-@router.get("", response_model=List[PacienteRead])
-def read_pacientes(conn: oracledb.Connection = Depends(get_db_connection)):
+@router.get("", response_model=Page[PacienteRead])
+def read_pacientes(
+    conn: oracledb.Connection = Depends(get_read_connection),
+    limit: int = Query(settings.PAGINATION_DEFAULT_LIMIT, ge=1, le=settings.PAGINATION_MAX_LIMIT, description="Itens por página"),
+    cursor: Optional[str] = Query(None, description="Token 'next_cursor' da página anterior"),
+    todos: bool = Query(False, description="Retorna a listagem completa, sem paginação")
+):
+    """
+    Lista os pacientes em ordem de ID, paginados por cursor.
+    """
+    try:
+        after_id = decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    page_limit = None if todos else limit
+    try:
+        pacientes_db = crud_paciente.get_page(conn, after_id, None if todos else limit + 1)
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=f"Erro no acesso ao banco de dados: {e}")
+    return RecordsJSONResponse(build_page(pacientes_db, page_limit, "id_paciente"))
+
+# Declarado antes de /{paciente_id} para não ser capturado por ele
+@router.get("/export", response_class=StreamingResponse, summary="Exporta todos os pacientes (NDJSON ou CSV)")
+def export_pacientes(
+    conn: oracledb.Connection = Depends(get_read_connection),
+    formato: Literal["ndjson", "csv"] = Query("ndjson", description="Formato de saída")
+):
     """
-    Lista todos os pacientes.
+    Exporta todos os pacientes em streaming, lendo o cursor em lotes.
+    A memória usada não cresce com o número de linhas.
     """
-    pacientes_db = crud_paciente.get_all(conn)
-    return pacientes_db
+    try:
+        linhas = crud_export.export_pacientes(conn, formato)
+    except oracledb.DatabaseError as e:
+        print(f"❌ Erro ao exportar pacientes: {e}")
+        raise HTTPException(status_code=500, detail="Erro no acesso ao banco de dados")
+    return StreamingResponse(
+        linhas,
+        media_type=crud_export.FORMATOS[formato],
+        headers={"Content-Disposition": f"attachment; filename=pacientes.{formato}"}
+    )
 
 @router.get("/{paciente_id}", response_model=PacienteRead)
 def read_paciente(
     paciente_id: int,
-    conn: oracledb.Connection = Depends(get_db_connection)
+    conn: oracledb.Connection = Depends(get_write_connection)
 ):
     """
     Obtém um paciente por ID.
@@ -37,7 +77,7 @@ def read_paciente(
 def update_paciente_info(
     paciente_id: int,
     paciente_in: PacienteUpdate,
-    conn: oracledb.Connection = Depends(get_db_connection)
+    conn: oracledb.Connection = Depends(get_write_connection)
 ):
     """
     Atualiza informações do paciente (nome, email, telefone).
@@ -1,15 +1,16 @@
 from fastapi import APIRouter, Depends
-from app.db.database import get_db_connection
+from app.db.database import get_read_connection
 from app.schemas.profissional import ProfissionalRead
 from app.crud import crud_profissional
 from typing import List
+from app.core.responses import RecordsJSONResponse
 import oracledb
 
 router = APIRouter()
 
 @router.get("", response_model=List[ProfissionalRead])
-def read_profissionais(conn: oracledb.Connection = Depends(get_db_connection)):
+def read_profissionais(conn: oracledb.Connection = Depends(get_read_connection)):
     """
     Lista todos os profissionais de saúde.
     """
-    return crud_profissional.get_all(conn)
\ No newline at end of file
+    return RecordsJSONResponse(crud_profissional.get_all(conn))
\ No newline at end of file
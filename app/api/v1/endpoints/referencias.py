@@ -0,0 +1,39 @@
+from fastapi import APIRouter, HTTPException, status
+from app.schemas.status_consulta import StatusConsultaRead
+from app.crud.reference_cache import reference_cache
+from typing import List, Dict, Any
+
+router = APIRouter()
+
+@router.get("", response_model=Dict[str, Any], summary="Estado do cache de dados de referência")
+def read_referencias_stats():
+    """
+    Informa se os catálogos estão carregados, quando foram recarregados e quantos itens têm.
+    """
+    return reference_cache.stats()
+
+@router.get("/status-consulta", response_model=List[StatusConsultaRead], summary="Lista os status de consulta")
+def read_status_consulta():
+    """
+    Lista o catálogo de status de consulta a partir do cache.
+    """
+    status_consulta = reference_cache.get_status()
+    if status_consulta is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Dados de referência ainda não carregados"
+        )
+    return status_consulta
+
+@router.post("/refresh", response_model=Dict[str, Any], summary="Recarrega o cache de dados de referência")
+async def refresh_referencias():
+    """
+    Recarrega especialidades, profissionais e status de consulta imediatamente,
+    sem esperar o próximo ciclo de recarga em segundo plano.
+    """
+    if not await reference_cache.refresh_async():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Falha ao recarregar dados de referência: {reference_cache.last_error}"
+        )
+    return reference_cache.stats()
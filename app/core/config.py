@@ -1,17 +1,107 @@
 import os
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import List, Literal, Optional
 
 class Settings(BaseSettings):
     # Configurações da Aplicação
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Cache de tokens já verificados (a entrada nunca passa do 'exp' do token)
+    TOKEN_CACHE_TTL_SECONDS: int = 300
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000
 
     # Configurações do Banco de Dados Oracle
     DB_USER: str
     DB_PASSWORD: str
     DB_DSN: str
+    # Usa o pool assíncrono e os endpoints 'async def' (app/api/v1/endpoints/aio)
+    DB_ASYNC: bool = False
+
+    # Pool de conexões Oracle
+    DB_POOL_MIN: int = 2
+    DB_POOL_MAX: int = 10
+    DB_POOL_INCREMENT: int = 1
+    # Comportamento do acquire com o pool cheio: wait, timedwait, nowait ou forceget
+    DB_POOL_GETMODE: Literal["wait", "timedwait", "nowait", "forceget"] = "timedwait"
+    DB_POOL_WAIT_TIMEOUT_MS: int = 5000  # usado no modo timedwait
+    DB_POOL_STMTCACHESIZE: int = 50
+    # Segundos ociosos antes de testar a conexão no acquire (0 = sempre, negativo = nunca)
+    DB_POOL_PING_INTERVAL: int = 60
+    # Segundos até fechar conexões ociosas acima do mínimo (0 = nunca)
+    DB_POOL_IDLE_TIMEOUT: int = 0
+    # Pool de leitura (standby/réplica) para listagens e disponibilidade. Sem DB_READ_DSN
+    # as leituras usam o pool acima; usuário e senha vazios repetem DB_USER/DB_PASSWORD
+    DB_READ_DSN: Optional[str] = None
+    DB_READ_USER: Optional[str] = None
+    DB_READ_PASSWORD: Optional[str] = None
+    DB_READ_POOL_MIN: int = 2
+    DB_READ_POOL_MAX: int = 10
+    # Controle de admissão: com o pool cheio, os requests esperam em filas por prioridade
+    # (escrita/login antes de listagens) por no máximo DB_ADMISSION_WAIT_TIMEOUT_MS; fila
+    # cheia ou espera esgotada respondem 503 com Retry-After
+    DB_ADMISSION_ENABLED: bool = True
+    DB_ADMISSION_WAIT_TIMEOUT_MS: int = 2000
+    DB_ADMISSION_QUEUE_MAX_WRITE: int = 20
+    DB_ADMISSION_QUEUE_MAX_READ: int = 10
+    DB_ADMISSION_RETRY_AFTER_SECONDS: int = 1
+    # Threads do threadpool além das conexões e das filas de admissão (ver threadpool_tokens)
+    DB_THREADPOOL_EXTRA: int = 8
+    # Intervalo entre tentativas de criar e aquecer os pools no startup; até lá o /ready
+    # responde 503 e os endpoints com banco também (com Retry-After)
+    STARTUP_RETRY_SECONDS: int = 5
+    # Comandos executados uma vez em cada sessão nova (ex.: "ALTER SESSION SET TIME_ZONE = 'America/Sao_Paulo'")
+    DB_SESSION_STATEMENTS: List[str] = []
+    # Cabeçalho Server-Timing e log de tempo de banco por request
+    DB_INSTRUMENTATION_ENABLED: bool = False
+
+    # Endpoint /metrics (formato Prometheus) e middleware de latência
+    METRICS_ENABLED: bool = True
+
+    # Cache de dados de referência (especialidades, profissionais, status)
+    REFERENCE_CACHE_REFRESH_SECONDS: int = 300
+
+    # Cache de credenciais do login (inclui usernames inexistentes)
+    LOGIN_CACHE_TTL_SECONDS: int = 30
+    LOGIN_CACHE_NEGATIVE_TTL_SECONDS: int = 10
+    LOGIN_CACHE_MAX_ENTRIES: int = 10000
+
+    # Idempotency-Key nos POSTs de agendamento e registro: validade das chaves, tamanho
+    # do store e quanto um retry concorrente espera pelo request original
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_PATHS: List[str] = ["/api/v1/consultas/", "/api/v1/auth/pacientes/register"]
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_MAX_ENTRIES: int = 10000
+    IDEMPOTENCY_WAIT_SECONDS: float = 30
+
+    # Paginação (keyset) das listagens
+    PAGINATION_DEFAULT_LIMIT: int = 50
+    PAGINATION_MAX_LIMIT: int = 500
+
+    # Exportação em streaming: linhas por ida ao banco
+    EXPORT_ARRAYSIZE: int = 5000
+
+    # Operações em lote (registro de pacientes, agendamento de consultas)
+    BULK_MAX_ITEMS: int = 5000
+    BULK_CHUNK_SIZE: int = 500
+
+    # Disponibilidade
+    DISPONIBILIDADE_MAX_DIAS_INTERVALO: int = 31
+    DISPONIBILIDADE_CACHE_TTL_SECONDS: int = 60
+    DISPONIBILIDADE_CACHE_MAX_ENTRIES: int = 1024
+    # Busca dos próximos horários livres: limite de dias varridos, dias por consulta ao banco
+    # e máximo de horários por resposta
+    DISPONIBILIDADE_BUSCA_MAX_DIAS: int = 60
+    DISPONIBILIDADE_BUSCA_DIAS_POR_CONSULTA: int = 7
+    DISPONIBILIDADE_BUSCA_MAX_RESULTADOS: int = 50
+
+    # Índice em memória da agenda (bits por profissional e dia) para a disponibilidade.
+    # Escritas de outros processos só aparecem na próxima recarga, então o intervalo
+    # fica abaixo de DISPONIBILIDADE_CACHE_TTL_SECONDS (ver ScheduleIndex)
+    SCHEDULE_INDEX_ENABLED: bool = True
+    SCHEDULE_INDEX_DAYS: int = 60
+    SCHEDULE_INDEX_REFRESH_SECONDS: int = 30
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,201 @@
+import asyncio
+import hashlib
+from typing import Dict, List, Optional, Tuple
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.responses import FastJSONResponse
+
+HEADER = b"idempotency-key"
+TAMANHO_MAXIMO_CHAVE = 255
+
+metrics.describe_counter(
+    "pathmed_idempotency_requests_total",
+    "Requests com Idempotency-Key: executados, repetidos do store, que esperaram o original ou rejeitados"
+)
+
+class _Resposta:
+    """Resposta guardada para repetir aos retries com a mesma chave."""
+
+    __slots__ = ("impressao", "status", "headers", "corpo")
+
+    def __init__(self, impressao: str, status: int, headers: List[Tuple[bytes, bytes]], corpo: bytes):
+        self.impressao = impressao
+        self.status = status
+        self.headers = headers
+        self.corpo = corpo
+
+class _EmAndamento:
+    __slots__ = ("impressao", "pronta")
+
+    def __init__(self, impressao: str):
+        self.impressao = impressao
+        self.pronta = asyncio.Event()
+
+def _contar(resultado: str) -> None:
+    metrics.inc("pathmed_idempotency_requests_total", (("resultado", resultado),))
+
+def _header(scope: Scope, nome: bytes) -> Optional[bytes]:
+    for chave, valor in scope["headers"]:
+        if chave == nome:
+            return valor
+    return None
+
+async def _ler_corpo(receive: Receive) -> Tuple[bytes, List[Message]]:
+    """Lê o corpo inteiro; devolve também as mensagens para repassá-las ao app."""
+    mensagens: List[Message] = []
+    partes: List[bytes] = []
+    while True:
+        message = await receive()
+        mensagens.append(message)
+        if message["type"] != "http.request":
+            break
+        partes.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(partes), mensagens
+
+def _repetir_receive(mensagens: List[Message], receive: Receive) -> Receive:
+    pendentes = list(mensagens)
+
+    async def replay() -> Message:
+        if pendentes:
+            return pendentes.pop(0)
+        return await receive()
+    return replay
+
+class IdempotencyMiddleware:
+    """
+    Suporte ao cabeçalho Idempotency-Key nos POSTs de IDEMPOTENCY_PATHS
+    (agendamento de consulta e registro de paciente).
+
+    - A primeira requisição com uma chave é executada normalmente e sua resposta
+      (status < 500) fica guardada por IDEMPOTENCY_KEY_TTL_SECONDS.
+    - Retries com a mesma chave e o mesmo corpo recebem a resposta guardada, com
+      o cabeçalho Idempotent-Replayed, sem chegar ao endpoint nem ao Oracle.
+    - Duplicatas concorrentes esperam a primeira terminar (até
+      IDEMPOTENCY_WAIT_SECONDS; depois, 409).
+    - A mesma chave com outro corpo é rejeitada com 422.
+
+    A chave vale pelo caminho exato e pelo cabeçalho Authorization: o retry
+    precisa vir com o mesmo token. Respostas 5xx, requests interrompidos e
+    respostas que não vieram de um endpoint POST (404, 405, redirect de barra)
+    não são guardados, para que o cliente possa tentar de novo. O store é por
+    processo.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.paths = set(settings.IDEMPOTENCY_PATHS)
+        self.store = TTLCache(settings.IDEMPOTENCY_MAX_ENTRIES, settings.IDEMPOTENCY_KEY_TTL_SECONDS)
+        self._em_andamento: Dict[Tuple[str, bytes, str], _EmAndamento] = {}
+        metrics.register_cache("idempotencia", self.store.stats)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"] not in self.paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        chave_cliente = _header(scope, HEADER)
+        if chave_cliente is None:
+            await self.app(scope, receive, send)
+            return
+        if not chave_cliente or len(chave_cliente) > TAMANHO_MAXIMO_CHAVE:
+            _contar("rejeitada")
+            await FastJSONResponse(
+                {"detail": f"Idempotency-Key deve ter entre 1 e {TAMANHO_MAXIMO_CHAVE} caracteres"},
+                status_code=400
+            )(scope, receive, send)
+            return
+
+        corpo, mensagens = await _ler_corpo(receive)
+        impressao = hashlib.sha256(corpo).hexdigest()
+        autorizacao = hashlib.sha256(_header(scope, b"authorization") or b"").hexdigest()
+        chave = (scope["path"], chave_cliente, autorizacao)
+
+        esperou = False
+        while True:
+            guardada: Optional[_Resposta] = self.store.get(chave)
+            if guardada is not None:
+                if guardada.impressao != impressao:
+                    await self._corpo_diferente(scope, receive, send)
+                    return
+                _contar("aguardou" if esperou else "repetida")
+                await self._repetir(guardada, send)
+                return
+
+            andamento = self._em_andamento.get(chave)
+            if andamento is None:
+                break
+            if andamento.impressao != impressao:
+                await self._corpo_diferente(scope, receive, send)
+                return
+            try:
+                await asyncio.wait_for(andamento.pronta.wait(), settings.IDEMPOTENCY_WAIT_SECONDS)
+            except asyncio.TimeoutError:
+                _contar("conflito")
+                await FastJSONResponse(
+                    {"detail": "Requisição com esta Idempotency-Key ainda em andamento"},
+                    status_code=409,
+                    headers={"Retry-After": "1"}
+                )(scope, receive, send)
+                return
+            # A original pode ter terminado com 5xx (nada guardado): esta assume a chave
+            esperou = True
+
+        _contar("executada")
+        andamento = self._em_andamento[chave] = _EmAndamento(impressao)
+        try:
+            resposta = await self._executar(scope, _repetir_receive(mensagens, receive), send, impressao)
+            if resposta is not None:
+                self.store.set(chave, resposta)
+        finally:
+            del self._em_andamento[chave]
+            andamento.pronta.set()
+
+    async def _executar(self, scope: Scope, receive: Receive, send: Send, impressao: str) -> Optional[_Resposta]:
+        """Repassa a resposta ao cliente e devolve uma cópia para o store, se puder ser guardada."""
+        inicio: Optional[Message] = None
+        partes: List[bytes] = []
+        completa = False
+
+        async def send_capturando(message: Message) -> None:
+            nonlocal inicio, completa
+            if message["type"] == "http.response.start":
+                inicio = message
+            elif message["type"] == "http.response.body":
+                partes.append(message.get("body", b""))
+                completa = not message.get("more_body", False)
+            await send(message)
+
+        await self.app(scope, receive, send_capturando)
+        if inicio is None or not completa or inicio["status"] >= 500:
+            return None
+        # O roteamento grava a rota em scope["route"]; sem ela (404, redirect) ou
+        # com uma rota de outro método (405), a resposta não veio do endpoint
+        rota = scope.get("route")
+        if "POST" not in (getattr(rota, "methods", None) or ()):
+            return None
+        return _Resposta(impressao, inicio["status"], list(inicio.get("headers", [])), b"".join(partes))
+
+    @staticmethod
+    async def _repetir(resposta: _Resposta, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": resposta.status,
+            "headers": resposta.headers + [(b"idempotent-replayed", b"true")],
+        })
+        await send({"type": "http.response.body", "body": resposta.corpo})
+
+    @staticmethod
+    async def _corpo_diferente(scope: Scope, receive: Receive, send: Send) -> None:
+        _contar("rejeitada")
+        await FastJSONResponse(
+            {"detail": "Idempotency-Key já usada com outro corpo de requisição"},
+            status_code=422
+        )(scope, receive, send)
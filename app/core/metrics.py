@@ -0,0 +1,268 @@
+import threading
+import weakref
+from bisect import bisect_left
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    # Versões do FastAPI que mantêm os routers incluídos aninhados: o path_format
+    # de scope["route"] não traz o prefixo do include_router
+    from fastapi.routing import iter_route_contexts
+except ImportError:
+    iter_route_contexts = None
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Limites (segundos) dos buckets do histograma de latência
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+Collector = Callable[[], Iterable[str]]
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+def metric_lines(name: str, kind: str, help_text: str, samples: Iterable[Tuple[Labels, float]]) -> List[str]:
+    """Linhas no formato de exposição de texto do Prometheus para uma métrica simples."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines.extend(f"{name}{format_labels(labels)} {value}" for labels, value in samples)
+    return lines
+
+class _Shard:
+    """Contadores de uma thread; só ela escreve, então o registro não precisa de lock."""
+
+    __slots__ = ("latency", "in_flight", "counters")
+
+    def __init__(self):
+        # (method, route, status) -> contagens por bucket (+Inf no fim), soma, total
+        self.latency: Dict[Tuple[str, str, str], List[float]] = {}
+        self.in_flight = 0
+        # (nome, labels) -> valor
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+
+    def somar(self, outro: "_Shard") -> None:
+        """Soma `outro` neste shard; a thread dona de `outro` pode estar inserindo."""
+        self.in_flight += outro.in_flight
+        # dict.copy é atômico sob o GIL
+        for key, entry in outro.latency.copy().items():
+            total = self.latency.setdefault(key, [0] * len(entry))
+            for i, value in enumerate(list(entry)):
+                total[i] += value
+        for key, value in outro.counters.copy().items():
+            self.counters[key] = self.counters.get(key, 0) + value
+
+class _Dona:
+    """Sentinela guardada no threading.local: some quando a thread termina."""
+
+    __slots__ = ("__weakref__",)
+
+class MetricsRegistry:
+    """
+    Métricas do processo em shards por thread: o caminho quente só toca o shard
+    da própria thread. O lock protege apenas a lista de shards; a coleta soma os
+    shards no momento do scrape. Quando uma thread termina (o anyio descarta as
+    threads ociosas do threadpool), o shard dela é somado na base e descartado,
+    para que a lista não cresça durante a vida do processo.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        # Totais das threads que já terminaram
+        self._base = _Shard()
+        self._lock = threading.Lock()
+        self._counter_help: Dict[str, str] = {}
+        self._collectors: List[Collector] = []
+        self._caches: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _Shard()
+            self._local.shard = shard
+            self._local.dona = dona = _Dona()
+            with self._lock:
+                self._shards.append(shard)
+            weakref.finalize(dona, self._recolher, shard)
+        return shard
+
+    def _recolher(self, shard: _Shard) -> None:
+        """Thread encerrada: soma o shard dela na base e o tira da lista."""
+        with self._lock:
+            self._shards.remove(shard)
+            self._base.somar(shard)
+
+    # ----------------------------------------------------------- registro
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        latency = self._shard().latency
+        key = (method, route, str(status))
+        entry = latency.get(key)
+        if entry is None:
+            entry = latency[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        entry[bisect_left(self.buckets, seconds)] += 1
+        entry[-2] += seconds
+        entry[-1] += 1
+
+    def add_in_flight(self, delta: int) -> None:
+        self._shard().in_flight += delta
+
+    def describe_counter(self, name: str, help_text: str) -> None:
+        self._counter_help[name] = help_text
+
+    def inc(self, name: str, labels: Labels = (), amount: float = 1) -> None:
+        """Incrementa um contador; `labels` é uma tupla de pares (nome, valor)."""
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + amount
+
+    def register_collector(self, collector: Collector) -> None:
+        """Coletor chamado a cada scrape; devolve linhas já formatadas (ver metric_lines)."""
+        self._collectors.append(collector)
+
+    def register_cache(self, cache_name: str, stats: Callable[[], Dict[str, Any]]) -> None:
+        """Expõe um cache (ex.: TTLCache.stats) nas métricas pathmed_cache_*."""
+        self._caches[cache_name] = stats
+
+    # ------------------------------------------------------------- coleta
+
+    def _cache_lines(self) -> List[str]:
+        familias = (
+            ("pathmed_cache_entries", "gauge", "Entradas no cache", "entries"),
+            ("pathmed_cache_hits_total", "counter", "Leituras atendidas pelo cache", "hits"),
+            ("pathmed_cache_misses_total", "counter", "Leituras que foram ao banco", "misses"),
+            ("pathmed_cache_evictions_total", "counter", "Entradas descartadas pelo limite de tamanho", "evictions"),
+            ("pathmed_cache_invalidations_total", "counter", "Entradas invalidadas por escrita", "invalidations"),
+        )
+        stats = {name: fn() for name, fn in self._caches.items()}
+        lines: List[str] = []
+        for metric, kind, help_text, campo in familias:
+            samples = [((("cache", name),), s[campo]) for name, s in sorted(stats.items()) if campo in s]
+            if samples:
+                lines += metric_lines(metric, kind, help_text, samples)
+        return lines
+
+    def _merged(self):
+        total = _Shard()
+        # Sob o lock, para que um shard não seja somado duas vezes (na lista e na base)
+        with self._lock:
+            total.somar(self._base)
+            for shard in self._shards:
+                total.somar(shard)
+        return total.latency, total.counters, total.in_flight
+
+    def render(self) -> str:
+        latency, counters, in_flight = self._merged()
+        name = "pathmed_http_request_duration_seconds"
+        lines = [
+            f"# HELP {name} Latência dos requests por rota",
+            f"# TYPE {name} histogram",
+        ]
+        limites = [str(b) for b in self.buckets] + ["+Inf"]
+        for (method, route, status), entry in sorted(latency.items()):
+            base = (("method", method), ("route", route), ("status", status))
+            acumulado = 0
+            for limite, count in zip(limites, entry):
+                acumulado += count
+                lines.append(f"{name}_bucket{format_labels(base + (('le', limite),))} {acumulado}")
+            lines.append(f"{name}_sum{format_labels(base)} {entry[-2]}")
+            lines.append(f"{name}_count{format_labels(base)} {entry[-1]}")
+
+        lines += metric_lines(
+            "pathmed_http_requests_in_flight", "gauge",
+            "Requests em andamento", [((), in_flight)]
+        )
+
+        por_nome: Dict[str, List[Tuple[Labels, float]]] = {}
+        for (counter, labels), value in counters.items():
+            por_nome.setdefault(counter, []).append((labels, value))
+        for counter, samples in sorted(por_nome.items()):
+            lines += metric_lines(counter, "counter", self._counter_help.get(counter, counter), sorted(samples))
+
+        lines += self._cache_lines()
+        for collector in self._collectors:
+            try:
+                lines.extend(collector())
+            except Exception as e:
+                print(f"❌ Erro no coletor de métricas {getattr(collector, '__name__', collector)}: {e}")
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+
+metrics.describe_counter("pathmed_http_exceptions_total", "HTTPException lançadas por módulo de endpoints e status")
+
+# id(rota) -> (rota, template completo), preenchido a partir das rotas do app
+_route_templates: Dict[int, Tuple[Any, str]] = {}
+
+def route_template(scope: Scope) -> str:
+    """
+    Rota no formato de template (/api/v1/pacientes/{paciente_id}) para manter a
+    cardinalidade das labels limitada. Requests sem rota caem em "unmatched".
+    """
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    if iter_route_contexts is None:
+        return route.path_format
+
+    entrada = _route_templates.get(id(route))
+    if entrada is None or entrada[0] is not route:
+        for contexto in iter_route_contexts(scope["app"].routes):
+            _route_templates[id(contexto.original_route)] = (contexto.original_route, contexto.path_format)
+        entrada = _route_templates.get(id(route))
+    if entrada is None or entrada[0] is not route or entrada[1] is None:
+        return route.path_format
+    return entrada[1]
+
+def endpoint_module(endpoint: Optional[Callable]) -> str:
+    """Nome curto do módulo do endpoint (consultas, aio.consultas, ...)."""
+    if endpoint is None:
+        return "unmatched"
+    module = getattr(endpoint, "__module__", "") or ""
+    return module.split("app.api.v1.endpoints.", 1)[-1]
+
+def count_http_exception(request: Request, status_code: int) -> None:
+    metrics.inc(
+        "pathmed_http_exceptions_total",
+        (("module", endpoint_module(request.scope.get("endpoint"))), ("status", str(status_code)))
+    )
+
+class MetricsMiddleware:
+    """Middleware ASGI puro que mede a latência e os requests em andamento."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        metrics.add_in_flight(1)
+        inicio = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.add_in_flight(-1)
+            metrics.observe_request(scope["method"], route_template(scope), status_code, perf_counter() - inicio)
+
+def metrics_endpoint() -> PlainTextResponse:
+    """Métricas no formato de exposição de texto do Prometheus."""
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
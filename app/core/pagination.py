@@ -0,0 +1,41 @@
+import base64
+import json
+from typing import Any, Dict, List, Optional
+
+# Anexado às consultas paginadas (Oracle 12c+); o bind recebe limit + 1
+SQL_FETCH_FIRST = "\n    FETCH FIRST :limit ROWS ONLY"
+
+def encode_cursor(last_id: int) -> str:
+    """Gera o token opaco que aponta para depois do último ID da página."""
+    raw = json.dumps({"k": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: Optional[str]) -> int:
+    """
+    Lê um token gerado por encode_cursor. Sem token, a listagem começa do início.
+    Lança ValueError se o token for inválido.
+    """
+    if not cursor:
+        return 0
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        last_id = json.loads(raw)["k"]
+    except Exception:
+        raise ValueError("Cursor de paginação inválido")
+    # bool é subclasse de int: {"k": true} não é um ID
+    if type(last_id) is not int or last_id < 0:
+        raise ValueError("Cursor de paginação inválido")
+    return last_id
+
+def build_page(rows: List[Any], limit: Optional[int], key: str) -> Dict[str, Any]:
+    """
+    Monta a resposta paginada a partir de até `limit + 1` linhas ordenadas pela
+    chave: a linha extra só indica que existe uma próxima página.
+    """
+    if limit is None or len(rows) <= limit:
+        return {"items": rows, "next_cursor": None}
+
+    items = rows[:limit]
+    last = items[-1]
+    last_id = last[key] if isinstance(last, dict) else getattr(last, key)
+    return {"items": items, "next_cursor": encode_cursor(last_id)}
@@ -0,0 +1,58 @@
+import time
+from typing import Any, Dict, List, Optional
+from app.core.metrics import metrics, metric_lines
+
+class StartupState:
+    """
+    Progresso da inicialização em segundo plano (pools, aquecimento, dados de
+    referência). A aplicação responde desde o primeiro instante (liveness); o
+    /ready só fica verde depois que o pool está aquecido.
+    """
+
+    def __init__(self):
+        self.iniciar()
+
+    def iniciar(self) -> None:
+        """Zera o estado no início do lifespan."""
+        self.iniciado_em = time.perf_counter()
+        self.pronto_em: Optional[float] = None
+        # etapa -> segundos que levou, na ordem em que terminaram
+        self.etapas: Dict[str, float] = {}
+        self.tentativas = 0
+        self.ultimo_erro: Optional[str] = None
+
+    @property
+    def pronto(self) -> bool:
+        return self.pronto_em is not None
+
+    def etapa(self, nome: str, inicio: float) -> None:
+        """Registra uma etapa concluída que começou em `inicio` (perf_counter)."""
+        self.etapas[nome] = round(time.perf_counter() - inicio, 6)
+
+    def marcar_pronto(self) -> None:
+        self.pronto_em = time.perf_counter()
+        self.ultimo_erro = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        agora = self.pronto_em if self.pronto_em is not None else time.perf_counter()
+        return {
+            "pronto": self.pronto,
+            "segundos_desde_o_inicio": round(agora - self.iniciado_em, 6),
+            "etapas": dict(self.etapas),
+            "tentativas": self.tentativas,
+            "ultimo_erro": self.ultimo_erro,
+        }
+
+    def collect_metrics(self) -> List[str]:
+        """Coletor de /metrics."""
+        lines = metric_lines("pathmed_ready", "gauge", "Aplicação pronta para receber tráfego (1/0)", [((), int(self.pronto))])
+        if self.pronto_em is not None:
+            lines += metric_lines(
+                "pathmed_startup_seconds", "gauge", "Tempo do início do lifespan até ficar pronta",
+                [((), round(self.pronto_em - self.iniciado_em, 6))]
+            )
+        return lines
+
+# Instância única, atualizada pelo lifespan e lida pelo /ready
+startup_state = StartupState()
+metrics.register_collector(startup_state.collect_metrics)
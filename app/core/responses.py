@@ -0,0 +1,65 @@
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# orjson é opcional: serializa dataclasses (os registros de app.db.rows), datas
+# e horas nativamente, sem passar por callback Python a cada linha
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende do ambiente
+    orjson = None
+
+def _default(obj: Any) -> Any:
+    """Converte o que o json da biblioteca padrão não conhece, como o Pydantic faria."""
+    if hasattr(obj, "_asdict"):
+        return obj._asdict()
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Objeto do tipo {type(obj).__name__} não é serializável em JSON")
+
+def _orjson_default(obj: Any) -> Any:
+    # orjson já cobre datas, dataclasses e tipos básicos; o resto cai aqui
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if hasattr(obj, "_asdict"):
+        return obj._asdict()
+    raise TypeError(f"Objeto do tipo {type(obj).__name__} não é serializável em JSON")
+
+def dumps(content: Any) -> bytes:
+    """JSON compacto em UTF-8; usa orjson quando instalado."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+        default=_default,
+    ).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """
+    Classe de resposta padrão do app (default_response_class em app/main.py).
+    Mesmo JSON do JSONResponse do Starlette, gerado com orjson quando disponível.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+class RecordsJSONResponse(FastJSONResponse):
+    """
+    Resposta JSON para listagens que já saem do banco no formato do response_model
+    (registros de app.db.rows). Retornar esta resposta no endpoint evita que o
+    FastAPI valide e serialize cada linha de novo pelo Pydantic; o response_model
+    continua declarado para a documentação OpenAPI.
+    """
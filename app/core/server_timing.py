@@ -0,0 +1,61 @@
+from time import perf_counter
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.db.instrumentation import RequestDbStats, current_db_stats
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.3f}"
+
+def server_timing_header(stats: RequestDbStats, total: float) -> str:
+    """Valor do cabeçalho Server-Timing (visível na aba Network do navegador)."""
+    return (
+        f'db;dur={_ms(stats.db_time)};desc="{stats.statements} stmts, {stats.round_trips} rt, {stats.rows} rows", '
+        f"db-exec;dur={_ms(stats.execute_time)}, "
+        f"db-fetch;dur={_ms(stats.fetch_time)}, "
+        f"app;dur={_ms(max(total - stats.db_time, 0.0))}, "
+        f"total;dur={_ms(total)}"
+    )
+
+class ServerTimingMiddleware:
+    """
+    Mede, por request, o tempo gasto no Oracle (via conexões instrumentadas) e o
+    restante (validação, serialização). Envia o resultado no cabeçalho
+    Server-Timing e em uma linha de log ao final do request; as estatísticas
+    também ficam em `request.state.db_stats`.
+
+    Middleware ASGI puro: o corpo da resposta não é bufferizado, então o
+    streaming das exportações continua funcionando.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestDbStats()
+        scope.setdefault("state", {})["db_stats"] = stats
+        token = current_db_stats.set(stats)
+        inicio = perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", server_timing_header(stats, perf_counter() - inicio))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_db_stats.reset(token)
+            total = perf_counter() - inicio
+            print(
+                f"⏱️ {scope['method']} {scope['path']} {status_code} "
+                f"total={total * 1000:.1f}ms db={stats.db_time * 1000:.1f}ms "
+                f"stmts={stats.statements} rt={stats.round_trips} rows={stats.rows}"
+            )
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+from app.core.metrics import metrics
+
+metrics.describe_counter(
+    "pathmed_singleflight_calls_total",
+    "Chamadas por grupo de single-flight: executadas ou compartilhadas com uma já em andamento"
+)
+
+class _Chamada:
+    __slots__ = ("pronta", "resultado", "erro")
+
+    def __init__(self):
+        self.pronta = threading.Event()
+        self.resultado: Any = None
+        self.erro: Optional[BaseException] = None
+
+class _LiderCancelado(Exception):
+    """O request que executava a chamada foi cancelado; quem esperava tenta de novo."""
+
+class SingleFlight:
+    """
+    Coalescência de leituras idênticas concorrentes: enquanto uma chamada com a
+    mesma chave está em andamento, as demais esperam e recebem o mesmo
+    resultado (ou a mesma exceção) em vez de repetir o trabalho.
+
+    `do` serve às threads do threadpool; `do_async` ao event loop. O resultado
+    é compartilhado entre os chamadores e não deve ser alterado.
+    """
+
+    def __init__(self, grupo: str):
+        self.grupo = grupo
+        self._lock = threading.Lock()
+        self._chamadas: Dict[Hashable, _Chamada] = {}
+        self._futuros: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+    def _contar(self, resultado: str) -> None:
+        metrics.inc("pathmed_singleflight_calls_total", (("grupo", self.grupo), ("resultado", resultado)))
+
+    def do(self, chave: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            chamada = self._chamadas.get(chave)
+            lider = chamada is None
+            if lider:
+                chamada = self._chamadas[chave] = _Chamada()
+
+        if not lider:
+            self._contar("compartilhada")
+            chamada.pronta.wait()
+            if chamada.erro is not None:
+                raise chamada.erro
+            return chamada.resultado
+
+        self._contar("executada")
+        try:
+            chamada.resultado = fn()
+            return chamada.resultado
+        except BaseException as e:
+            chamada.erro = e
+            raise
+        finally:
+            with self._lock:
+                del self._chamadas[chave]
+            chamada.pronta.set()
+
+    async def do_async(self, chave: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        A corrotina roda no request que chegou primeiro, com os recursos dele
+        (ex.: a conexão). Se esse request for cancelado, um dos que esperavam
+        assume a chamada.
+        """
+        while True:
+            futuro = self._futuros.get(chave)
+            if futuro is None:
+                break
+            self._contar("compartilhada")
+            try:
+                return await asyncio.shield(futuro)
+            except _LiderCancelado:
+                continue
+
+        self._contar("executada")
+        futuro = self._futuros[chave] = asyncio.get_running_loop().create_future()
+        try:
+            resultado = await fn()
+        except asyncio.CancelledError:
+            self._concluir(chave, futuro, erro=_LiderCancelado())
+            raise
+        except BaseException as e:
+            self._concluir(chave, futuro, erro=e)
+            raise
+        self._concluir(chave, futuro, resultado=resultado)
+        return resultado
+
+    def _concluir(self, chave: Hashable, futuro: "asyncio.Future[Any]", resultado: Any = None,
+                  erro: Optional[BaseException] = None) -> None:
+        # Sai do mapa antes de publicar: quem chegar depois começa uma chamada nova
+        del self._futuros[chave]
+        if erro is None:
+            futuro.set_result(resultado)
+        else:
+            futuro.set_exception(erro)
+            # Sem ninguém esperando, evita o aviso de exceção nunca recuperada
+            futuro.exception()
@@ -1,6 +1,6 @@
 from .crud_consulta import get_by_paciente_id
 from .crud_paciente import create, get_by_id, get_all, update
-from .crud_user import get_user_from_db
+from .crud_user import get_user_from_db, get_user_cached
 from .crud_especialidade import get_all
 from .crud_profissional import get_all
 from .crud_disponibilidade import crud_disponibilidade
@@ -12,6 +12,7 @@ __all__ = [
     "get_all",
     "update",
     "get_user_from_db",
+    "get_user_cached",
     "get_by_paciente_id",  # ✅ NOVA EXPORTAÇÃO
     "crud_disponibilidade"
 ]
\ No newline at end of file
@@ -0,0 +1,13 @@
+# Variantes assíncronas dos módulos CRUD, usadas quando settings.DB_ASYNC está ativo.
+# Compartilham SQL, helpers e caches com os módulos síncronos de app.crud.
+from . import crud_consulta, crud_paciente, crud_user, crud_especialidade, crud_profissional
+from .crud_disponibilidade import crud_disponibilidade
+
+__all__ = [
+    "crud_consulta",
+    "crud_paciente",
+    "crud_user",
+    "crud_especialidade",
+    "crud_profissional",
+    "crud_disponibilidade"
+]
@@ -0,0 +1,110 @@
+import oracledb
+from app.schemas.consulta import ConsultaCreate
+from typing import Any, Dict, List, Optional
+from datetime import date
+from app.db.rows import use_records
+from app.crud.crud_disponibilidade import crud_disponibilidade
+from app.crud.crud_consulta import (
+    SQL_INSERT_RETURNING_ROW, SQL_GET_ALL, SQL_GET_BY_PACIENTE_ID,
+    SQL_UPDATE_STATUS, _insert_params, page_sql, _returning_vars, _returning_row,
+    consultas_do_paciente
+)
+
+async def create(conn: oracledb.AsyncConnection, consulta: ConsultaCreate) -> Optional[Dict[str, Any]]:
+    """
+    Agenda uma nova consulta com INSERT ... RETURNING INTO e um commit.
+    Retorna a linha gravada; lança oracledb.IntegrityError para o endpoint.
+    """
+    try:
+        with conn.cursor() as cursor:
+            out_vars = _returning_vars(cursor)
+            await cursor.execute(SQL_INSERT_RETURNING_ROW, {**_insert_params(consulta), **out_vars})
+            await conn.commit()
+
+        consulta_db = _returning_row(out_vars)
+        # O horário deixou de estar livre: atualiza o índice de agenda e o cache
+        crud_disponibilidade.registrar_consulta(
+            consulta_db["id_consulta"], consulta_db["id_profissional"],
+            consulta_db["data_hora_consulta"], consulta_db["id_status"]
+        )
+        return consulta_db
+
+    except oracledb.IntegrityError as e:
+        await conn.rollback()
+        print(f"Erro de integridade ao criar consulta: {e}")
+        raise e
+    except Exception as e:
+        await conn.rollback()
+        print(f"❌ Erro ao criar consulta: {str(e)}")
+        return None
+
+async def get_all(conn: oracledb.AsyncConnection) -> List[dict]:
+    """Busca todas as consultas."""
+    consultas = []
+    try:
+        with conn.cursor() as cursor:
+            await cursor.execute(SQL_GET_ALL)
+            use_records(cursor)
+            consultas = await cursor.fetchall()
+        return consultas
+    except Exception as e:
+        print(f"Erro ao buscar consultas: {e}")
+        return []
+
+async def get_page(
+    conn: oracledb.AsyncConnection,
+    after_id: int = 0,
+    limit: Optional[int] = None,
+    id_profissional: Optional[int] = None,
+    id_status: Optional[int] = None,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None
+) -> List[dict]:
+    """Busca consultas com ID_CONSULTA > after_id em ordem de ID, com filtros no SQL."""
+    try:
+        with conn.cursor() as cursor:
+            await cursor.execute(*page_sql(after_id, limit, id_profissional, id_status, data_inicio, data_fim))
+            use_records(cursor)
+            return await cursor.fetchall()
+    except oracledb.DatabaseError as e:
+        # Uma lista vazia seria lida pelo cliente como fim da paginação
+        raise RuntimeError(f"Erro no banco ao buscar página de consultas: {e}")
+
+async def _fetch_by_paciente_id(conn: oracledb.AsyncConnection, paciente_id: int) -> List[dict]:
+    consultas = []
+    try:
+        with conn.cursor() as cursor:
+            await cursor.execute(SQL_GET_BY_PACIENTE_ID, paciente_id=paciente_id)
+            use_records(cursor)
+            consultas = await cursor.fetchall()
+        return consultas
+    except Exception as e:
+        print(f"Erro ao buscar consultas do paciente {paciente_id}: {e}")
+        return []
+
+async def get_by_paciente_id(conn: oracledb.AsyncConnection, paciente_id: int) -> List[dict]:
+    """
+    Busca consultas por ID do paciente com detalhes expandidos. Chamadas
+    concorrentes para o mesmo paciente compartilham uma única consulta ao banco.
+    """
+    chave = (paciente_id, crud_disponibilidade.geracao)
+    return await consultas_do_paciente.do_async(chave, lambda: _fetch_by_paciente_id(conn, paciente_id))
+
+async def update_status(conn: oracledb.AsyncConnection, consulta_id: int, new_status_id: int) -> bool:
+    """Atualiza o status de uma consulta."""
+    try:
+        with conn.cursor() as cursor:
+            id_prof = cursor.var(int)
+            dt_hora = cursor.var(oracledb.DATETIME)
+            await cursor.execute(SQL_UPDATE_STATUS, status=new_status_id, id=consulta_id, id_prof=id_prof, dt_hora=dt_hora)
+            await conn.commit()
+
+            if cursor.rowcount > 0:
+                # Mudança de status pode liberar ou ocupar o horário
+                crud_disponibilidade.registrar_consulta(consulta_id, id_prof.getvalue()[0], dt_hora.getvalue()[0], new_status_id)
+            return cursor.rowcount > 0
+
+    except Exception as e:
+        await conn.rollback()
+        print(f"Erro ao atualizar status da consulta: {e}")
+        return False
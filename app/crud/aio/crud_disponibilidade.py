@@ -0,0 +1,172 @@
+# app/crud/aio/crud_disponibilidade.py
+
+import oracledb
+from app.crud.crud_disponibilidade import (
+    CRUDDisponibilidade, crud_disponibilidade as crud_disponibilidade_sync,
+    SQL_NOME_ESPECIALIDADE, SQL_PROFISSIONAIS_DA_ESPECIALIDADE, SQL_HORARIOS_OCUPADOS,
+    _row_to_profissional
+)
+from app.crud.reference_cache import reference_cache
+from app.db.database import acquire_async_connection
+from app.crud.schedule_index import schedule_index, mascaras_por_dia
+from app.schemas.disponibilidade import ProfissionalResumido, DisponibilidadeDia, ProximosHorarios
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Set, Tuple
+
+class AsyncCRUDDisponibilidade:
+    """
+    Variante assíncrona do CRUDDisponibilidade. Só as idas ao banco são
+    assíncronas; a montagem da grade, o cache e a invalidação são os do
+    CRUD síncrono, para que os dois caminhos compartilhem o mesmo estado.
+    """
+
+    def __init__(self, base: CRUDDisponibilidade):
+        self.base = base
+
+    async def find_nome_especialidade_by_id(self, conn: "oracledb.AsyncConnection", id_especialidade: int) -> str:
+        """Busca nome da especialidade por ID."""
+        nome = reference_cache.get_nome_especialidade(id_especialidade)
+        if nome is not None:
+            return nome
+
+        with conn.cursor() as cursor:
+            await cursor.execute(SQL_NOME_ESPECIALIDADE, [id_especialidade])
+            row = await cursor.fetchone()
+
+        if row:
+            return str(row[0])
+        return f"Especialidade {id_especialidade}"
+
+    async def find_profissionais_by_especialidade(
+        self,
+        conn: "oracledb.AsyncConnection",
+        id_especialidade: int
+    ) -> List[ProfissionalResumido]:
+        """Busca, uma única vez, todos os profissionais da especialidade ordenados por nome."""
+        cached = reference_cache.get_profissionais_da_especialidade(id_especialidade)
+        if cached is not None:
+            return cached
+
+        try:
+            with conn.cursor() as cursor:
+                await cursor.execute(SQL_PROFISSIONAIS_DA_ESPECIALIDADE, id_especialidade=id_especialidade)
+                return [_row_to_profissional(row) async for row in cursor]
+        except oracledb.DatabaseError as e:
+            raise RuntimeError(f"Erro no banco ao buscar profissionais da especialidade: {e}")
+
+    async def find_horarios_ocupados(
+        self,
+        conn: "oracledb.AsyncConnection",
+        id_especialidade: int,
+        inicio: datetime,
+        fim: datetime
+    ) -> Set[Tuple[int, datetime]]:
+        """Busca os pares (id_profissional, data_hora) ocupados no intervalo [inicio, fim)."""
+        try:
+            with conn.cursor() as cursor:
+                await cursor.execute(SQL_HORARIOS_OCUPADOS, id_especialidade=id_especialidade, inicio=inicio, fim=fim)
+                return {(row[0], row[1]) async for row in cursor}
+        except oracledb.DatabaseError as e:
+            raise RuntimeError(f"Erro no banco ao buscar consultas agendadas: {e}")
+
+    async def get_disponibilidade_intervalo(
+        self,
+        conn: "oracledb.AsyncConnection",
+        data_inicio: date,
+        data_fim: date,
+        id_especialidade: int
+    ) -> Iterator[DisponibilidadeDia]:
+        """Mesma semântica de CRUDDisponibilidade.get_disponibilidade_intervalo."""
+        profissionais = await self.find_profissionais_by_especialidade(conn, id_especialidade)
+        self.base._registrar_profissionais(profissionais, id_especialidade)
+
+        if profissionais:
+            nome_especialidade = profissionais[0].descricao_especialidade
+        else:
+            nome_especialidade = await self.find_nome_especialidade_by_id(conn, id_especialidade)
+
+        mascaras: Dict[date, Dict[int, int]] = {}
+        if profissionais:
+            mascaras = schedule_index.mascaras_intervalo(data_inicio, data_fim)
+            if mascaras is None:
+                inicio, fim = self.base._limites_intervalo(data_inicio, data_fim)
+                mascaras = mascaras_por_dia(await self.find_horarios_ocupados(conn, id_especialidade, inicio, fim))
+
+        return self.base._iterar_dias(data_inicio, data_fim, id_especialidade, nome_especialidade, profissionais, mascaras)
+
+    async def get_proximos_horarios(
+        self,
+        conn: "oracledb.AsyncConnection",
+        id_especialidade: int,
+        a_partir_de: datetime,
+        quantidade: int
+    ) -> ProximosHorarios:
+        """Mesma semântica de CRUDDisponibilidade.get_proximos_horarios."""
+        profissionais = await self.find_profissionais_by_especialidade(conn, id_especialidade)
+        self.base._registrar_profissionais(profissionais, id_especialidade)
+        if profissionais:
+            nome_especialidade = profissionais[0].descricao_especialidade
+        else:
+            nome_especialidade = await self.find_nome_especialidade_by_id(conn, id_especialidade)
+
+        resultado = ProximosHorarios(
+            id_especialidade=id_especialidade,
+            nome_especialidade=nome_especialidade,
+            a_partir_de=a_partir_de,
+            dias_verificados=0
+        )
+        for bloco_inicio, bloco_fim in self.base._blocos_de_busca(a_partir_de.date(), profissionais):
+            mascaras = schedule_index.mascaras_intervalo(bloco_inicio, bloco_fim)
+            if mascaras is None:
+                inicio, fim = self.base._limites_intervalo(bloco_inicio, bloco_fim)
+                mascaras = mascaras_por_dia(await self.find_horarios_ocupados(conn, id_especialidade, inicio, fim))
+            if self.base._coletar_livres(resultado, bloco_inicio, bloco_fim, profissionais, mascaras, quantidade):
+                break
+
+        return resultado
+
+    async def get_disponibilidade_do_dia(
+        self,
+        conn: "oracledb.AsyncConnection",
+        data: date,
+        id_especialidade: int
+    ) -> DisponibilidadeDia:
+        return next(await self.get_disponibilidade_intervalo(conn, data, data, id_especialidade))
+
+    async def get_disponibilidade_do_dia_cached(
+        self,
+        conn: "oracledb.AsyncConnection",
+        data: date,
+        id_especialidade: int
+    ) -> DisponibilidadeDia:
+        """Versão com cache; usa o mesmo cache do CRUD síncrono."""
+        chave = (id_especialidade, data)
+        disponibilidade_dia = self.base.cache.get(chave)
+        if disponibilidade_dia is not None:
+            return disponibilidade_dia
+
+        geracao = self.base._geracao
+        disponibilidade_dia = await self.get_disponibilidade_do_dia(conn, data, id_especialidade)
+        self.base._guardar_em_cache(chave, disponibilidade_dia, geracao)
+
+        return disponibilidade_dia
+
+    async def get_disponibilidade_do_dia_compartilhada(self, data: date, id_especialidade: int) -> DisponibilidadeDia:
+        """Versão assíncrona de CRUDDisponibilidade.get_disponibilidade_do_dia_compartilhada."""
+        chave = (id_especialidade, data)
+        disponibilidade_dia = self.base.cache.get(chave)
+        if disponibilidade_dia is not None:
+            return disponibilidade_dia
+
+        geracao = self.base._geracao
+
+        async def calcular() -> DisponibilidadeDia:
+            async with acquire_async_connection(leitura=True) as conn:
+                resultado = await self.get_disponibilidade_do_dia(conn, data, id_especialidade)
+            self.base._guardar_em_cache(chave, resultado, geracao)
+            return resultado
+
+        return await self.base.singleflight.do_async(chave + (geracao,), calcular)
+
+# Cria uma instância singleton para ser usada no endpoint
+crud_disponibilidade = AsyncCRUDDisponibilidade(crud_disponibilidade_sync)
@@ -0,0 +1,22 @@
+import oracledb
+from typing import List
+from app.db.rows import use_records
+from app.crud.crud_especialidade import SQL_GET_ALL
+from app.crud.reference_cache import reference_cache
+
+async def get_all(conn: oracledb.AsyncConnection) -> List[dict]:
+    """Busca todas as especialidades."""
+    cached = reference_cache.get_especialidades()
+    if cached is not None:
+        return cached
+
+    especialidades = []
+    try:
+        with conn.cursor() as cursor:
+            await cursor.execute(SQL_GET_ALL)
+            use_records(cursor)
+            especialidades = await cursor.fetchall()
+        return especialidades
+    except Exception as e:
+        print(f"Erro ao buscar especialidades: {e}")
+        return []
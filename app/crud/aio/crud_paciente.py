@@ -0,0 +1,91 @@
+import oracledb
+from app.schemas.paciente import PacienteCreate, PacienteUpdate
+from typing import List, Optional
+from app.db.rows import use_records
+from app.crud.crud_user import invalidar_credenciais
+from app.crud.crud_paciente import (
+    PACIENTE_DATE_COLUMNS, SQL_INSERT_PACIENTE, SQL_INSERT_CONTATO, SQL_INSERT_LOGIN,
+    SQL_GET_BY_ID, SQL_GET_ALL, SQL_UPDATE_NOME,
+    page_sql, _paciente_params, _contato_params, _login_params, _update_contato_sql
+)
+
+async def create(conn: oracledb.AsyncConnection, paciente: PacienteCreate) -> Optional[int]:
+    """
+    Cria um novo paciente, seu contato e seu login na mesma transação.
+    """
+    try:
+        with conn.cursor() as cursor:
+            new_paciente_id = cursor.var(int)
+            await cursor.execute(SQL_INSERT_PACIENTE, {**_paciente_params(paciente), "id": new_paciente_id})
+            paciente_id = new_paciente_id.getvalue()[0]
+
+            await cursor.execute(SQL_INSERT_CONTATO, _contato_params(paciente_id, paciente))
+            await cursor.execute(SQL_INSERT_LOGIN, _login_params(paciente_id, paciente))
+
+        await conn.commit()
+        invalidar_credenciais([paciente.email_paciente])
+        return paciente_id
+
+    except oracledb.IntegrityError as e:
+        await conn.rollback()
+        print(f"Erro de integridade: {e}")
+        raise e
+    except Exception as e:
+        await conn.rollback()
+        print(f"Erro ao criar paciente: {e}")
+        return None
+
+async def get_by_id(conn: oracledb.AsyncConnection, paciente_id: int) -> Optional[dict]:
+    """Busca um paciente pelo ID, juntando com a tabela de contatos."""
+    try:
+        with conn.cursor() as cursor:
+            await cursor.execute(SQL_GET_BY_ID, id=paciente_id)
+            use_records(cursor, PACIENTE_DATE_COLUMNS)
+            return await cursor.fetchone()
+        return None
+    except Exception as e:
+        print(f"Erro ao buscar paciente por ID: {e}")
+        return None
+
+async def get_all(conn: oracledb.AsyncConnection) -> List[dict]:
+    """Busca todos os pacientes."""
+    pacientes = []
+    try:
+        with conn.cursor() as cursor:
+            await cursor.execute(SQL_GET_ALL)
+            use_records(cursor, PACIENTE_DATE_COLUMNS)
+            pacientes = await cursor.fetchall()
+        return pacientes
+    except Exception as e:
+        print(f"Erro ao buscar todos os pacientes: {e}")
+        return []
+
+async def get_page(conn: oracledb.AsyncConnection, after_id: int = 0, limit: Optional[int] = None) -> List[dict]:
+    """Busca pacientes com ID_PACIENTE > after_id em ordem de ID (paginação por chave)."""
+    try:
+        with conn.cursor() as cursor:
+            await cursor.execute(*page_sql(after_id, limit))
+            use_records(cursor, PACIENTE_DATE_COLUMNS)
+            return await cursor.fetchall()
+    except oracledb.DatabaseError as e:
+        # Uma lista vazia seria lida pelo cliente como fim da paginação
+        raise RuntimeError(f"Erro no banco ao buscar página de pacientes: {e}")
+
+async def update(conn: oracledb.AsyncConnection, paciente_id: int, paciente: PacienteUpdate) -> bool:
+    """Atualiza dados do paciente (nome, email, telefone)."""
+    try:
+        with conn.cursor() as cursor:
+            if paciente.nome_paciente:
+                await cursor.execute(SQL_UPDATE_NOME, nome=paciente.nome_paciente, id=paciente_id)
+
+            update_contato = _update_contato_sql(paciente_id, paciente)
+            if update_contato:
+                await cursor.execute(*update_contato)
+
+        await conn.commit()
+        invalidar_credenciais(paciente_id=paciente_id)
+        return True
+    except Exception as e:
+        await conn.rollback()
+        print(f"Erro ao atualizar paciente: {e}")
+        return False
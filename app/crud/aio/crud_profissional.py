@@ -0,0 +1,22 @@
+import oracledb
+from typing import List
+from app.db.rows import use_records
+from app.crud.crud_profissional import SQL_GET_ALL
+from app.crud.reference_cache import reference_cache
+
+async def get_all(conn: oracledb.AsyncConnection) -> List[dict]:
+    """Busca todos os profissionais de saúde."""
+    cached = reference_cache.get_profissionais()
+    if cached is not None:
+        return cached
+
+    profissionais = []
+    try:
+        with conn.cursor() as cursor:
+            await cursor.execute(SQL_GET_ALL)
+            use_records(cursor)
+            profissionais = await cursor.fetchall()
+        return profissionais
+    except Exception as e:
+        print(f"Erro ao buscar profissionais: {e}")
+        return []
@@ -0,0 +1,37 @@
+import oracledb
+from typing import Optional
+from app.crud.crud_user import SQL_LOGIN, _row_to_user, cache_lookup, cache_store, geracao_atual
+
+async def _buscar_usuario(conn: oracledb.AsyncConnection, username: str) -> Optional[dict]:
+    """Equivalente assíncrono de crud_user._buscar_usuario."""
+    with conn.cursor() as cursor:
+        await cursor.execute(SQL_LOGIN, username=username)
+        user_data = await cursor.fetchone()
+    return _row_to_user(user_data, username) if user_data else None
+
+async def get_user_from_db(conn: oracledb.AsyncConnection, username: str) -> Optional[dict]:
+    """
+    Tenta encontrar um usuário (paciente ou colaborador) pelo username.
+    Retorna um dicionário com os dados do usuário se encontrado.
+    """
+    try:
+        return await _buscar_usuario(conn, username)
+    except oracledb.DatabaseError as e:
+        print(f"Erro ao buscar usuário: {e}")
+        return None
+
+async def get_user_cached(conn: oracledb.AsyncConnection, username: str) -> Optional[dict]:
+    """Versão assíncrona de crud_user.get_user_cached; compartilha o mesmo cache."""
+    encontrado, user = cache_lookup(username)
+    if encontrado:
+        return user
+
+    geracao = geracao_atual()
+    try:
+        user = await _buscar_usuario(conn, username)
+    except oracledb.DatabaseError as e:
+        print(f"Erro ao buscar usuário: {e}")
+        return None
+
+    cache_store(username, user, geracao)
+    return user
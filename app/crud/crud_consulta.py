@@ -1,58 +1,147 @@
 import oracledb
+from app.core.config import settings
+from app.core.pagination import SQL_FETCH_FIRST
 from app.schemas.consulta import ConsultaCreate
-from typing import List, Dict, Any, Optional
-from app.crud.crud_paciente import db_row_to_dict
-from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+from app.db.rows import use_records
+from app.core.singleflight import SingleFlight
+from app.crud.crud_disponibilidade import crud_disponibilidade
+from datetime import date, datetime, time, timedelta
 
-def create(conn: oracledb.Connection, consulta: ConsultaCreate) -> Optional[int]:
-    """Agenda uma nova consulta."""
+ID_STATUS_INICIAL = 1  # Status inicial: Agendada
+
+# Compartilhado com app.crud.aio.crud_consulta
+consultas_do_paciente = SingleFlight("consultas_do_paciente")
+
+SQL_INSERT = """
+    INSERT INTO TB_PATHMED_TELECONSULTA (
+        ID_PACIENTE, ID_PROFISSIONAL, ID_STATUS, DATA_HORA_CONSULTA
+    ) VALUES (
+        :id_pac, :id_prof, :id_status, :dt_hora
+    )
+"""
+
+SQL_INSERT_RETURNING = SQL_INSERT.rstrip() + " RETURNING ID_CONSULTA INTO :id\n"
+
+# Devolve a linha gravada (inclusive valores ajustados por default/trigger) no próprio INSERT
+SQL_INSERT_RETURNING_ROW = SQL_INSERT.rstrip() + """
+    RETURNING ID_CONSULTA, ID_PACIENTE, ID_PROFISSIONAL, ID_STATUS, DATA_HORA_CONSULTA
+    INTO :out_id, :out_pac, :out_prof, :out_status, :out_dt_hora
+"""
+
+RETURNING_COLUMNS = ("id_consulta", "id_paciente", "id_profissional", "id_status", "data_hora_consulta")
+
+def _returning_vars(cursor: Any) -> Dict[str, Any]:
+    return {
+        "out_id": cursor.var(int),
+        "out_pac": cursor.var(int),
+        "out_prof": cursor.var(int),
+        "out_status": cursor.var(int),
+        "out_dt_hora": cursor.var(oracledb.DATETIME),
+    }
+
+def _returning_row(out_vars: Dict[str, Any]) -> Dict[str, Any]:
+    return {col: var.getvalue()[0] for col, var in zip(RETURNING_COLUMNS, out_vars.values())}
+
+SQL_GET_ALL = """
+    SELECT ID_CONSULTA, ID_PACIENTE, ID_PROFISSIONAL, ID_STATUS, DATA_HORA_CONSULTA
+    FROM TB_PATHMED_TELECONSULTA
+"""
+
+def page_sql(
+    after_id: int,
+    limit: Optional[int],
+    id_profissional: Optional[int] = None,
+    id_status: Optional[int] = None,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None
+) -> Tuple[str, Dict[str, Any]]:
+    """Monta a consulta paginada com os filtros informados aplicados no próprio SQL."""
+    filtros = ["ID_CONSULTA > :after_id"]
+    params: Dict[str, Any] = {"after_id": after_id}
+    if id_profissional is not None:
+        filtros.append("ID_PROFISSIONAL = :id_prof")
+        params["id_prof"] = id_profissional
+    if id_status is not None:
+        filtros.append("ID_STATUS = :id_status")
+        params["id_status"] = id_status
+    if data_inicio is not None:
+        filtros.append("DATA_HORA_CONSULTA >= :inicio")
+        params["inicio"] = datetime.combine(data_inicio, time.min)
+    if data_fim is not None:
+        # data_fim é inclusiva
+        filtros.append("DATA_HORA_CONSULTA < :fim")
+        params["fim"] = datetime.combine(data_fim + timedelta(days=1), time.min)
+
+    sql = SQL_GET_ALL + "    WHERE " + "\n      AND ".join(filtros) + "\n    ORDER BY ID_CONSULTA"
+    if limit is not None:
+        sql += SQL_FETCH_FIRST
+        params["limit"] = limit
+    return sql, params
+
+SQL_GET_BY_PACIENTE_ID = """
+    SELECT 
+        c.ID_CONSULTA,
+        c.ID_PACIENTE,
+        c.ID_PROFISSIONAL, 
+        c.ID_STATUS,
+        c.DATA_HORA_CONSULTA,
+        p.NOME_PACIENTE,
+        ps.NOME_PROFISSIONAL_SAUDE,
+        e.DESCRICAO_ESPECIALIDADE,
+        s.DESCRICAO_STATUS
+    FROM TB_PATHMED_TELECONSULTA c
+    JOIN TB_PATHMED_PACIENTE p ON c.ID_PACIENTE = p.ID_PACIENTE
+    JOIN TB_PATHMED_PROFISSIONAL_SAUDE ps ON c.ID_PROFISSIONAL = ps.ID_PROFISSIONAL
+    JOIN TB_PATHMED_ESPECIALIDADE e ON ps.ID_ESPECIALIDADE = e.ID_ESPECIALIDADE
+    JOIN TB_PATHMED_STATUS_CONSULTA s ON c.ID_STATUS = s.ID_STATUS
+    WHERE c.ID_PACIENTE = :paciente_id
+    ORDER BY c.DATA_HORA_CONSULTA DESC
+"""
+
+SQL_UPDATE_STATUS = """
+    UPDATE TB_PATHMED_TELECONSULTA
+    SET ID_STATUS = :status
+    WHERE ID_CONSULTA = :id
+    RETURNING ID_PROFISSIONAL, DATA_HORA_CONSULTA INTO :id_prof, :dt_hora
+"""
+
+def _insert_params(consulta: ConsultaCreate) -> Dict[str, Any]:
+    return {
+        "id_pac": consulta.id_paciente,
+        "id_prof": consulta.id_profissional,
+        "id_status": ID_STATUS_INICIAL,
+        "dt_hora": consulta.data_hora_consulta
+    }
+
+def create(conn: oracledb.Connection, consulta: ConsultaCreate) -> Optional[Dict[str, Any]]:
+    """
+    Agenda uma nova consulta em uma única ida ao banco (INSERT ... RETURNING INTO)
+    e um commit. Retorna a linha gravada.
+    Lança oracledb.IntegrityError para o endpoint mapear conflito/FK.
+    """
     try:
         print(f"🎯 Tentando criar consulta: paciente={consulta.id_paciente}, profissional={consulta.id_profissional}, data={consulta.data_hora_consulta}")
 
-        id_status_inicial = 1  # Status inicial: Agendada
-        
         with conn.cursor() as cursor:
-            # Primeiro fazer o INSERT
-            cursor.execute("""
-                INSERT INTO TB_PATHMED_TELECONSULTA (
-                    ID_PACIENTE, ID_PROFISSIONAL, ID_STATUS, DATA_HORA_CONSULTA
-                ) VALUES (
-                    :id_pac, :id_prof, :id_status, :dt_hora
-                )
-            """, {
-                "id_pac": consulta.id_paciente,
-                "id_prof": consulta.id_profissional,
-                "id_status": id_status_inicial,
-                "dt_hora": consulta.data_hora_consulta
-            })
-            
+            out_vars = _returning_vars(cursor)
+            cursor.execute(SQL_INSERT_RETURNING_ROW, {**_insert_params(consulta), **out_vars})
             conn.commit()
-            print("✅ INSERT executado com sucesso")
-            
-            # Buscar o ID da consulta recém-criada
-            cursor.execute("""
-                SELECT ID_CONSULTA FROM TB_PATHMED_TELECONSULTA 
-                WHERE ID_PACIENTE = :id_pac 
-                AND ID_PROFISSIONAL = :id_prof 
-                AND DATA_HORA_CONSULTA = :dt_hora
-                AND ID_STATUS = :id_status
-                ORDER BY ID_CONSULTA DESC
-            """, {
-                "id_pac": consulta.id_paciente,
-                "id_prof": consulta.id_profissional, 
-                "dt_hora": consulta.data_hora_consulta,
-                "id_status": id_status_inicial
-            })
-            
-            result = cursor.fetchone()
-            if result:
-                consulta_id = result[0]
-                print(f"✅ Consulta criada com ID: {consulta_id}")
-                return consulta_id
-            else:
-                print("❌ Não foi possível obter o ID da consulta criada")
-                return None
-            
+
+        consulta_db = _returning_row(out_vars)
+        print(f"✅ Consulta criada com ID: {consulta_db['id_consulta']}")
+
+        # O horário deixou de estar livre: atualiza o índice de agenda e o cache
+        crud_disponibilidade.registrar_consulta(
+            consulta_db["id_consulta"], consulta_db["id_profissional"],
+            consulta_db["data_hora_consulta"], consulta_db["id_status"]
+        )
+        return consulta_db
+
+    except oracledb.IntegrityError as e:
+        conn.rollback()
+        print(f"Erro de integridade ao criar consulta: {e}")
+        raise e
     except Exception as e:
         conn.rollback()
         print(f"❌ Erro ao criar consulta: {str(e)}")
@@ -61,67 +150,140 @@ def create(conn: oracledb.Connection, consulta: ConsultaCreate) -> Optional[int]
         print(f"🔍 Stack trace completo: {traceback.format_exc()}")
         return None
 
+def _batch_error_resultado(indice: int, error: Any) -> Dict[str, Any]:
+    """Converte um erro de executemany(batcherrors=True) em um item do relatório."""
+    if error.code == 1:  # Unique constraint violation
+        return {"indice": indice, "status": "conflito", "id_consulta": None,
+                "detalhe": "Já existe uma consulta agendada para este horário"}
+    if error.code == 2291:  # Foreign key violation
+        return {"indice": indice, "status": "referencia_invalida", "id_consulta": None,
+                "detalhe": "Paciente ou profissional não encontrado"}
+    return {"indice": indice, "status": "erro", "id_consulta": None, "detalhe": error.message}
+
+def _create_chunk(conn: oracledb.Connection, offset: int, consultas: List[ConsultaCreate]) -> List[Dict[str, Any]]:
+    """Insere um lote com executemany + batcherrors, RETURNING dos IDs e um único commit."""
+    resultados: Dict[int, Dict[str, Any]] = {}
+
+    with conn.cursor() as cursor:
+        ids = cursor.var(int, arraysize=len(consultas))
+        cursor.setinputsizes(id=ids)
+        cursor.executemany(SQL_INSERT_RETURNING, [_insert_params(c) for c in consultas], batcherrors=True)
+        for error in cursor.getbatcherrors():
+            resultados[error.offset] = _batch_error_resultado(offset + error.offset, error)
+
+    conn.commit()
+
+    for i, consulta in enumerate(consultas):
+        if i not in resultados:
+            resultados[i] = {"indice": offset + i, "status": "agendada", "id_consulta": ids.getvalue(i)[0], "detalhe": None}
+
+    return [resultados[i] for i in range(len(consultas))]
+
+def create_many(conn: oracledb.Connection, consultas: List[ConsultaCreate]) -> List[Dict[str, Any]]:
+    """
+    Agenda várias consultas em lotes de BULK_CHUNK_SIZE, com um commit por lote.
+    Conflitos de horário e paciente/profissional inexistente são reportados por
+    item ('conflito', 'referencia_invalida') sem derrubar o restante.
+    """
+    resultados: List[Dict[str, Any]] = []
+    chunk_size = max(1, settings.BULK_CHUNK_SIZE)
+
+    for offset in range(0, len(consultas), chunk_size):
+        chunk = consultas[offset:offset + chunk_size]
+        try:
+            resultados.extend(_create_chunk(conn, offset, chunk))
+        except Exception as e:
+            conn.rollback()
+            print(f"Erro ao agendar lote de consultas (a partir do índice {offset}): {e}")
+            resultados.extend(
+                {"indice": offset + i, "status": "erro", "id_consulta": None, "detalhe": str(e)}
+                for i in range(len(chunk))
+            )
+
+    # Os horários agendados deixaram de estar livres
+    for r in resultados:
+        if r["status"] == "agendada":
+            consulta = consultas[r["indice"]]
+            crud_disponibilidade.registrar_consulta(
+                r["id_consulta"], consulta.id_profissional, consulta.data_hora_consulta, ID_STATUS_INICIAL
+            )
+
+    return resultados
+
 def get_all(conn: oracledb.Connection) -> List[dict]:
     """Busca todas as consultas."""
     consultas = []
     try:
         with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT ID_CONSULTA, ID_PACIENTE, ID_PROFISSIONAL, ID_STATUS, DATA_HORA_CONSULTA
-                FROM TB_PATHMED_TELECONSULTA
-            """)
-            for row in cursor:
-                consultas.append(db_row_to_dict(cursor, row))
+            cursor.execute(SQL_GET_ALL)
+            use_records(cursor)
+            consultas = cursor.fetchall()
         return consultas
     except Exception as e:
         print(f"Erro ao buscar consultas: {e}")
         return []
 
-def get_by_paciente_id(conn: oracledb.Connection, paciente_id: int) -> List[dict]:
-    """✅ NOVO: Busca consultas por ID do paciente com detalhes expandidos."""
+def get_page(
+    conn: oracledb.Connection,
+    after_id: int = 0,
+    limit: Optional[int] = None,
+    id_profissional: Optional[int] = None,
+    id_status: Optional[int] = None,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None
+) -> List[dict]:
+    """
+    Busca consultas com ID_CONSULTA > after_id em ordem de ID (paginação por chave),
+    filtrando por profissional, status e intervalo de datas no próprio SQL.
+    Sem `limit`, retorna todas a partir de after_id.
+    """
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(*page_sql(after_id, limit, id_profissional, id_status, data_inicio, data_fim))
+            use_records(cursor)
+            return cursor.fetchall()
+    except oracledb.DatabaseError as e:
+        # Uma lista vazia seria lida pelo cliente como fim da paginação
+        raise RuntimeError(f"Erro no banco ao buscar página de consultas: {e}")
+
+def _fetch_by_paciente_id(conn: oracledb.Connection, paciente_id: int) -> List[dict]:
     consultas = []
     try:
         with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT 
-                    c.ID_CONSULTA,
-                    c.ID_PACIENTE,
-                    c.ID_PROFISSIONAL, 
-                    c.ID_STATUS,
-                    c.DATA_HORA_CONSULTA,
-                    p.NOME_PACIENTE,
-                    ps.NOME_PROFISSIONAL_SAUDE,
-                    e.DESCRICAO_ESPECIALIDADE,
-                    s.DESCRICAO_STATUS
-                FROM TB_PATHMED_TELECONSULTA c
-                JOIN TB_PATHMED_PACIENTE p ON c.ID_PACIENTE = p.ID_PACIENTE
-                JOIN TB_PATHMED_PROFISSIONAL_SAUDE ps ON c.ID_PROFISSIONAL = ps.ID_PROFISSIONAL
-                JOIN TB_PATHMED_ESPECIALIDADE e ON ps.ID_ESPECIALIDADE = e.ID_ESPECIALIDADE
-                JOIN TB_PATHMED_STATUS_CONSULTA s ON c.ID_STATUS = s.ID_STATUS
-                WHERE c.ID_PACIENTE = :paciente_id
-                ORDER BY c.DATA_HORA_CONSULTA DESC
-            """, paciente_id=paciente_id)
+            cursor.execute(SQL_GET_BY_PACIENTE_ID, paciente_id=paciente_id)
             
-            for row in cursor:
-                consulta_dict = db_row_to_dict(cursor, row)
-                consultas.append(consulta_dict)
+            use_records(cursor)
+            consultas = cursor.fetchall()
                 
         return consultas
     except Exception as e:
         print(f"Erro ao buscar consultas do paciente {paciente_id}: {e}")
         return []
 
+def get_by_paciente_id(conn: oracledb.Connection, paciente_id: int) -> List[dict]:
+    """
+    ✅ NOVO: Busca consultas por ID do paciente com detalhes expandidos.
+    Chamadas concorrentes para o mesmo paciente compartilham uma única consulta
+    ao banco; a lista retornada não deve ser alterada.
+    """
+    # A geração da agenda na chave garante que quem chega depois de uma escrita
+    # não recebe um resultado calculado antes dela
+    chave = (paciente_id, crud_disponibilidade.geracao)
+    return consultas_do_paciente.do(chave, lambda: _fetch_by_paciente_id(conn, paciente_id))
+
 def update_status(conn: oracledb.Connection, consulta_id: int, new_status_id: int) -> bool:
     """Atualiza o status de uma consulta."""
     try:
         with conn.cursor() as cursor:
-            cursor.execute("""
-                UPDATE TB_PATHMED_TELECONSULTA
-                SET ID_STATUS = :status
-                WHERE ID_CONSULTA = :id
-            """, status=new_status_id, id=consulta_id)
+            id_prof = cursor.var(int)
+            dt_hora = cursor.var(oracledb.DATETIME)
+            cursor.execute(SQL_UPDATE_STATUS, status=new_status_id, id=consulta_id, id_prof=id_prof, dt_hora=dt_hora)
             
             conn.commit()
+
+            if cursor.rowcount > 0:
+                # Mudança de status pode liberar ou ocupar o horário
+                crud_disponibilidade.registrar_consulta(consulta_id, id_prof.getvalue()[0], dt_hora.getvalue()[0], new_status_id)
             return cursor.rowcount > 0
             
     except Exception as e:
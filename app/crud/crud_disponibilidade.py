@@ -1,33 +1,103 @@
 # app/crud/crud_disponibilidade.py
 
 import oracledb
-from app.schemas.disponibilidade import ProfissionalResumido, HorarioDisponivel
+import threading
+from app.core.cache import TTLCache
+from app.core.metrics import metrics
+from app.core.singleflight import SingleFlight
+from app.core.config import settings
+from app.crud.reference_cache import reference_cache
+from app.db.database import acquire_connection
+from app.crud.schedule_index import (
+    schedule_index, mascaras_por_dia, HORA_INICIO, HORA_FIM, MINUTOS_POR_SLOT
+)
+from app.schemas.disponibilidade import (
+    ProfissionalResumido, HorarioDisponivel, DisponibilidadeDia, HorarioLivre, ProximosHorarios
+)
 from datetime import date, time, datetime, timedelta
-from typing import List
+from typing import Dict, Iterator, List, Set, Tuple
+
+SQL_NOME_ESPECIALIDADE = "SELECT DESCRICAO_ESPECIALIDADE FROM TB_PATHMED_ESPECIALIDADE WHERE ID_ESPECIALIDADE = :id_especialidade"
+
+SQL_PROFISSIONAIS_DA_ESPECIALIDADE = """
+    SELECT 
+        ps.ID_PROFISSIONAL, 
+        ps.NOME_PROFISSIONAL_SAUDE, 
+        e.DESCRICAO_ESPECIALIDADE
+    FROM 
+        TB_PATHMED_PROFISSIONAL_SAUDE ps
+    JOIN 
+        TB_PATHMED_ESPECIALIDADE e ON ps.ID_ESPECIALIDADE = e.ID_ESPECIALIDADE
+    WHERE 
+        ps.ID_ESPECIALIDADE = :id_especialidade
+    ORDER BY ps.NOME_PROFISSIONAL_SAUDE
+"""
+
+SQL_HORARIOS_OCUPADOS = """
+    SELECT 
+        tc.ID_PROFISSIONAL, 
+        tc.DATA_HORA_CONSULTA
+    FROM 
+        TB_PATHMED_TELECONSULTA tc
+    JOIN 
+        TB_PATHMED_PROFISSIONAL_SAUDE ps ON tc.ID_PROFISSIONAL = ps.ID_PROFISSIONAL
+    WHERE 
+        ps.ID_ESPECIALIDADE = :id_especialidade
+        AND tc.DATA_HORA_CONSULTA >= :inicio
+        AND tc.DATA_HORA_CONSULTA < :fim
+        AND tc.ID_STATUS IN (1, 2) -- Agendada (1) ou Confirmada (2)
+"""
+
+def _row_to_profissional(row: tuple) -> ProfissionalResumido:
+    return ProfissionalResumido(
+        id_profissional=row[0],
+        nome_profissional_saude=row[1],
+        descricao_especialidade=row[2]
+    )
 
 class CRUDDisponibilidade:
+
+    def __init__(self):
+        # Cache de disponibilidade por (id_especialidade, data)
+        self.cache = TTLCache(
+            max_entries=settings.DISPONIBILIDADE_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.DISPONIBILIDADE_CACHE_TTL_SECONDS
+        )
+        # Especialidade de cada profissional já visto, para invalidar só a entrada afetada
+        self._especialidade_por_profissional: Dict[int, int] = {}
+        # Incrementada a cada invalidação; impede gravar no cache um resultado
+        # calculado antes de uma escrita concorrente
+        self._geracao = 0
+        self._lock = threading.Lock()
+        # Cálculos em andamento por (id_especialidade, data, geração)
+        self.singleflight = SingleFlight("disponibilidade")
+
+    @property
+    def geracao(self) -> int:
+        """Incrementada a cada escrita na agenda feita por este processo."""
+        return self._geracao
     
     def _gerar_horarios_do_dia(self, data: date) -> List[HorarioDisponivel]:
-        """Gera lista de slots de 30 minutos das 8:00 às 18:00."""
+        """Gera lista de slots de 30 minutos das 8:00 às 18:00 (grade de app.crud.schedule_index)."""
         horarios: List[HorarioDisponivel] = []
-        hora_inicio = time(8, 0)
-        hora_fim = time(18, 0)
 
-        data_hora_atual = datetime.combine(data, hora_inicio)
-        data_hora_fim = datetime.combine(data, hora_fim)
+        data_hora_atual = datetime.combine(data, HORA_INICIO)
+        data_hora_fim = datetime.combine(data, HORA_FIM)
         
         while data_hora_atual < data_hora_fim:
             horarios.append(HorarioDisponivel(data_hora=data_hora_atual)) 
-            data_hora_atual += timedelta(minutes=30) 
+            data_hora_atual += timedelta(minutes=MINUTOS_POR_SLOT) 
 
         return horarios
 
     def find_nome_especialidade_by_id(self, conn: "oracledb.Connection", id_especialidade: int) -> str:
         """Busca nome da especialidade por ID."""
-        sql = "SELECT DESCRICAO_ESPECIALIDADE FROM TB_PATHMED_ESPECIALIDADE WHERE ID_ESPECIALIDADE = :id_especialidade"
-        
+        nome = reference_cache.get_nome_especialidade(id_especialidade)
+        if nome is not None:
+            return nome
+
         cursor = conn.cursor()
-        cursor.execute(sql, [id_especialidade])
+        cursor.execute(SQL_NOME_ESPECIALIDADE, [id_especialidade])
         
         row = cursor.fetchone()
         cursor.close()
@@ -86,5 +156,305 @@ class CRUDDisponibilidade:
 
         return profissionais
 
+    def find_profissionais_by_especialidade(
+        self,
+        conn: "oracledb.Connection",
+        id_especialidade: int
+    ) -> List[ProfissionalResumido]:
+        """Busca, uma única vez, todos os profissionais da especialidade ordenados por nome."""
+        cached = reference_cache.get_profissionais_da_especialidade(id_especialidade)
+        if cached is not None:
+            return cached
+
+        profissionais: List[ProfissionalResumido] = []
+
+        cursor = conn.cursor()
+        try:
+            cursor.execute(SQL_PROFISSIONAIS_DA_ESPECIALIDADE, id_especialidade=id_especialidade)
+
+            for row in cursor:
+                profissionais.append(_row_to_profissional(row))
+
+        except oracledb.DatabaseError as e:
+            raise RuntimeError(f"Erro no banco ao buscar profissionais da especialidade: {e}")
+        finally:
+            cursor.close()
+
+        return profissionais
+
+    def find_horarios_ocupados(
+        self,
+        conn: "oracledb.Connection",
+        id_especialidade: int,
+        inicio: datetime,
+        fim: datetime
+    ) -> Set[Tuple[int, datetime]]:
+        """
+        Busca, em uma única varredura, as consultas agendadas/confirmadas dos
+        profissionais da especialidade no intervalo [inicio, fim).
+        Retorna um conjunto de pares (id_profissional, data_hora).
+        """
+        ocupados: Set[Tuple[int, datetime]] = set()
+
+        cursor = conn.cursor()
+        try:
+            cursor.execute(SQL_HORARIOS_OCUPADOS, id_especialidade=id_especialidade, inicio=inicio, fim=fim)
+
+            for row in cursor:
+                ocupados.add((row[0], row[1]))
+
+        except oracledb.DatabaseError as e:
+            raise RuntimeError(f"Erro no banco ao buscar consultas agendadas: {e}")
+        finally:
+            cursor.close()
+
+        return ocupados
+
+    def _montar_horarios(
+        self,
+        data: date,
+        profissionais: List[ProfissionalResumido],
+        mascaras: Dict[int, int]
+    ) -> List[HorarioDisponivel]:
+        """
+        Monta a grade do dia em memória a partir dos profissionais e dos bits de
+        slots ocupados de cada um ({id_profissional: mascara}).
+        """
+        horarios = self._gerar_horarios_do_dia(data)
+        if not profissionais:
+            return horarios
+
+        ocupacao = [(p, mascaras.get(p.id_profissional, 0)) for p in profissionais]
+        # Slots em que todos os profissionais estão ocupados não precisam ser percorridos
+        todos_ocupados = -1
+        for _, mascara in ocupacao:
+            todos_ocupados &= mascara
+
+        for slot, horario in enumerate(horarios):
+            bit = 1 << slot
+            if todos_ocupados & bit:
+                continue
+            horario.profissionais_disponiveis.extend(p for p, mascara in ocupacao if not mascara & bit)
+
+        return horarios
+
+    def get_disponibilidade_do_dia(
+        self,
+        conn: "oracledb.Connection",
+        data: date,
+        id_especialidade: int
+    ) -> DisponibilidadeDia:
+        """
+        Monta a disponibilidade do dia com consultas em conjunto: uma para os
+        profissionais da especialidade e uma para as consultas ocupadas do dia,
+        em vez de uma consulta por slot de 30 minutos.
+        """
+        return next(self.get_disponibilidade_intervalo(conn, data, data, id_especialidade))
+
+    def get_disponibilidade_do_dia_cached(
+        self,
+        conn: "oracledb.Connection",
+        data: date,
+        id_especialidade: int
+    ) -> DisponibilidadeDia:
+        """
+        Versão com cache de get_disponibilidade_do_dia. O objeto retornado é
+        compartilhado entre requisições e não deve ser alterado.
+        """
+        chave = (id_especialidade, data)
+        disponibilidade_dia = self.cache.get(chave)
+        if disponibilidade_dia is not None:
+            return disponibilidade_dia
+
+        geracao = self._geracao
+        disponibilidade_dia = self.get_disponibilidade_do_dia(conn, data, id_especialidade)
+        self._guardar_em_cache(chave, disponibilidade_dia, geracao)
+
+        return disponibilidade_dia
+
+    def get_disponibilidade_do_dia_compartilhada(self, data: date, id_especialidade: int) -> DisponibilidadeDia:
+        """
+        Como get_disponibilidade_do_dia_cached, mas sem conexão do chamador:
+        requisições concorrentes pela mesma especialidade e data compartilham um
+        único cálculo, e só quem calcula adquire uma conexão do pool.
+        """
+        chave = (id_especialidade, data)
+        disponibilidade_dia = self.cache.get(chave)
+        if disponibilidade_dia is not None:
+            return disponibilidade_dia
+
+        geracao = self._geracao
+
+        def calcular() -> DisponibilidadeDia:
+            with acquire_connection(leitura=True) as conn:
+                resultado = self.get_disponibilidade_do_dia(conn, data, id_especialidade)
+            self._guardar_em_cache(chave, resultado, geracao)
+            return resultado
+
+        return self.singleflight.do(chave + (geracao,), calcular)
+
+    def _guardar_em_cache(self, chave: Tuple[int, date], disponibilidade_dia: DisponibilidadeDia, geracao: int) -> None:
+        """Só grava se nenhuma invalidação ocorreu desde que o cálculo começou."""
+        with self._lock:
+            if geracao == self._geracao:
+                self.cache.set(chave, disponibilidade_dia)
+
+    def invalidar_cache(self, id_profissional: int, data: date) -> int:
+        """
+        Remove do cache a disponibilidade afetada por uma escrita na agenda do
+        profissional. Se a especialidade dele ainda não é conhecida, invalida
+        todas as especialidades daquela data.
+        """
+        with self._lock:
+            self._geracao += 1
+            id_especialidade = reference_cache.get_especialidade_do_profissional(id_profissional)
+            if id_especialidade is None:
+                id_especialidade = self._especialidade_por_profissional.get(id_profissional)
+
+        if id_especialidade is not None:
+            return int(self.cache.pop((id_especialidade, data)))
+        return self.cache.invalidate_where(lambda chave: chave[1] == data)
+
+    def registrar_consulta(self, id_consulta: int, id_profissional: int, data_hora: datetime, id_status: int) -> None:
+        """
+        Aplica ao índice de agenda uma escrita já commitada (agendamento ou
+        mudança de status) e invalida a disponibilidade em cache daquele dia.
+        """
+        schedule_index.registrar(id_consulta, id_profissional, data_hora, id_status)
+        self.invalidar_cache(id_profissional, data_hora.date())
+
+    def get_disponibilidade_intervalo(
+        self,
+        conn: "oracledb.Connection",
+        data_inicio: date,
+        data_fim: date,
+        id_especialidade: int
+    ) -> Iterator[DisponibilidadeDia]:
+        """
+        Busca os dados de todo o intervalo [data_inicio, data_fim] de uma vez
+        (profissionais + uma varredura limitada de TB_PATHMED_TELECONSULTA) e
+        devolve um iterador que monta cada dia em memória, sob demanda.
+        As consultas ao banco acontecem nesta chamada, não durante a iteração.
+        """
+        profissionais = self.find_profissionais_by_especialidade(conn, id_especialidade)
+        self._registrar_profissionais(profissionais, id_especialidade)
+
+        # O nome já vem no JOIN; só consulta a tabela se não houver profissionais
+        if profissionais:
+            nome_especialidade = profissionais[0].descricao_especialidade
+        else:
+            nome_especialidade = self.find_nome_especialidade_by_id(conn, id_especialidade)
+
+        mascaras: Dict[date, Dict[int, int]] = {}
+        if profissionais:
+            # Do índice em memória quando o intervalo está na janela; senão, do banco
+            mascaras = schedule_index.mascaras_intervalo(data_inicio, data_fim)
+            if mascaras is None:
+                inicio, fim = self._limites_intervalo(data_inicio, data_fim)
+                mascaras = mascaras_por_dia(self.find_horarios_ocupados(conn, id_especialidade, inicio, fim))
+
+        return self._iterar_dias(data_inicio, data_fim, id_especialidade, nome_especialidade, profissionais, mascaras)
+
+    def get_proximos_horarios(
+        self,
+        conn: "oracledb.Connection",
+        id_especialidade: int,
+        a_partir_de: datetime,
+        quantidade: int
+    ) -> ProximosHorarios:
+        """
+        Primeiros `quantidade` pares (profissional, horário) livres a partir de
+        `a_partir_de`, em ordem de horário e, no mesmo horário, de nome.
+        Varre no máximo DISPONIBILIDADE_BUSCA_MAX_DIAS dias, em blocos de
+        DISPONIBILIDADE_BUSCA_DIAS_POR_CONSULTA dias com uma consulta cada
+        (nenhuma quando o bloco está no índice de agenda).
+        """
+        profissionais = self.find_profissionais_by_especialidade(conn, id_especialidade)
+        self._registrar_profissionais(profissionais, id_especialidade)
+        if profissionais:
+            nome_especialidade = profissionais[0].descricao_especialidade
+        else:
+            nome_especialidade = self.find_nome_especialidade_by_id(conn, id_especialidade)
+
+        resultado = ProximosHorarios(
+            id_especialidade=id_especialidade,
+            nome_especialidade=nome_especialidade,
+            a_partir_de=a_partir_de,
+            dias_verificados=0
+        )
+        for bloco_inicio, bloco_fim in self._blocos_de_busca(a_partir_de.date(), profissionais):
+            mascaras = schedule_index.mascaras_intervalo(bloco_inicio, bloco_fim)
+            if mascaras is None:
+                inicio, fim = self._limites_intervalo(bloco_inicio, bloco_fim)
+                mascaras = mascaras_por_dia(self.find_horarios_ocupados(conn, id_especialidade, inicio, fim))
+            if self._coletar_livres(resultado, bloco_inicio, bloco_fim, profissionais, mascaras, quantidade):
+                break
+
+        return resultado
+
+    def _blocos_de_busca(self, data_inicio: date, profissionais: List[ProfissionalResumido]) -> Iterator[Tuple[date, date]]:
+        """Intervalos [inicio, fim] (inclusivos) a varrer, até o limite de dias da busca."""
+        if not profissionais:
+            return
+        max_dias = max(1, settings.DISPONIBILIDADE_BUSCA_MAX_DIAS)
+        por_bloco = max(1, settings.DISPONIBILIDADE_BUSCA_DIAS_POR_CONSULTA)
+        for deslocamento in range(0, max_dias, por_bloco):
+            inicio = data_inicio + timedelta(days=deslocamento)
+            fim = data_inicio + timedelta(days=min(deslocamento + por_bloco, max_dias) - 1)
+            yield inicio, fim
+
+    def _coletar_livres(
+        self,
+        resultado: ProximosHorarios,
+        data_inicio: date,
+        data_fim: date,
+        profissionais: List[ProfissionalResumido],
+        mascaras: Dict[date, Dict[int, int]],
+        quantidade: int
+    ) -> bool:
+        """Acrescenta ao resultado os horários livres do bloco. Retorna True ao atingir `quantidade`."""
+        data = data_inicio
+        while data <= data_fim:
+            resultado.dias_verificados += 1
+            for horario in self._montar_horarios(data, profissionais, mascaras.get(data, {})):
+                if horario.data_hora < resultado.a_partir_de:
+                    continue
+                for profissional in horario.profissionais_disponiveis:
+                    resultado.horarios.append(HorarioLivre(data_hora=horario.data_hora, profissional=profissional))
+                    if len(resultado.horarios) >= quantidade:
+                        return True
+            data += timedelta(days=1)
+        return False
+
+    def _registrar_profissionais(self, profissionais: List[ProfissionalResumido], id_especialidade: int) -> None:
+        for profissional in profissionais:
+            self._especialidade_por_profissional[profissional.id_profissional] = id_especialidade
+
+    def _limites_intervalo(self, data_inicio: date, data_fim: date) -> Tuple[datetime, datetime]:
+        """Converte [data_inicio, data_fim] (inclusivo) em [inicio, fim) de datetimes."""
+        inicio = datetime.combine(data_inicio, time.min)
+        fim = datetime.combine(data_fim + timedelta(days=1), time.min)
+        return inicio, fim
+
+    def _iterar_dias(
+        self,
+        data_inicio: date,
+        data_fim: date,
+        id_especialidade: int,
+        nome_especialidade: str,
+        profissionais: List[ProfissionalResumido],
+        mascaras: Dict[date, Dict[int, int]]
+    ) -> Iterator[DisponibilidadeDia]:
+        data = data_inicio
+        while data <= data_fim:
+            yield DisponibilidadeDia(
+                data=data,
+                id_especialidade=id_especialidade,
+                nome_especialidade=nome_especialidade,
+                horarios=self._montar_horarios(data, profissionais, mascaras.get(data, {}))
+            )
+            data += timedelta(days=1)
+
 # Cria uma instância singleton para ser usada no endpoint
-crud_disponibilidade = CRUDDisponibilidade()
\ No newline at end of file
+crud_disponibilidade = CRUDDisponibilidade()
+metrics.register_cache("disponibilidade", crud_disponibilidade.cache.stats)
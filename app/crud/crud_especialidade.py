@@ -1,15 +1,22 @@
 import oracledb
 from typing import List, Dict, Any
-from app.crud.crud_paciente import db_row_to_dict # Reutilizando a função helper
+from app.db.rows import use_records
+from app.crud.reference_cache import reference_cache
+
+SQL_GET_ALL = "SELECT ID_ESPECIALIDADE, DESCRICAO_ESPECIALIDADE FROM TB_PATHMED_ESPECIALIDADE"
 
 def get_all(conn: oracledb.Connection) -> List[dict]:
     """Busca todas as especialidades."""
+    cached = reference_cache.get_especialidades()
+    if cached is not None:
+        return cached
+
     especialidades = []
     try:
         with conn.cursor() as cursor:
-            cursor.execute("SELECT ID_ESPECIALIDADE, DESCRICAO_ESPECIALIDADE FROM TB_PATHMED_ESPECIALIDADE")
-            for row in cursor:
-                especialidades.append(db_row_to_dict(cursor, row))
+            cursor.execute(SQL_GET_ALL)
+            use_records(cursor)
+            especialidades = cursor.fetchall()
         return especialidades
     except Exception as e:
         print(f"Erro ao buscar especialidades: {e}")
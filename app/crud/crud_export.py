@@ -0,0 +1,85 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional
+import oracledb
+from app.core.config import settings
+from app.crud import crud_consulta, crud_paciente
+
+FORMATOS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+def stream_rows(conn: oracledb.Connection, sql: str, params: Dict[str, Any], formato: str) -> Iterator[str]:
+    """
+    Executa a consulta e busca o primeiro lote antes de devolver o gerador, para
+    que erros do banco aconteçam ainda no endpoint (e virem 4xx/5xx) e não no
+    meio de uma resposta 200 já iniciada. O gerador devolve as linhas já
+    serializadas, um bloco por ida ao banco (fetchmany com arraysize grande).
+    A conexão vem do endpoint (get_read_connection) e é liberada quando o
+    streaming termina.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.arraysize = settings.EXPORT_ARRAYSIZE
+        cursor.prefetchrows = settings.EXPORT_ARRAYSIZE + 1
+        cursor.execute(sql, params)
+        columns = [col[0].lower() for col in cursor.description]
+        rows = cursor.fetchmany()
+    except BaseException:
+        cursor.close()
+        raise
+    return _serializar(cursor, columns, rows, formato)
+
+def _serializar(cursor: oracledb.Cursor, columns: List[str], rows: List[tuple], formato: str) -> Iterator[str]:
+    with cursor:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer) if formato == "csv" else None
+        if writer:
+            writer.writerow(columns)
+
+        while rows:
+            if writer:
+                writer.writerows([_csv_value(v) for v in row] for row in rows)
+            else:
+                for row in rows:
+                    buffer.write(json.dumps(dict(zip(columns, row)), default=_json_default, ensure_ascii=False))
+                    buffer.write("\n")
+
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            rows = cursor.fetchmany()
+
+        # Cabeçalho do CSV quando não houve nenhuma linha
+        if buffer.tell():
+            yield buffer.getvalue()
+
+def export_consultas(
+    conn: oracledb.Connection,
+    formato: str,
+    id_profissional: Optional[int] = None,
+    id_status: Optional[int] = None,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None
+) -> Iterator[str]:
+    """Exporta as consultas em ordem de ID, com os mesmos filtros da listagem."""
+    sql, params = crud_consulta.page_sql(0, None, id_profissional, id_status, data_inicio, data_fim)
+    return stream_rows(conn, sql, params, formato)
+
+def export_pacientes(conn: oracledb.Connection, formato: str) -> Iterator[str]:
+    """Exporta os pacientes em ordem de ID."""
+    sql, params = crud_paciente.page_sql(0, None)
+    return stream_rows(conn, sql, params, formato)
@@ -1,12 +1,130 @@
 import oracledb
+from app.core.config import settings
+from app.core.pagination import SQL_FETCH_FIRST
+from app.crud.crud_user import invalidar_credenciais
+from app.db.rows import use_records
 from app.schemas.paciente import PacienteCreate, PacienteUpdate
 # Não importamos mais o get_password_hash
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 
 def db_row_to_dict(cursor: oracledb.Cursor, row: tuple) -> Dict[str, Any]:
-    """Converte uma linha do cursor (tuple) em um dicionário (chave=coluna)."""
+    """
+    Converte uma linha do cursor (tuple) em um dicionário (chave=coluna).
+    As consultas do CRUD usam app.db.rows.use_records, que resolve as colunas uma
+    vez por cursor; esta função fica para quem ainda precisa de um dict avulso.
+    """
     return {col[0].lower(): val for col, val in zip(cursor.description, row)}
 
+# Colunas DATE expostas como `date` em PacienteRead
+PACIENTE_DATE_COLUMNS = ("data_nascimento",)
+
+SQL_INSERT_PACIENTE = """
+    INSERT INTO TB_PATHMED_PACIENTE (
+        IDENTIFICADOR_RGHC, CPF_PACIENTE, NOME_PACIENTE, 
+        DATA_NASCIMENTO, TIPO_SANGUINEO
+    ) VALUES (
+        :rghc, :cpf, :nome, :dt_nasc, :sangue
+    ) RETURNING ID_PACIENTE INTO :id
+"""
+
+SQL_INSERT_CONTATO = """
+    INSERT INTO TB_PATHMED_CONTATO_PACIENTE (
+        ID_PACIENTE, EMAIL_PACIENTE, TELEFONE_PACIENTE
+    ) VALUES (
+        :id_pac, :email, :tel
+    )
+"""
+
+SQL_INSERT_LOGIN = """
+    INSERT INTO TB_PATHMED_LOGIN_PACIENTE (
+        ID_PACIENTE, USUARIO_LOGIN, SENHA_LOGIN
+    ) VALUES (
+        :id_pac, :user, :pass
+    )
+"""
+
+SQL_DELETE_CONTATO = "DELETE FROM TB_PATHMED_CONTATO_PACIENTE WHERE ID_PACIENTE = :id_pac"
+
+SQL_DELETE_PACIENTE = "DELETE FROM TB_PATHMED_PACIENTE WHERE ID_PACIENTE = :id_pac"
+
+# Restrições únicas de CPF e e-mail (mesmas checadas no registro individual)
+UNIQUE_CONSTRAINTS_CONFLITO = ("TB_PACIENTE_CPF_PAC_UC", "TB_CTT_PACIENTE_EMAIL_PA_UC")
+
+SQL_GET_BY_ID = """
+    SELECT 
+        p.ID_PACIENTE, p.IDENTIFICADOR_RGHC, p.CPF_PACIENTE,
+        p.NOME_PACIENTE, p.DATA_NASCIMENTO, p.TIPO_SANGUINEO,
+        c.EMAIL_PACIENTE, c.TELEFONE_PACIENTE
+    FROM TB_PATHMED_PACIENTE p
+    JOIN TB_PATHMED_CONTATO_PACIENTE c ON p.ID_PACIENTE = c.ID_PACIENTE
+    WHERE p.ID_PACIENTE = :id
+"""
+
+SQL_GET_ALL = """
+    SELECT 
+        p.ID_PACIENTE, p.IDENTIFICADOR_RGHC, p.CPF_PACIENTE,
+        p.NOME_PACIENTE, p.DATA_NASCIMENTO, p.TIPO_SANGUINEO,
+        c.EMAIL_PACIENTE, c.TELEFONE_PACIENTE
+    FROM TB_PATHMED_PACIENTE p
+    LEFT JOIN TB_PATHMED_CONTATO_PACIENTE c ON p.ID_PACIENTE = c.ID_PACIENTE
+"""
+
+SQL_GET_PAGE = SQL_GET_ALL + """
+    WHERE p.ID_PACIENTE > :after_id
+    ORDER BY p.ID_PACIENTE
+"""
+
+SQL_UPDATE_NOME = """
+    UPDATE TB_PATHMED_PACIENTE
+    SET NOME_PACIENTE = :nome
+    WHERE ID_PACIENTE = :id
+"""
+
+def page_sql(after_id: int, limit: Optional[int]) -> Tuple[str, Dict[str, Any]]:
+    if limit is None:
+        return SQL_GET_PAGE, {"after_id": after_id}
+    return SQL_GET_PAGE + SQL_FETCH_FIRST, {"after_id": after_id, "limit": limit}
+
+def _paciente_params(paciente: PacienteCreate) -> Dict[str, Any]:
+    return {
+        "rghc": paciente.identificador_rghc,
+        "cpf": paciente.cpf_paciente,
+        "nome": paciente.nome_paciente,
+        "dt_nasc": paciente.data_nascimento,
+        "sangue": paciente.tipo_sanguineo,
+    }
+
+def _contato_params(paciente_id: int, paciente: PacienteCreate) -> Dict[str, Any]:
+    return {
+        "id_pac": paciente_id,
+        "email": paciente.email_paciente,
+        "tel": paciente.telefone_paciente
+    }
+
+def _login_params(paciente_id: int, paciente: PacienteCreate) -> Dict[str, Any]:
+    return {
+        "id_pac": paciente_id,
+        "user": paciente.email_paciente, # Usando email como login
+        "pass": paciente.password  # Salva a senha original
+    }
+
+def _update_contato_sql(paciente_id: int, paciente: PacienteUpdate) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Monta o UPDATE de TB_PATHMED_CONTATO_PACIENTE só com os campos informados."""
+    if not (paciente.email_paciente or paciente.telefone_paciente):
+        return None
+
+    fields_to_update = []
+    params = {"id": paciente_id}
+    if paciente.email_paciente:
+        fields_to_update.append("EMAIL_PACIENTE = :email")
+        params["email"] = paciente.email_paciente
+    if paciente.telefone_paciente:
+        fields_to_update.append("TELEFONE_PACIENTE = :tel")
+        params["tel"] = paciente.telefone_paciente
+    
+    sql_update = f"UPDATE TB_PATHMED_CONTATO_PACIENTE SET {', '.join(fields_to_update)} WHERE ID_PACIENTE = :id"
+    return sql_update, params
+
 def create(conn: oracledb.Connection, paciente: PacienteCreate) -> Optional[int]:
     """
     Cria um novo paciente e seu login (com senha em texto puro).
@@ -21,57 +139,22 @@ def create(conn: oracledb.Connection, paciente: PacienteCreate) -> Optional[int]
 
         # 1. Inserir na TB_PATHMED_PACIENTE
         with conn.cursor() as cursor:
-            cursor.execute("""
-                INSERT INTO TB_PATHMED_PACIENTE (
-                    IDENTIFICADOR_RGHC, CPF_PACIENTE, NOME_PACIENTE, 
-                    DATA_NASCIMENTO, TIPO_SANGUINEO
-                ) VALUES (
-                    :rghc, :cpf, :nome, :dt_nasc, :sangue
-                ) RETURNING ID_PACIENTE INTO :id
-            """, {
-                "rghc": paciente.identificador_rghc,
-                "cpf": paciente.cpf_paciente,
-                "nome": paciente.nome_paciente,
-                "dt_nasc": paciente.data_nascimento,
-                "sangue": paciente.tipo_sanguineo,
-                "id": new_paciente_id
-            })
+            cursor.execute(SQL_INSERT_PACIENTE, {**_paciente_params(paciente), "id": new_paciente_id})
             
             paciente_id = new_paciente_id.getvalue()[0]
 
         # 2. Inserir na TB_PATHMED_CONTATO_PACIENTE
         with conn.cursor() as cursor:
-            cursor.execute("""
-                INSERT INTO TB_PATHMED_CONTATO_PACIENTE (
-                    ID_PACIENTE, EMAIL_PACIENTE, TELEFONE_PACIENTE
-                ) VALUES (
-                    :id_pac, :email, :tel
-                )
-            """, {
-                "id_pac": paciente_id,
-                "email": paciente.email_paciente,
-                "tel": paciente.telefone_paciente
-            })
+            cursor.execute(SQL_INSERT_CONTATO, _contato_params(paciente_id, paciente))
 
         # 3. Inserir na TB_PATHMED_LOGIN_PACIENTE (com senha em texto puro)
-        
-        plain_password = paciente.password
-        
         with conn.cursor() as cursor:
-            cursor.execute("""
-                INSERT INTO TB_PATHMED_LOGIN_PACIENTE (
-                    ID_PACIENTE, USUARIO_LOGIN, SENHA_LOGIN
-                ) VALUES (
-                    :id_pac, :user, :pass
-                )
-            """, {
-                "id_pac": paciente_id,
-                "user": paciente.email_paciente, # Usando email como login
-                "pass": plain_password  # Salva a senha original
-            })
+            cursor.execute(SQL_INSERT_LOGIN, _login_params(paciente_id, paciente))
             
         # Commita a transação
         conn.commit()
+        # O email pode estar em cache como username inexistente
+        invalidar_credenciais([paciente.email_paciente])
         return paciente_id
 
     except oracledb.IntegrityError as e:
@@ -84,6 +167,89 @@ def create(conn: oracledb.Connection, paciente: PacienteCreate) -> Optional[int]
         print(f"Erro ao criar paciente: {e}")
         return None
 
+def _batch_error_resultado(indice: int, error: Any) -> Dict[str, Any]:
+    """Converte um erro de executemany(batcherrors=True) em um item do relatório."""
+    if error.code == 1:  # ORA-00001: violação de restrição única
+        detalhe = "CPF ou E-mail já cadastrado." if any(
+            uc in error.message for uc in UNIQUE_CONSTRAINTS_CONFLITO
+        ) else error.message
+        return {"indice": indice, "status": "conflito", "id_paciente": None, "detalhe": detalhe}
+    return {"indice": indice, "status": "erro", "id_paciente": None, "detalhe": error.message}
+
+def _create_chunk(conn: oracledb.Connection, offset: int, pacientes: List[PacienteCreate]) -> List[Dict[str, Any]]:
+    """
+    Insere um lote nas três tabelas com executemany + batcherrors e faz um único commit.
+    Linhas que falham em CONTATO ou LOGIN têm as inserções anteriores desfeitas,
+    para que nenhum paciente fique sem contato ou login.
+    """
+    resultados: Dict[int, Dict[str, Any]] = {}
+
+    with conn.cursor() as cursor:
+        # 1. TB_PATHMED_PACIENTE, com RETURNING em array para os IDs gerados
+        ids = cursor.var(int, arraysize=len(pacientes))
+        cursor.setinputsizes(id=ids)
+        cursor.executemany(SQL_INSERT_PACIENTE, [_paciente_params(p) for p in pacientes], batcherrors=True)
+        for error in cursor.getbatcherrors():
+            resultados[error.offset] = _batch_error_resultado(offset + error.offset, error)
+
+        criados = {
+            i: ids.getvalue(i)[0]
+            for i in range(len(pacientes)) if i not in resultados
+        }
+
+        # 2 e 3. CONTATO e LOGIN, só para quem passou na etapa anterior
+        inseridos_contato: List[int] = []
+        for sql, params_fn in ((SQL_INSERT_CONTATO, _contato_params), (SQL_INSERT_LOGIN, _login_params)):
+            pendentes = [i for i in criados if i not in resultados]
+            if not pendentes:
+                break
+            cursor.executemany(sql, [params_fn(criados[i], pacientes[i]) for i in pendentes], batcherrors=True)
+            for error in cursor.getbatcherrors():
+                i = pendentes[error.offset]
+                resultados[i] = _batch_error_resultado(offset + i, error)
+            if sql is SQL_INSERT_CONTATO:
+                inseridos_contato = [i for i in pendentes if i not in resultados]
+
+        # Desfaz as linhas parcialmente inseridas
+        desfazer_contato = [{"id_pac": criados[i]} for i in inseridos_contato if i in resultados]
+        desfazer_paciente = [{"id_pac": criados[i]} for i in criados if i in resultados]
+        if desfazer_contato:
+            cursor.executemany(SQL_DELETE_CONTATO, desfazer_contato)
+        if desfazer_paciente:
+            cursor.executemany(SQL_DELETE_PACIENTE, desfazer_paciente)
+
+    conn.commit()
+
+    for i, paciente_id in criados.items():
+        if i not in resultados:
+            resultados[i] = {"indice": offset + i, "status": "criado", "id_paciente": paciente_id, "detalhe": None}
+    invalidar_credenciais(pacientes[i].email_paciente for i in criados if resultados[i]["status"] == "criado")
+
+    return [resultados[i] for i in range(len(pacientes))]
+
+def create_many(conn: oracledb.Connection, pacientes: List[PacienteCreate]) -> List[Dict[str, Any]]:
+    """
+    Registra vários pacientes em lotes de BULK_CHUNK_SIZE, com um commit por lote.
+    Retorna um item por paciente, na ordem de entrada, com status
+    'criado', 'conflito' ou 'erro'. Uma falha inesperada afeta só o próprio lote.
+    """
+    resultados: List[Dict[str, Any]] = []
+    chunk_size = max(1, settings.BULK_CHUNK_SIZE)
+
+    for offset in range(0, len(pacientes), chunk_size):
+        chunk = pacientes[offset:offset + chunk_size]
+        try:
+            resultados.extend(_create_chunk(conn, offset, chunk))
+        except Exception as e:
+            conn.rollback()
+            print(f"Erro ao registrar lote de pacientes (a partir do índice {offset}): {e}")
+            resultados.extend(
+                {"indice": offset + i, "status": "erro", "id_paciente": None, "detalhe": str(e)}
+                for i in range(len(chunk))
+            )
+
+    return resultados
+
 #
 # As funções get_by_id, get_all, e update não precisam de alteração
 # (Elas podem ser copiadas da resposta anterior)
@@ -92,19 +258,10 @@ def get_by_id(conn: oracledb.Connection, paciente_id: int) -> Optional[dict]:
     """Busca um paciente pelo ID, juntando com a tabela de contatos."""
     try:
         with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT 
-                    p.ID_PACIENTE, p.IDENTIFICADOR_RGHC, p.CPF_PACIENTE,
-                    p.NOME_PACIENTE, p.DATA_NASCIMENTO, p.TIPO_SANGUINEO,
-                    c.EMAIL_PACIENTE, c.TELEFONE_PACIENTE
-                FROM TB_PATHMED_PACIENTE p
-                JOIN TB_PATHMED_CONTATO_PACIENTE c ON p.ID_PACIENTE = c.ID_PACIENTE
-                WHERE p.ID_PACIENTE = :id
-            """, id=paciente_id)
+            cursor.execute(SQL_GET_BY_ID, id=paciente_id)
             
-            row = cursor.fetchone()
-            if row:
-                return db_row_to_dict(cursor, row)
+            use_records(cursor, PACIENTE_DATE_COLUMNS)
+            return cursor.fetchone()
         return None
     except Exception as e:
         print(f"Erro ao buscar paciente por ID: {e}")
@@ -115,22 +272,29 @@ def get_all(conn: oracledb.Connection) -> List[dict]:
     pacientes = []
     try:
         with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT 
-                    p.ID_PACIENTE, p.IDENTIFICADOR_RGHC, p.CPF_PACIENTE,
-                    p.NOME_PACIENTE, p.DATA_NASCIMENTO, p.TIPO_SANGUINEO,
-                    c.EMAIL_PACIENTE, c.TELEFONE_PACIENTE
-                FROM TB_PATHMED_PACIENTE p
-                LEFT JOIN TB_PATHMED_CONTATO_PACIENTE c ON p.ID_PACIENTE = c.ID_PACIENTE
-            """)
+            cursor.execute(SQL_GET_ALL)
             
-            for row in cursor:
-                pacientes.append(db_row_to_dict(cursor, row))
+            use_records(cursor, PACIENTE_DATE_COLUMNS)
+            pacientes = cursor.fetchall()
         return pacientes
     except Exception as e:
         print(f"Erro ao buscar todos os pacientes: {e}")
         return []
 
+def get_page(conn: oracledb.Connection, after_id: int = 0, limit: Optional[int] = None) -> List[dict]:
+    """
+    Busca pacientes com ID_PACIENTE > after_id em ordem de ID (paginação por chave).
+    Sem `limit`, retorna todos a partir de after_id.
+    """
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(*page_sql(after_id, limit))
+            use_records(cursor, PACIENTE_DATE_COLUMNS)
+            return cursor.fetchall()
+    except oracledb.DatabaseError as e:
+        # Uma lista vazia seria lida pelo cliente como fim da paginação
+        raise RuntimeError(f"Erro no banco ao buscar página de pacientes: {e}")
+
 def update(conn: oracledb.Connection, paciente_id: int, paciente: PacienteUpdate) -> bool:
     """Atualiza dados do paciente (nome, email, telefone)."""
     try:
@@ -139,29 +303,16 @@ def update(conn: oracledb.Connection, paciente_id: int, paciente: PacienteUpdate
         # Atualiza TB_PATHMED_PACIENTE
         if paciente.nome_paciente:
             with conn.cursor() as cursor:
-                cursor.execute("""
-                    UPDATE TB_PATHMED_PACIENTE
-                    SET NOME_PACIENTE = :nome
-                    WHERE ID_PACIENTE = :id
-                """, nome=paciente.nome_paciente, id=paciente_id)
+                cursor.execute(SQL_UPDATE_NOME, nome=paciente.nome_paciente, id=paciente_id)
 
         # Atualiza TB_PATHMED_CONTATO_PACIENTE
-        if paciente.email_paciente or paciente.telefone_paciente:
-            fields_to_update = []
-            params = {"id": paciente_id}
-            if paciente.email_paciente:
-                fields_to_update.append("EMAIL_PACIENTE = :email")
-                params["email"] = paciente.email_paciente
-            if paciente.telefone_paciente:
-                fields_to_update.append("TELEFONE_PACIENTE = :tel")
-                params["tel"] = paciente.telefone_paciente
-            
-            sql_update = f"UPDATE TB_PATHMED_CONTATO_PACIENTE SET {', '.join(fields_to_update)} WHERE ID_PACIENTE = :id"
-            
+        update_contato = _update_contato_sql(paciente_id, paciente)
+        if update_contato:
             with conn.cursor() as cursor:
-                cursor.execute(sql_update, params)
+                cursor.execute(*update_contato)
 
         conn.commit()
+        invalidar_credenciais(paciente_id=paciente_id)
         return True
     except Exception as e:
         conn.rollback()
@@ -1,19 +1,26 @@
 import oracledb
 from typing import List, Dict, Any
-from app.crud.crud_paciente import db_row_to_dict
+from app.db.rows import use_records
+from app.crud.reference_cache import reference_cache
+
+SQL_GET_ALL = """
+    SELECT ID_PROFISSIONAL, ID_ESPECIALIDADE, NOME_PROFISSIONAL_SAUDE,
+           EMAIL_CORPORATIVO_PROFISSIONAL
+    FROM TB_PATHMED_PROFISSIONAL_SAUDE
+"""
 
 def get_all(conn: oracledb.Connection) -> List[dict]:
     """Busca todos os profissionais de saúde."""
+    cached = reference_cache.get_profissionais()
+    if cached is not None:
+        return cached
+
     profissionais = []
     try:
         with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT ID_PROFISSIONAL, ID_ESPECIALIDADE, NOME_PROFISSIONAL_SAUDE,
-                       EMAIL_CORPORATIVO_PROFISSIONAL
-                FROM TB_PATHMED_PROFISSIONAL_SAUDE
-            """)
-            for row in cursor:
-                profissionais.append(db_row_to_dict(cursor, row))
+            cursor.execute(SQL_GET_ALL)
+            use_records(cursor)
+            profissionais = cursor.fetchall()
         return profissionais
     except Exception as e:
         print(f"Erro ao buscar profissionais: {e}")
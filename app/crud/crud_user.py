@@ -1,6 +1,50 @@
 import oracledb
+import threading
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import metrics
 from app.schemas.user import UserAuth
-from typing import Optional
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+# Paciente e colaborador em uma única ida ao banco; o paciente tem precedência,
+# como na busca anterior em duas etapas
+SQL_LOGIN = """
+    SELECT SENHA_LOGIN, ID_PACIENTE AS ID_USUARIO, 'paciente' AS TIPO_USUARIO, 1 AS PRIORIDADE
+    FROM TB_PATHMED_LOGIN_PACIENTE
+    WHERE USUARIO_LOGIN = :username AND ATIVO = 'S'
+    UNION ALL
+    SELECT SENHA_LOGIN, ID_COLABORADOR, 'colaborador', 2
+    FROM TB_PATHMED_LOGIN_COLABORADOR
+    WHERE USUARIO_LOGIN = :username AND ATIVO = 'S'
+    ORDER BY PRIORIDADE
+"""
+
+# Marca no cache os usernames que não existem (entrada negativa)
+_NAO_ENCONTRADO = object()
+
+credential_cache = TTLCache(settings.LOGIN_CACHE_MAX_ENTRIES, settings.LOGIN_CACHE_TTL_SECONDS)
+metrics.register_cache("credenciais", credential_cache.stats)
+
+_lock = threading.Lock()
+# Incrementada a cada invalidação; uma busca iniciada antes dela não grava no cache
+_geracao = 0
+# paciente -> usernames em cache, para invalidar pelo ID na atualização
+_usernames_por_paciente: Dict[int, Set[str]] = {}
+
+def _row_to_user(user_data: tuple, username: str) -> dict:
+    return {
+        "db_password": user_data[0], # !! MUDANÇA AQUI !!
+        "user_id": user_data[1],
+        "role": user_data[2],
+        "username": username
+    }
+
+def _buscar_usuario(conn: oracledb.Connection, username: str) -> Optional[dict]:
+    """Busca no banco; erros de banco são propagados para quem chama."""
+    with conn.cursor() as cursor:
+        cursor.execute(SQL_LOGIN, username=username)
+        user_data = cursor.fetchone()
+    return _row_to_user(user_data, username) if user_data else None
 
 def get_user_from_db(conn: oracledb.Connection, username: str) -> Optional[dict]:
     """
@@ -8,42 +52,64 @@ def get_user_from_db(conn: oracledb.Connection, username: str) -> Optional[dict]
     Retorna um dicionário com os dados do usuário se encontrado.
     """
     try:
-        # Tenta na tabela de login de pacientes
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT SENHA_LOGIN, ID_PACIENTE, 'paciente' as TIPO_USUARIO
-                FROM TB_PATHMED_LOGIN_PACIENTE
-                WHERE USUARIO_LOGIN = :username AND ATIVO = 'S'
-            """, username=username)
-            user_data = cursor.fetchone()
-
-            if user_data:
-                return {
-                    "db_password": user_data[0], # !! MUDANÇA AQUI !!
-                    "user_id": user_data[1],
-                    "role": user_data[2],
-                    "username": username
-                }
-
-        # Se não achou, tenta na tabela de login de colaboradores
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT SENHA_LOGIN, ID_COLABORADOR, 'colaborador' as TIPO_USUARIO
-                FROM TB_PATHMED_LOGIN_COLABORADOR
-                WHERE USUARIO_LOGIN = :username AND ATIVO = 'S'
-            """, username=username)
-            user_data = cursor.fetchone()
-
-            if user_data:
-                return {
-                    "db_password": user_data[0], # !! MUDANÇA AQUI !!
-                    "user_id": user_data[1],
-                    "role": user_data[2],
-                    "username": username
-                }
-                
+        return _buscar_usuario(conn, username)
+    except oracledb.DatabaseError as e:
+        print(f"Erro ao buscar usuário: {e}")
         return None
 
+def geracao_atual() -> int:
+    """Geração do cache a ser passada para cache_store após a consulta ao banco."""
+    return _geracao
+
+def cache_lookup(username: str) -> Tuple[bool, Optional[dict]]:
+    """(encontrado no cache, usuário ou None para username inexistente)."""
+    cached = credential_cache.get(username, None)
+    if cached is None:
+        return False, None
+    return True, None if cached is _NAO_ENCONTRADO else cached
+
+def cache_store(username: str, user: Optional[dict], geracao: int) -> None:
+    """Guarda o resultado da busca, a menos que tenha havido invalidação no meio."""
+    with _lock:
+        if geracao != _geracao:
+            return
+        if user is None:
+            credential_cache.set(username, _NAO_ENCONTRADO, settings.LOGIN_CACHE_NEGATIVE_TTL_SECONDS)
+            return
+        credential_cache.set(username, user)
+        if user["role"] == "paciente":
+            _usernames_por_paciente.setdefault(user["user_id"], set()).add(username)
+
+def get_user_cached(conn: oracledb.Connection, username: str) -> Optional[dict]:
+    """
+    get_user_from_db com cache de curta duração, inclusive para usernames
+    inexistentes. Erros de banco não são guardados.
+    """
+    encontrado, user = cache_lookup(username)
+    if encontrado:
+        return user
+
+    geracao = geracao_atual()
+    try:
+        user = _buscar_usuario(conn, username)
     except oracledb.DatabaseError as e:
         print(f"Erro ao buscar usuário: {e}")
-        return None
\ No newline at end of file
+        return None
+
+    cache_store(username, user, geracao)
+    return user
+
+def invalidar_credenciais(usernames: Iterable[str] = (), paciente_id: Optional[int] = None) -> None:
+    """
+    Remove do cache os usernames informados e os logins em cache do paciente.
+    Chamada no registro (usernames novos podem ter entrada negativa) e na
+    atualização de paciente.
+    """
+    global _geracao
+    with _lock:
+        _geracao += 1
+        alvos = set(usernames)
+        if paciente_id is not None:
+            alvos |= _usernames_por_paciente.pop(paciente_id, set())
+        for username in alvos:
+            credential_cache.pop(username)
@@ -0,0 +1,233 @@
+# app/crud/reference_cache.py
+
+import asyncio
+import threading
+import time
+import oracledb
+from app.core.config import settings
+from app.core.metrics import metrics, metric_lines
+from app.db.database import acquire_connection, acquire_async_connection
+from app.schemas.disponibilidade import ProfissionalResumido
+from typing import Any, Dict, List, Optional
+
+SQL_ESPECIALIDADES = """
+    SELECT ID_ESPECIALIDADE, DESCRICAO_ESPECIALIDADE
+    FROM TB_PATHMED_ESPECIALIDADE
+    ORDER BY ID_ESPECIALIDADE
+"""
+
+# Ordenado por nome, como na busca de profissionais da disponibilidade
+SQL_PROFISSIONAIS = """
+    SELECT ID_PROFISSIONAL, ID_ESPECIALIDADE, NOME_PROFISSIONAL_SAUDE,
+           EMAIL_CORPORATIVO_PROFISSIONAL
+    FROM TB_PATHMED_PROFISSIONAL_SAUDE
+    ORDER BY NOME_PROFISSIONAL_SAUDE
+"""
+
+SQL_STATUS = """
+    SELECT ID_STATUS, DESCRICAO_STATUS
+    FROM TB_PATHMED_STATUS_CONSULTA
+    ORDER BY ID_STATUS
+"""
+
+class _Snapshot:
+    """Fotografia imutável dos catálogos; trocada inteira a cada recarga."""
+
+    __slots__ = (
+        "especialidades", "profissionais", "status",
+        "nome_especialidade", "profissionais_por_especialidade",
+        "especialidade_por_profissional", "loaded_at"
+    )
+
+    def __init__(self, especialidades: List[tuple], profissionais: List[tuple], status: List[tuple]):
+        self.especialidades = [
+            {"id_especialidade": row[0], "descricao_especialidade": row[1]}
+            for row in especialidades
+        ]
+        self.profissionais = [
+            {
+                "id_profissional": row[0],
+                "id_especialidade": row[1],
+                "nome_profissional_saude": row[2],
+                "email_corporativo_profissional": row[3]
+            }
+            for row in profissionais
+        ]
+        self.status = [
+            {"id_status": row[0], "descricao_status": row[1]}
+            for row in status
+        ]
+
+        self.nome_especialidade: Dict[int, str] = {row[0]: str(row[1]) for row in especialidades}
+        self.profissionais_por_especialidade: Dict[int, List[ProfissionalResumido]] = {
+            id_especialidade: [] for id_especialidade in self.nome_especialidade
+        }
+        self.especialidade_por_profissional: Dict[int, int] = {}
+
+        for row in profissionais:
+            id_profissional, id_especialidade, nome = row[0], row[1], row[2]
+            self.especialidade_por_profissional[id_profissional] = id_especialidade
+            # Mesmo efeito do JOIN com TB_PATHMED_ESPECIALIDADE na consulta original
+            if id_especialidade in self.nome_especialidade:
+                self.profissionais_por_especialidade[id_especialidade].append(ProfissionalResumido(
+                    id_profissional=id_profissional,
+                    nome_profissional_saude=nome,
+                    descricao_especialidade=self.nome_especialidade[id_especialidade]
+                ))
+
+        self.loaded_at = time.time()
+
+class ReferenceDataCache:
+    """
+    Cache dos catálogos que quase nunca mudam (especialidades, profissionais e
+    status de consulta). Carregado no startup, recarregado em segundo plano a
+    cada REFERENCE_CACHE_REFRESH_SECONDS e sob demanda pelo endpoint de refresh.
+
+    Enquanto não houver carga bem-sucedida, os getters retornam None e os
+    chamadores consultam o banco normalmente.
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[_Snapshot] = None
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.refresh_count = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._snapshot is not None
+
+    # ------------------------------------------------------------------ carga
+
+    def load(self, conn: "oracledb.Connection") -> None:
+        """Recarrega os três catálogos usando a conexão informada."""
+        with conn.cursor() as cursor:
+            cursor.execute(SQL_ESPECIALIDADES)
+            especialidades = cursor.fetchall()
+            cursor.execute(SQL_PROFISSIONAIS)
+            profissionais = cursor.fetchall()
+            cursor.execute(SQL_STATUS)
+            status = cursor.fetchall()
+
+        self._swap(_Snapshot(especialidades, profissionais, status))
+
+    async def load_async(self, conn: "oracledb.AsyncConnection") -> None:
+        """Equivalente assíncrono de load."""
+        with conn.cursor() as cursor:
+            await cursor.execute(SQL_ESPECIALIDADES)
+            especialidades = await cursor.fetchall()
+            await cursor.execute(SQL_PROFISSIONAIS)
+            profissionais = await cursor.fetchall()
+            await cursor.execute(SQL_STATUS)
+            status = await cursor.fetchall()
+
+        self._swap(_Snapshot(especialidades, profissionais, status))
+
+    def _swap(self, snapshot: _Snapshot) -> None:
+        with self._lock:
+            self._snapshot = snapshot
+            self.refresh_count += 1
+            self.last_error = None
+
+    def refresh(self) -> bool:
+        """Recarrega usando uma conexão do pool. Em caso de erro mantém os dados anteriores."""
+        try:
+            with acquire_connection(leitura=True) as conn:
+                self.load(conn)
+            return True
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"❌ Erro ao recarregar dados de referência: {e}")
+            return False
+
+    async def refresh_async(self) -> bool:
+        """Recarrega pelo pool assíncrono, ou pelo síncrono em uma thread."""
+        if not settings.DB_ASYNC:
+            return await asyncio.to_thread(self.refresh)
+        try:
+            async with acquire_async_connection(leitura=True) as conn:
+                await self.load_async(conn)
+            return True
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"❌ Erro ao recarregar dados de referência: {e}")
+            return False
+
+    # ------------------------------------------------- recarga em segundo plano
+
+    def start_background_refresh(self, interval_seconds: float) -> None:
+        """Agenda a recarga periódica no event loop atual (chamado no lifespan)."""
+        if self._task is None and interval_seconds > 0:
+            self._task = asyncio.create_task(self._refresh_loop(interval_seconds))
+
+    async def stop_background_refresh(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _refresh_loop(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            await self.refresh_async()
+
+    # --------------------------------------------------------------- leitura
+
+    def get_especialidades(self) -> Optional[List[Dict[str, Any]]]:
+        snapshot = self._snapshot
+        return snapshot.especialidades if snapshot else None
+
+    def get_profissionais(self) -> Optional[List[Dict[str, Any]]]:
+        snapshot = self._snapshot
+        return snapshot.profissionais if snapshot else None
+
+    def get_status(self) -> Optional[List[Dict[str, Any]]]:
+        snapshot = self._snapshot
+        return snapshot.status if snapshot else None
+
+    def get_nome_especialidade(self, id_especialidade: int) -> Optional[str]:
+        snapshot = self._snapshot
+        return snapshot.nome_especialidade.get(id_especialidade) if snapshot else None
+
+    def get_profissionais_da_especialidade(self, id_especialidade: int) -> Optional[List[ProfissionalResumido]]:
+        """
+        Profissionais da especialidade ordenados por nome. Retorna None se o cache
+        não está carregado ou não conhece a especialidade (ex.: criada depois da
+        última recarga), para que o chamador consulte o banco.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        return snapshot.profissionais_por_especialidade.get(id_especialidade)
+
+    def get_especialidade_do_profissional(self, id_profissional: int) -> Optional[int]:
+        snapshot = self._snapshot
+        return snapshot.especialidade_por_profissional.get(id_profissional) if snapshot else None
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "loaded": snapshot is not None,
+            "loaded_at": snapshot.loaded_at if snapshot else None,
+            "refresh_count": self.refresh_count,
+            "last_error": self.last_error,
+            "especialidades": len(snapshot.especialidades) if snapshot else 0,
+            "profissionais": len(snapshot.profissionais) if snapshot else 0,
+            "status": len(snapshot.status) if snapshot else 0,
+        }
+
+    def collect_metrics(self) -> List[str]:
+        """Coletor de /metrics."""
+        snapshot = self._snapshot
+        return (
+            metric_lines("pathmed_reference_cache_loaded", "gauge", "Dados de referência carregados (1/0)", [((), int(snapshot is not None))])
+            + metric_lines("pathmed_reference_cache_refreshes_total", "counter", "Recargas bem-sucedidas", [((), self.refresh_count)])
+        )
+
+# Instância única compartilhada pelos CRUDs e pelo lifespan
+reference_cache = ReferenceDataCache()
+metrics.register_collector(reference_cache.collect_metrics)
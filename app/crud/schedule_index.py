@@ -0,0 +1,302 @@
+# app/crud/schedule_index.py
+
+import asyncio
+import threading
+import time as _time
+import oracledb
+from app.core.config import settings
+from app.core.metrics import metrics, metric_lines
+from app.db.database import acquire_connection, acquire_async_connection
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Grade de horários: slots de 30 minutos das 8:00 às 18:00
+HORA_INICIO = time(8, 0)
+HORA_FIM = time(18, 0)
+MINUTOS_POR_SLOT = 30
+SLOTS_POR_DIA = (HORA_FIM.hour * 60 + HORA_FIM.minute - HORA_INICIO.hour * 60 - HORA_INICIO.minute) // MINUTOS_POR_SLOT
+
+# Agendada (1) ou Confirmada (2): status que ocupam o horário
+STATUS_OCUPAM_HORARIO = (1, 2)
+
+SQL_AGENDA_ATIVA = """
+    SELECT ID_CONSULTA, ID_PROFISSIONAL, DATA_HORA_CONSULTA
+    FROM TB_PATHMED_TELECONSULTA
+    WHERE DATA_HORA_CONSULTA >= :inicio
+      AND DATA_HORA_CONSULTA < :fim
+      AND ID_STATUS IN (1, 2)
+"""
+
+def slot_do_horario(data_hora: datetime) -> Optional[int]:
+    """Índice do slot (0..SLOTS_POR_DIA-1) ou None se o horário não está na grade."""
+    minutos = data_hora.hour * 60 + data_hora.minute - (HORA_INICIO.hour * 60 + HORA_INICIO.minute)
+    if data_hora.second or data_hora.microsecond or minutos % MINUTOS_POR_SLOT:
+        return None
+    slot = minutos // MINUTOS_POR_SLOT
+    return slot if 0 <= slot < SLOTS_POR_DIA else None
+
+def mascaras_por_dia(ocupados: Iterable[Tuple[int, datetime]]) -> Dict[date, Dict[int, int]]:
+    """Converte pares (id_profissional, data_hora) em {dia: {id_profissional: bits ocupados}}."""
+    mascaras: Dict[date, Dict[int, int]] = {}
+    for id_profissional, data_hora in ocupados:
+        slot = slot_do_horario(data_hora)
+        if slot is None:
+            continue
+        do_dia = mascaras.setdefault(data_hora.date(), {})
+        do_dia[id_profissional] = do_dia.get(id_profissional, 0) | (1 << slot)
+    return mascaras
+
+class _Janela:
+    """Ocupação dos dias [inicio, inicio + dias); só é alterada sob o lock do índice."""
+
+    __slots__ = ("inicio", "dias", "ativas", "contagem", "mascaras", "loaded_at")
+
+    def __init__(self, inicio: date, dias: int):
+        self.inicio = inicio
+        self.dias = dias
+        # id_consulta -> (id_profissional, dia, slot), para que cada escrita seja idempotente
+        self.ativas: Dict[int, Tuple[int, date, int]] = {}
+        # Consultas ativas por posição (mais de uma só em dados inconsistentes)
+        self.contagem: Dict[Tuple[int, date, int], int] = {}
+        # dia -> id_profissional -> bits dos slots ocupados
+        self.mascaras: Dict[date, Dict[int, int]] = {}
+        self.loaded_at = _time.time()
+
+    def cobre(self, data: date) -> bool:
+        return 0 <= (data - self.inicio).days < self.dias
+
+    def ocupar(self, id_consulta: int, id_profissional: int, data_hora: datetime) -> None:
+        slot = slot_do_horario(data_hora)
+        if slot is None or not self.cobre(data_hora.date()):
+            self.liberar(id_consulta)
+            return
+
+        posicao = (id_profissional, data_hora.date(), slot)
+        atual = self.ativas.get(id_consulta)
+        if atual == posicao:
+            return
+        if atual is not None:
+            self.liberar(id_consulta)
+
+        self.ativas[id_consulta] = posicao
+        self.contagem[posicao] = self.contagem.get(posicao, 0) + 1
+        do_dia = self.mascaras.setdefault(posicao[1], {})
+        do_dia[id_profissional] = do_dia.get(id_profissional, 0) | (1 << slot)
+
+    def liberar(self, id_consulta: int) -> None:
+        posicao = self.ativas.pop(id_consulta, None)
+        if posicao is None:
+            return
+
+        restantes = self.contagem[posicao] - 1
+        if restantes:
+            self.contagem[posicao] = restantes
+            return
+        del self.contagem[posicao]
+
+        id_profissional, dia, slot = posicao
+        do_dia = self.mascaras[dia]
+        mascara = do_dia[id_profissional] & ~(1 << slot)
+        if mascara:
+            do_dia[id_profissional] = mascara
+        else:
+            del do_dia[id_profissional]
+
+class ScheduleIndex:
+    """
+    Índice em memória da ocupação da agenda: para cada dia da janela
+    [hoje, hoje + SCHEDULE_INDEX_DAYS) e cada profissional, um inteiro com um
+    bit por slot da grade. Carregado no startup, recarregado em segundo plano a
+    cada SCHEDULE_INDEX_REFRESH_SECONDS e atualizado a cada escrita de consulta
+    feita por este processo.
+
+    Fora da janela, ou enquanto não houver carga bem-sucedida, os leitores
+    recebem None e consultam o banco normalmente.
+
+    Pressupõe um único processo escrevendo na agenda: com a janela carregada a
+    disponibilidade não lê TB_PATHMED_TELECONSULTA, e agendamentos feitos por
+    outro worker ou processo só aparecem na próxima recarga. Com vários workers,
+    o atraso chega a SCHEDULE_INDEX_REFRESH_SECONDS mais o TTL do cache de
+    disponibilidade; quem não aceita isso desliga o índice com
+    SCHEDULE_INDEX_ENABLED=false.
+    """
+
+    def __init__(self):
+        self._janela: Optional[_Janela] = None
+        self._lock = threading.Lock()
+        # Escritas ocorridas durante uma carga; reaplicadas na janela nova
+        self._pendentes: Optional[List[Tuple[int, int, datetime, int]]] = None
+        self._task: Optional[asyncio.Task] = None
+        self.refresh_count = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._janela is not None
+
+    # ------------------------------------------------------------------ carga
+
+    def _iniciar_carga(self) -> Tuple[datetime, datetime]:
+        with self._lock:
+            if self._pendentes is not None:
+                raise RuntimeError("Carga do índice de agenda já em andamento")
+            self._pendentes = []
+        inicio = date.today()
+        fim = inicio + timedelta(days=settings.SCHEDULE_INDEX_DAYS)
+        return datetime.combine(inicio, time.min), datetime.combine(fim, time.min)
+
+    def _concluir_carga(self, inicio: datetime, rows: List[tuple]) -> None:
+        janela = _Janela(inicio.date(), settings.SCHEDULE_INDEX_DAYS)
+        for id_consulta, id_profissional, data_hora in rows:
+            janela.ocupar(id_consulta, id_profissional, data_hora)
+
+        with self._lock:
+            for pendente in self._pendentes:
+                self._aplicar(janela, *pendente)
+            self._pendentes = None
+            self._janela = janela
+            self.refresh_count += 1
+            self.last_error = None
+
+    def _cancelar_carga(self) -> None:
+        with self._lock:
+            self._pendentes = None
+
+    def load(self, conn: "oracledb.Connection") -> None:
+        """Recarrega a janela a partir de hoje usando a conexão informada."""
+        inicio, fim = self._iniciar_carga()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(SQL_AGENDA_ATIVA, inicio=inicio, fim=fim)
+                rows = cursor.fetchall()
+            self._concluir_carga(inicio, rows)
+        except BaseException:
+            self._cancelar_carga()
+            raise
+
+    async def load_async(self, conn: "oracledb.AsyncConnection") -> None:
+        """Equivalente assíncrono de load."""
+        inicio, fim = self._iniciar_carga()
+        try:
+            with conn.cursor() as cursor:
+                await cursor.execute(SQL_AGENDA_ATIVA, inicio=inicio, fim=fim)
+                rows = await cursor.fetchall()
+            self._concluir_carga(inicio, rows)
+        except BaseException:
+            self._cancelar_carga()
+            raise
+
+    def refresh(self) -> bool:
+        """
+        Recarrega usando uma conexão do pool. Em caso de erro mantém a janela anterior.
+        Lê do pool de escrita: uma réplica atrasada apagaria da janela consultas que
+        este processo já registrou antes do início da carga.
+        """
+        if not settings.SCHEDULE_INDEX_ENABLED:
+            return False
+        try:
+            with acquire_connection() as conn:
+                self.load(conn)
+            return True
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"❌ Erro ao carregar índice de agenda: {e}")
+            return False
+
+    async def refresh_async(self) -> bool:
+        """Recarrega pelo pool assíncrono, ou pelo síncrono em uma thread."""
+        if not settings.SCHEDULE_INDEX_ENABLED:
+            return False
+        if not settings.DB_ASYNC:
+            return await asyncio.to_thread(self.refresh)
+        try:
+            async with acquire_async_connection() as conn:
+                await self.load_async(conn)
+            return True
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"❌ Erro ao carregar índice de agenda: {e}")
+            return False
+
+    # ------------------------------------------------- recarga em segundo plano
+
+    def start_background_refresh(self, interval_seconds: float) -> None:
+        """Agenda a recarga periódica no event loop atual (chamado no lifespan)."""
+        if self._task is None and interval_seconds > 0 and settings.SCHEDULE_INDEX_ENABLED:
+            self._task = asyncio.create_task(self._refresh_loop(interval_seconds))
+
+    async def stop_background_refresh(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _refresh_loop(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            await self.refresh_async()
+
+    # --------------------------------------------------------------- escrita
+
+    @staticmethod
+    def _aplicar(janela: _Janela, id_consulta: int, id_profissional: int, data_hora: datetime, id_status: int) -> None:
+        if id_status in STATUS_OCUPAM_HORARIO:
+            janela.ocupar(id_consulta, id_profissional, data_hora)
+        else:
+            janela.liberar(id_consulta)
+
+    def registrar(self, id_consulta: int, id_profissional: int, data_hora: datetime, id_status: int) -> None:
+        """Aplica uma escrita já commitada (agendamento ou mudança de status)."""
+        with self._lock:
+            if self._janela is not None:
+                self._aplicar(self._janela, id_consulta, id_profissional, data_hora, id_status)
+            if self._pendentes is not None:
+                self._pendentes.append((id_consulta, id_profissional, data_hora, id_status))
+
+    # --------------------------------------------------------------- leitura
+
+    def mascaras_intervalo(self, data_inicio: date, data_fim: date) -> Optional[Dict[date, Dict[int, int]]]:
+        """
+        {dia: {id_profissional: bits ocupados}} para [data_inicio, data_fim], ou
+        None se o intervalo não está inteiro na janela carregada.
+        """
+        with self._lock:
+            janela = self._janela
+            if janela is None or not (janela.cobre(data_inicio) and janela.cobre(data_fim)):
+                return None
+            mascaras: Dict[date, Dict[int, int]] = {}
+            data = data_inicio
+            while data <= data_fim:
+                do_dia = janela.mascaras.get(data)
+                if do_dia:
+                    mascaras[data] = dict(do_dia)
+                data += timedelta(days=1)
+            return mascaras
+
+    def stats(self) -> Dict[str, Any]:
+        janela = self._janela
+        return {
+            "loaded": janela is not None,
+            "loaded_at": janela.loaded_at if janela else None,
+            "inicio": janela.inicio.isoformat() if janela else None,
+            "dias": janela.dias if janela else 0,
+            "consultas_ativas": len(janela.ativas) if janela else 0,
+            "refresh_count": self.refresh_count,
+            "last_error": self.last_error,
+        }
+
+    def collect_metrics(self) -> List[str]:
+        """Coletor de /metrics."""
+        janela = self._janela
+        return (
+            metric_lines("pathmed_schedule_index_loaded", "gauge", "Índice de agenda carregado (1/0)", [((), int(janela is not None))])
+            + metric_lines("pathmed_schedule_index_consultas", "gauge", "Consultas ativas no índice de agenda", [((), len(janela.ativas) if janela else 0)])
+            + metric_lines("pathmed_schedule_index_refreshes_total", "counter", "Recargas bem-sucedidas do índice de agenda", [((), self.refresh_count)])
+        )
+
+# Instância única compartilhada pelos CRUDs e pelo lifespan
+schedule_index = ScheduleIndex()
+metrics.register_collector(schedule_index.collect_metrics)
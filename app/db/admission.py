@@ -0,0 +1,154 @@
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+from fastapi import HTTPException, status
+from app.core.config import settings
+from app.core.metrics import metrics
+
+# Classes de prioridade, da mais para a menos prioritária: 'escrita' (transações,
+# login e buscas por ID, via get_write_connection) e 'leitura' (listagens e disponibilidade)
+PRIORIDADES = ("escrita", "leitura")
+
+metrics.describe_counter(
+    "pathmed_db_admission_rejections_total",
+    "Requests recusados com 503 pelo controle de admissão (fila cheia ou espera esgotada)"
+)
+
+class AdmissaoRecusada(HTTPException):
+    """Pool saturado: o request recebe 503 com Retry-After em vez de ficar preso no acquire."""
+
+    def __init__(self, pool: str, prioridade: str, motivo: str):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Banco de dados sobrecarregado, tente novamente em instantes",
+            headers={"Retry-After": str(settings.DB_ADMISSION_RETRY_AFTER_SECONDS)}
+        )
+        self.pool = pool
+        self.prioridade = prioridade
+        self.motivo = motivo
+
+def limite_da_fila(prioridade: str) -> int:
+    if prioridade == "escrita":
+        return settings.DB_ADMISSION_QUEUE_MAX_WRITE
+    return settings.DB_ADMISSION_QUEUE_MAX_READ
+
+class _Ticket:
+    """Lugar na fila; quem libera uma conexão entrega a vaga diretamente ao primeiro da fila."""
+
+    __slots__ = ("admitido", "evento", "loop", "futuro")
+
+    def __init__(self, evento: Optional[threading.Event] = None,
+                 loop: Optional[asyncio.AbstractEventLoop] = None, futuro: Optional[asyncio.Future] = None):
+        self.admitido = False
+        self.evento = evento
+        self.loop = loop
+        self.futuro = futuro
+
+    def acordar(self) -> None:
+        if self.evento is not None:
+            self.evento.set()
+        else:
+            self.loop.call_soon_threadsafe(self._resolver)
+
+    def _resolver(self) -> None:
+        # O futuro pode ter sido cancelado pelo timeout no meio da entrega
+        if not self.futuro.done():
+            self.futuro.set_result(None)
+
+class AdmissionControl:
+    """
+    Controle de admissão de um pool: no máximo `capacidade` (o max do pool)
+    requests com conexão; os demais esperam em uma fila por prioridade, limitada
+    por DB_ADMISSION_QUEUE_MAX_*, por até DB_ADMISSION_WAIT_TIMEOUT_MS. Fila
+    cheia ou espera esgotada levantam AdmissaoRecusada.
+
+    Quando uma conexão é liberada, a vaga vai para o primeiro da fila de maior
+    prioridade, de modo que quem acabou de chegar não passa na frente.
+    Atende threads (`entrar`) e o event loop (`entrar_async`).
+    """
+
+    def __init__(self, pool: str):
+        self.pool = pool
+        self._lock = threading.Lock()
+        self.em_uso = 0
+        self._filas: Dict[str, Deque[_Ticket]] = {prioridade: deque() for prioridade in PRIORIDADES}
+
+    def _enfileirar(self, prioridade: str, capacidade: int, novo_ticket: Callable[[], _Ticket]) -> Optional[_Ticket]:
+        """Chamado sob o lock. None se admitido na hora (sem criar o ticket)."""
+        if self.em_uso < capacidade and not any(self._filas.values()):
+            self.em_uso += 1
+            return None
+        fila = self._filas[prioridade]
+        if len(fila) >= limite_da_fila(prioridade):
+            raise self._recusa(prioridade, "fila_cheia")
+        ticket = novo_ticket()
+        fila.append(ticket)
+        return ticket
+
+    def _desistir(self, prioridade: str, ticket: _Ticket) -> bool:
+        """Chamado sob o lock após a espera. True se a vaga chegou antes da desistência."""
+        if ticket.admitido:
+            return True
+        self._filas[prioridade].remove(ticket)
+        return False
+
+    def _recusa(self, prioridade: str, motivo: str) -> AdmissaoRecusada:
+        metrics.inc(
+            "pathmed_db_admission_rejections_total",
+            (("pool", self.pool), ("prioridade", prioridade), ("motivo", motivo))
+        )
+        return AdmissaoRecusada(self.pool, prioridade, motivo)
+
+    def entrar(self, prioridade: str, capacidade: int) -> None:
+        with self._lock:
+            ticket = self._enfileirar(prioridade, capacidade, lambda: _Ticket(evento=threading.Event()))
+        if ticket is None:
+            return
+        ticket.evento.wait(settings.DB_ADMISSION_WAIT_TIMEOUT_MS / 1000)
+        with self._lock:
+            if self._desistir(prioridade, ticket):
+                return
+        raise self._recusa(prioridade, "tempo_esgotado")
+
+    async def entrar_async(self, prioridade: str, capacidade: int) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            ticket = self._enfileirar(prioridade, capacidade, lambda: _Ticket(loop=loop, futuro=loop.create_future()))
+        if ticket is None:
+            return
+        try:
+            await asyncio.wait_for(ticket.futuro, settings.DB_ADMISSION_WAIT_TIMEOUT_MS / 1000)
+            return
+        except asyncio.TimeoutError:
+            with self._lock:
+                if self._desistir(prioridade, ticket):
+                    return
+            raise self._recusa(prioridade, "tempo_esgotado")
+        except asyncio.CancelledError:
+            with self._lock:
+                admitido = self._desistir(prioridade, ticket)
+            # Cancelado depois de receber a vaga: repassa para o próximo da fila
+            if admitido:
+                self.sair()
+            raise
+
+    def sair(self) -> None:
+        with self._lock:
+            for prioridade in PRIORIDADES:
+                fila = self._filas[prioridade]
+                if fila:
+                    ticket = fila.popleft()
+                    ticket.admitido = True
+                    break
+            else:
+                self.em_uso -= 1
+                return
+        ticket.acordar()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "em_uso": self.em_uso,
+                "fila": {prioridade: len(fila) for prioridade, fila in self._filas.items()},
+            }
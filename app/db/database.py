@@ -1,53 +1,495 @@
+import asyncio
+import threading
+import time
 import oracledb 
 from app.core.config import settings
-from typing import Optional, Any
-from collections.abc import Generator 
+from app.db.instrumentation import instrument, instrument_async
+from app.core.metrics import metrics, metric_lines
+from app.db.admission import AdmissionControl, AdmissaoRecusada, limite_da_fila, PRIORIDADES
+from typing import Optional, Any, Dict, List, Tuple
+from collections.abc import AsyncGenerator, Generator 
+from contextlib import asynccontextmanager, contextmanager
+from fastapi import HTTPException, status
 
-# Variável global do pool de conexões
+# Variável global do pool de conexões (escrita; também atende as leituras sem DB_READ_DSN)
 db_pool: Optional["oracledb.Pool"] = None 
 
+# Pool de leitura (standby/réplica), criado só quando DB_READ_DSN está configurado
+db_read_pool: Optional["oracledb.Pool"] = None
+
+# Pools assíncronos (usados quando settings.DB_ASYNC está ativo). Mesmo assim os
+# pools síncronos são criados: os routers aio montam alguns handlers síncronos
+# (exportação e cargas em lote), que usam get_read_connection/get_write_connection
+db_pool_async: Optional["oracledb.AsyncConnectionPool"] = None
+db_read_pool_async: Optional["oracledb.AsyncConnectionPool"] = None
+
+class PoolIndisponivel(HTTPException):
+    """
+    O pool ainda não foi criado (inicialização em andamento ou banco fora do ar):
+    o request recebe 503 em vez de criar o pool no caminho da requisição.
+    """
+
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Conexão com o banco de dados ainda não disponível",
+            headers={"Retry-After": str(settings.STARTUP_RETRY_SECONDS)}
+        )
+
+class AcquireStats:
+    """Quanto tempo os acquires esperam pelo pool (exposto em /health/db)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.acquires = 0
+        self.failures = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_wait = 0.0
+
+    def record(self, seconds: float, ok: bool = True) -> None:
+        with self._lock:
+            if ok:
+                self.acquires += 1
+                self.total_wait += seconds
+            else:
+                self.failures += 1
+            self.last_wait = seconds
+            if seconds > self.max_wait:
+                self.max_wait = seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "acquires": self.acquires,
+                "failures": self.failures,
+                "avg_wait_ms": round(self.total_wait / self.acquires * 1000, 3) if self.acquires else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+                "last_wait_ms": round(self.last_wait * 1000, 3),
+            }
+
+# Espera no acquire de cada pool
+acquire_stats = AcquireStats()
+read_acquire_stats = AcquireStats()
+
+# Controle de admissão de cada pool (ver app/db/admission.py)
+write_admission = AdmissionControl("escrita")
+read_admission = AdmissionControl("leitura")
+
+def _init_session(conn: "oracledb.Connection", requested_tag: Optional[str]) -> None:
+    """Prepara cada sessão nova do pool com os comandos de DB_SESSION_STATEMENTS."""
+    with conn.cursor() as cursor:
+        for statement in settings.DB_SESSION_STATEMENTS:
+            cursor.execute(statement)
+
+async def _init_session_async(conn: "oracledb.AsyncConnection", requested_tag: Optional[str]) -> None:
+    """Equivalente assíncrono de _init_session."""
+    with conn.cursor() as cursor:
+        for statement in settings.DB_SESSION_STATEMENTS:
+            await cursor.execute(statement)
+
+def _pool_params(session_callback: Any, leitura: bool = False) -> Dict[str, Any]:
+    """
+    Parâmetros comuns aos pools síncrono e assíncrono, lidos de Settings.
+    O pool de leitura tem DSN, credenciais e tamanho próprios; o restante é compartilhado.
+    """
+    params = {
+        "user": (settings.DB_READ_USER or settings.DB_USER) if leitura else settings.DB_USER,
+        "password": (settings.DB_READ_PASSWORD or settings.DB_PASSWORD) if leitura else settings.DB_PASSWORD,
+        "dsn": settings.DB_READ_DSN if leitura else settings.DB_DSN,
+        "min": settings.DB_READ_POOL_MIN if leitura else settings.DB_POOL_MIN,
+        "max": settings.DB_READ_POOL_MAX if leitura else settings.DB_POOL_MAX,
+        "increment": settings.DB_POOL_INCREMENT,
+        "getmode": getattr(oracledb, f"POOL_GETMODE_{settings.DB_POOL_GETMODE.upper()}"),
+        "wait_timeout": settings.DB_POOL_WAIT_TIMEOUT_MS,
+        "stmtcachesize": settings.DB_POOL_STMTCACHESIZE,
+        "ping_interval": settings.DB_POOL_PING_INTERVAL,
+        "timeout": settings.DB_POOL_IDLE_TIMEOUT,
+    }
+    # Sem comandos configurados, o acquire não paga a chamada do callback
+    if settings.DB_SESSION_STATEMENTS:
+        params["session_callback"] = session_callback
+    return params
+
 def create_db_pool():
     """Cria o pool de conexões com o Oracle Database."""
     global db_pool
     try:
         if db_pool is None:
-            db_pool = oracledb.create_pool(
-                user=settings.DB_USER,
-                password=settings.DB_PASSWORD,
-                dsn=settings.DB_DSN,
-                min=1,
-                max=10,
-                increment=1
-            )
+            db_pool = oracledb.create_pool(**_pool_params(_init_session))
             print("✅ Pool de conexões Oracle criado com sucesso.")
         return db_pool
     except oracledb.DatabaseError as e: 
         print(f"❌ Erro ao criar pool de conexões: {e}")
         raise e
 
+def create_db_read_pool():
+    """Cria o pool de leitura, se DB_READ_DSN estiver configurado (senão retorna None)."""
+    global db_read_pool
+    if db_read_pool is None and not settings.DB_READ_DSN:
+        return None
+    try:
+        if db_read_pool is None:
+            db_read_pool = oracledb.create_pool(**_pool_params(_init_session, leitura=True))
+            print("✅ Pool de conexões Oracle de leitura criado com sucesso.")
+        return db_read_pool
+    except oracledb.DatabaseError as e:
+        print(f"❌ Erro ao criar pool de conexões de leitura: {e}")
+        raise e
+
+def _pools() -> Dict[str, Any]:
+    """Pools síncronos existentes, por nome."""
+    pools = {"escrita": db_pool}
+    if db_read_pool is not None:
+        pools["leitura"] = db_read_pool
+    return {nome: pool for nome, pool in pools.items() if pool is not None}
+
+def warm_db_pool() -> Dict[str, int]:
+    """
+    Abre as conexões mínimas de cada pool antes do primeiro request, para que a
+    primeira rajada não pague o crescimento do pool. Retorna as conexões abertas por pool.
+    """
+    abertas = {}
+    for nome, pool in _pools().items():
+        conns = []
+        try:
+            for _ in range(pool.min):
+                conns.append(pool.acquire())
+        finally:
+            for conn in conns:
+                pool.release(conn)
+        abertas[nome] = pool.opened
+    return abertas
+
+def _write_pool() -> Tuple["oracledb.Pool", AcquireStats, AdmissionControl]:
+    # Os pools são criados só no startup (app/main.py)
+    if db_pool is None:
+        raise PoolIndisponivel()
+    return db_pool, acquire_stats, write_admission
+
+def _read_pool() -> Tuple["oracledb.Pool", AcquireStats, AdmissionControl]:
+    """O pool de leitura, ou o de escrita quando não há um pool de leitura."""
+    if db_read_pool is not None:
+        return db_read_pool, read_acquire_stats, read_admission
+    return _write_pool()
+
+def _acquire(pool: "oracledb.Pool", stats: AcquireStats) -> "oracledb.Connection":
+    """Adquire do pool medindo a espera."""
+    inicio = time.perf_counter()
+    try:
+        conn = pool.acquire()
+    except Exception:
+        stats.record(time.perf_counter() - inicio, ok=False)
+        raise
+    stats.record(time.perf_counter() - inicio)
+    return conn
+
 def close_db_pool_on_shutdown():
-    """Fecha o pool de conexões quando o aplicativo é encerrado."""
-    global db_pool
+    """Fecha os pools de conexões quando o aplicativo é encerrado."""
+    global db_pool, db_read_pool
+    if db_read_pool:
+        db_read_pool.close()
+        print("✅ Pool de conexões de leitura fechado.")
+        db_read_pool = None
     if db_pool:
         db_pool.close()
         print("✅ Pool de conexões fechado.")
         db_pool = None
 
-def get_db_connection() -> Generator["oracledb.Connection", Any, None]:
-    """Dependência do FastAPI para obter uma conexão do pool."""
-    global db_pool
-    
-    # Cria o pool se não existir
-    if db_pool is None:
-        create_db_pool() 
+@contextmanager
+def _connection(pool: "oracledb.Pool", stats: AcquireStats, admissao: AdmissionControl,
+                prioridade: str) -> Generator["oracledb.Connection", Any, None]:
+    admitir = settings.DB_ADMISSION_ENABLED
+    if admitir:
+        admissao.entrar(prioridade, pool.max)
+    try:
+        conn = _acquire(pool, stats)
+        try:
+            yield instrument(conn)
+        finally:
+            pool.release(conn)
+    finally:
+        if admitir:
+            admissao.sair()
 
-    conn: Optional["oracledb.Connection"] = None 
+def get_write_connection() -> Generator["oracledb.Connection", Any, None]:
+    """
+    Dependência do FastAPI para obter uma conexão do pool de escrita: transações
+    e leituras que precisam enxergar a última escrita (login, busca por ID).
+    """
     try:
-        conn = db_pool.acquire()
-        yield conn 
+        with _connection(*_write_pool(), "escrita") as conn:
+            yield conn
+    except (AdmissaoRecusada, PoolIndisponivel):
+        raise
     except Exception as e:
         print(f"❌ Erro ao adquirir conexão: {e}")
         raise
+
+def get_read_connection() -> Generator["oracledb.Connection", Any, None]:
+    """
+    Dependência do FastAPI para listagens e disponibilidade. Com DB_READ_DSN a
+    conexão vem do pool de leitura e pode estar alguns instantes atrás da escrita.
+    """
+    try:
+        with _connection(*_read_pool(), "leitura") as conn:
+            yield conn
+    except (AdmissaoRecusada, PoolIndisponivel):
+        raise
+    except Exception as e:
+        print(f"❌ Erro ao adquirir conexão: {e}")
+        raise
+
+# Nome anterior da dependência de escrita
+get_db_connection = get_write_connection
+
+@contextmanager
+def acquire_connection(leitura: bool = False) -> Generator["oracledb.Connection", Any, None]:
+    """
+    Adquire uma conexão do pool fora do ciclo de dependências do FastAPI
+    (tarefas de fundo, cálculos compartilhados etc.). Não use dentro de um
+    gerador de StreamingResponse: AdmissaoRecusada e PoolIndisponivel
+    surgiriam depois do status 200 já enviado, em vez de virar 503.
+    """
+    if leitura:
+        pool_da_conexao = (*_read_pool(), "leitura")
+    else:
+        pool_da_conexao = (*_write_pool(), "escrita")
+    with _connection(*pool_da_conexao) as conn:
+        yield conn
+
+async def create_async_db_pool():
+    """Cria o pool de conexões assíncrono (modo thin) com o Oracle Database."""
+    global db_pool_async
+    try:
+        if db_pool_async is None:
+            db_pool_async = oracledb.create_pool_async(**_pool_params(_init_session_async))
+            print("✅ Pool de conexões Oracle assíncrono criado com sucesso.")
+        return db_pool_async
+    except oracledb.DatabaseError as e:
+        print(f"❌ Erro ao criar pool de conexões assíncrono: {e}")
+        raise e
+
+async def create_async_db_read_pool():
+    """Equivalente assíncrono de create_db_read_pool."""
+    global db_read_pool_async
+    if db_read_pool_async is None and not settings.DB_READ_DSN:
+        return None
+    try:
+        if db_read_pool_async is None:
+            db_read_pool_async = oracledb.create_pool_async(**_pool_params(_init_session_async, leitura=True))
+            print("✅ Pool de conexões Oracle assíncrono de leitura criado com sucesso.")
+        return db_read_pool_async
+    except oracledb.DatabaseError as e:
+        print(f"❌ Erro ao criar pool de conexões assíncrono de leitura: {e}")
+        raise e
+
+def _async_pools() -> Dict[str, Any]:
+    """Pools assíncronos existentes, por nome."""
+    pools = {"escrita": db_pool_async}
+    if db_read_pool_async is not None:
+        pools["leitura"] = db_read_pool_async
+    return {nome: pool for nome, pool in pools.items() if pool is not None}
+
+async def warm_async_db_pool() -> Dict[str, int]:
+    """Equivalente assíncrono de warm_db_pool."""
+    abertas = {}
+    for nome, pool in _async_pools().items():
+        conns = await asyncio.gather(
+            *(pool.acquire() for _ in range(pool.min)),
+            return_exceptions=True
+        )
+        erros = [c for c in conns if isinstance(c, BaseException)]
+        for conn in conns:
+            if not isinstance(conn, BaseException):
+                await pool.release(conn)
+        if erros:
+            raise erros[0]
+        abertas[nome] = pool.opened
+    return abertas
+
+def _write_pool_async() -> Tuple["oracledb.AsyncConnectionPool", AcquireStats, AdmissionControl]:
+    if db_pool_async is None:
+        raise PoolIndisponivel()
+    return db_pool_async, acquire_stats, write_admission
+
+def _read_pool_async() -> Tuple["oracledb.AsyncConnectionPool", AcquireStats, AdmissionControl]:
+    """Equivalente assíncrono de _read_pool."""
+    if db_read_pool_async is not None:
+        return db_read_pool_async, read_acquire_stats, read_admission
+    return _write_pool_async()
+
+async def _acquire_async(pool: "oracledb.AsyncConnectionPool", stats: AcquireStats) -> "oracledb.AsyncConnection":
+    """Equivalente assíncrono de _acquire."""
+    inicio = time.perf_counter()
+    try:
+        conn = await pool.acquire()
+    except Exception:
+        stats.record(time.perf_counter() - inicio, ok=False)
+        raise
+    stats.record(time.perf_counter() - inicio)
+    return conn
+
+async def close_async_db_pool_on_shutdown():
+    """Fecha os pools de conexões assíncronos quando o aplicativo é encerrado."""
+    global db_pool_async, db_read_pool_async
+    if db_read_pool_async:
+        await db_read_pool_async.close()
+        print("✅ Pool de conexões assíncrono de leitura fechado.")
+        db_read_pool_async = None
+    if db_pool_async:
+        await db_pool_async.close()
+        print("✅ Pool de conexões assíncrono fechado.")
+        db_pool_async = None
+
+@asynccontextmanager
+async def _async_connection(pool: "oracledb.AsyncConnectionPool", stats: AcquireStats, admissao: AdmissionControl,
+                            prioridade: str) -> AsyncGenerator["oracledb.AsyncConnection", None]:
+    admitir = settings.DB_ADMISSION_ENABLED
+    if admitir:
+        await admissao.entrar_async(prioridade, pool.max)
+    try:
+        conn = await _acquire_async(pool, stats)
+        try:
+            yield instrument_async(conn)
+        finally:
+            await pool.release(conn)
     finally:
-        if conn:
-            db_pool.release(conn)
\ No newline at end of file
+        if admitir:
+            admissao.sair()
+
+async def get_async_write_connection() -> AsyncGenerator["oracledb.AsyncConnection", None]:
+    """Equivalente assíncrono de get_write_connection."""
+    try:
+        async with _async_connection(*_write_pool_async(), "escrita") as conn:
+            yield conn
+    except (AdmissaoRecusada, PoolIndisponivel):
+        raise
+    except Exception as e:
+        print(f"❌ Erro ao adquirir conexão assíncrona: {e}")
+        raise
+
+async def get_async_read_connection() -> AsyncGenerator["oracledb.AsyncConnection", None]:
+    """Equivalente assíncrono de get_read_connection."""
+    try:
+        async with _async_connection(*_read_pool_async(), "leitura") as conn:
+            yield conn
+    except (AdmissaoRecusada, PoolIndisponivel):
+        raise
+    except Exception as e:
+        print(f"❌ Erro ao adquirir conexão assíncrona: {e}")
+        raise
+
+# Nome anterior da dependência assíncrona de escrita
+get_async_db_connection = get_async_write_connection
+
+@asynccontextmanager
+async def acquire_async_connection(leitura: bool = False) -> AsyncGenerator["oracledb.AsyncConnection", None]:
+    """Equivalente assíncrono de acquire_connection."""
+    if leitura:
+        pool_da_conexao = (*_read_pool_async(), "leitura")
+    else:
+        pool_da_conexao = (*_write_pool_async(), "escrita")
+    async with _async_connection(*pool_da_conexao) as conn:
+        yield conn
+
+def pool_disponivel(dependencia: Any) -> bool:
+    """
+    False se `dependencia` é uma das dependências de conexão e o pool dela ainda
+    não foi criado; qualquer outra dependência conta como disponível.
+    """
+    obter_pool = {
+        get_write_connection: _write_pool,
+        get_read_connection: _read_pool,
+        get_async_write_connection: _write_pool_async,
+        get_async_read_connection: _read_pool_async,
+    }.get(dependencia)
+    if obter_pool is None:
+        return True
+    try:
+        obter_pool()
+    except PoolIndisponivel:
+        return False
+    return True
+
+def _status_do_pool(pool: Any, stats: AcquireStats, admissao: AdmissionControl) -> Dict[str, Any]:
+    return {
+        "busy": pool.busy,
+        "opened": pool.opened,
+        "min": pool.min,
+        "max": pool.max,
+        "increment": pool.increment,
+        "getmode": settings.DB_POOL_GETMODE,
+        "wait_timeout_ms": pool.wait_timeout,
+        "stmtcachesize": pool.stmtcachesize,
+        "ping_interval": pool.ping_interval,
+        "acquire": stats.snapshot(),
+        "admissao": admissao.snapshot(),
+    }
+
+def pool_status() -> Optional[Dict[str, Any]]:
+    """
+    Ocupação e configuração de cada pool em uso ('escrita' e, se houver, 'leitura'),
+    ou None se o pool de escrita ainda não foi criado. Sem pool de leitura, as
+    leituras aparecem nos números do pool de escrita.
+    """
+    modo = "async" if db_pool_async is not None else "sync"
+    pools = _async_pools() if modo == "async" else _pools()
+    if "escrita" not in pools:
+        return None
+    return {
+        "modo": modo,
+        "leitura_separada": "leitura" in pools,
+        "pools": {
+            nome: _status_do_pool(pool, read_acquire_stats, read_admission) if nome == "leitura"
+            else _status_do_pool(pool, acquire_stats, write_admission)
+            for nome, pool in pools.items()
+        },
+    }
+
+def _pool_metrics() -> List[str]:
+    """Coletor de /metrics: ocupação de cada pool, espera no acquire e filas de admissão."""
+    status = pool_status()
+    if status is None:
+        return []
+    series: Dict[str, List[Tuple[tuple, Any]]] = {
+        "busy": [], "opened": [], "max": [], "acquires": [], "failures": [], "max_wait": [],
+        "admitidos": [], "fila": []
+    }
+    for nome, pool in status["pools"].items():
+        labels = (("pool", nome), ("modo", status["modo"]))
+        acquire = pool["acquire"]
+        series["busy"].append((labels, pool["busy"]))
+        series["opened"].append((labels, pool["opened"]))
+        series["max"].append((labels, pool["max"]))
+        series["acquires"].append((labels, acquire["acquires"]))
+        series["failures"].append((labels, acquire["failures"]))
+        series["max_wait"].append((labels, acquire["max_wait_ms"] / 1000))
+        admissao = pool["admissao"]
+        series["admitidos"].append((labels, admissao["em_uso"]))
+        for prioridade, tamanho in admissao["fila"].items():
+            series["fila"].append((labels + (("prioridade", prioridade),), tamanho))
+    return (
+        metric_lines("pathmed_db_pool_busy", "gauge", "Conexões em uso", series["busy"])
+        + metric_lines("pathmed_db_pool_opened", "gauge", "Conexões abertas", series["opened"])
+        + metric_lines("pathmed_db_pool_max", "gauge", "Máximo de conexões do pool", series["max"])
+        + metric_lines("pathmed_db_pool_acquires_total", "counter", "Conexões adquiridas", series["acquires"])
+        + metric_lines("pathmed_db_pool_acquire_failures_total", "counter", "Acquires que falharam", series["failures"])
+        + metric_lines("pathmed_db_pool_acquire_wait_max_seconds", "gauge", "Maior espera no acquire", series["max_wait"])
+        + metric_lines("pathmed_db_admission_in_use", "gauge", "Requests admitidos pelo controle de admissão", series["admitidos"])
+        + metric_lines("pathmed_db_admission_queue_depth", "gauge", "Requests na fila de admissão", series["fila"])
+    )
+
+metrics.register_collector(_pool_metrics)
+
+def threadpool_tokens() -> int:
+    """
+    Threads do threadpool do Starlette (anyio) para os endpoints síncronos: uma por
+    conexão dos pools, mais as filas de admissão (quem espera ocupa uma thread) e
+    DB_THREADPOOL_EXTRA para o trabalho sem banco. Calculado a partir dos pools
+    criados, para que o threadpool acompanhe qualquer mudança no tamanho deles.
+    """
+    tokens = sum(pool.max for pool in _pools().values()) + settings.DB_THREADPOOL_EXTRA
+    if settings.DB_ADMISSION_ENABLED:
+        tokens += sum(limite_da_fila(prioridade) for prioridade in PRIORIDADES)
+    return tokens
@@ -0,0 +1,222 @@
+import math
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any, Dict, Optional
+
+class RequestDbStats:
+    """
+    Contadores de banco de um request. Idas ao banco são estimadas: uma por
+    execute/executemany/commit/rollback e uma por lote de `arraysize` linhas buscadas.
+    """
+
+    __slots__ = ("statements", "round_trips", "rows", "execute_time", "fetch_time")
+
+    def __init__(self):
+        self.statements = 0
+        self.round_trips = 0
+        self.rows = 0
+        self.execute_time = 0.0
+        self.fetch_time = 0.0
+
+    @property
+    def db_time(self) -> float:
+        return self.execute_time + self.fetch_time
+
+    def add_fetch(self, seconds: float, rows: int, arraysize: int) -> None:
+        self.fetch_time += seconds
+        self.rows += rows
+        self.round_trips += math.ceil(rows / arraysize) if arraysize else 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "statements": self.statements,
+            "round_trips": self.round_trips,
+            "rows": self.rows,
+            "execute_ms": round(self.execute_time * 1000, 3),
+            "fetch_ms": round(self.fetch_time * 1000, 3),
+        }
+
+# Estatísticas do request em andamento; definido pelo middleware de Server-Timing.
+# As threads do threadpool recebem uma cópia do contexto, mas o objeto é o mesmo.
+current_db_stats: ContextVar[Optional[RequestDbStats]] = ContextVar("current_db_stats", default=None)
+
+class _Wrapper:
+    """Base dos wrappers: delega leitura e escrita de atributos ao objeto original."""
+
+    __slots__ = ("_wrapped", "_stats")
+
+    def __init__(self, wrapped: Any, stats: RequestDbStats):
+        object.__setattr__(self, "_wrapped", wrapped)
+        object.__setattr__(self, "_stats", stats)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._wrapped, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Ex.: cursor.rowfactory, cursor.arraysize
+        setattr(self._wrapped, name, value)
+
+class InstrumentedCursor(_Wrapper):
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._wrapped.close()
+
+    def _execute(self, method, *args, **kwargs):
+        stats = self._stats
+        inicio = perf_counter()
+        try:
+            result = method(*args, **kwargs)
+        finally:
+            stats.execute_time += perf_counter() - inicio
+            stats.statements += 1
+            stats.round_trips += 1
+        # execute() devolve o próprio cursor em consultas; mantém o wrapper
+        return self if result is self._wrapped else result
+
+    def execute(self, *args, **kwargs):
+        return self._execute(self._wrapped.execute, *args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        return self._execute(self._wrapped.executemany, *args, **kwargs)
+
+    def fetchone(self):
+        inicio = perf_counter()
+        row = self._wrapped.fetchone()
+        self._stats.add_fetch(perf_counter() - inicio, 0 if row is None else 1, 0)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        inicio = perf_counter()
+        rows = self._wrapped.fetchmany(*args, **kwargs)
+        self._stats.add_fetch(perf_counter() - inicio, len(rows), self._wrapped.arraysize)
+        return rows
+
+    def fetchall(self):
+        inicio = perf_counter()
+        rows = self._wrapped.fetchall()
+        self._stats.add_fetch(perf_counter() - inicio, len(rows), self._wrapped.arraysize)
+        return rows
+
+    def __iter__(self):
+        iterator = iter(self._wrapped)
+        stats = self._stats
+        arraysize = self._wrapped.arraysize
+        rows = 0
+        inicio = perf_counter()
+        try:
+            for row in iterator:
+                stats.fetch_time += perf_counter() - inicio
+                rows += 1
+                yield row
+                inicio = perf_counter()
+            stats.fetch_time += perf_counter() - inicio
+        finally:
+            stats.add_fetch(0.0, rows, arraysize)
+
+class InstrumentedConnection(_Wrapper):
+    __slots__ = ()
+
+    def cursor(self, *args, **kwargs) -> InstrumentedCursor:
+        return InstrumentedCursor(self._wrapped.cursor(*args, **kwargs), self._stats)
+
+    def commit(self) -> None:
+        self._stats.round_trips += 1
+        self._wrapped.commit()
+
+    def rollback(self) -> None:
+        self._stats.round_trips += 1
+        self._wrapped.rollback()
+
+class InstrumentedAsyncCursor(_Wrapper):
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._wrapped.close()
+
+    async def _execute(self, method, *args, **kwargs):
+        stats = self._stats
+        inicio = perf_counter()
+        try:
+            result = await method(*args, **kwargs)
+        finally:
+            stats.execute_time += perf_counter() - inicio
+            stats.statements += 1
+            stats.round_trips += 1
+        return self if result is self._wrapped else result
+
+    async def execute(self, *args, **kwargs):
+        return await self._execute(self._wrapped.execute, *args, **kwargs)
+
+    async def executemany(self, *args, **kwargs):
+        return await self._execute(self._wrapped.executemany, *args, **kwargs)
+
+    async def fetchone(self):
+        inicio = perf_counter()
+        row = await self._wrapped.fetchone()
+        self._stats.add_fetch(perf_counter() - inicio, 0 if row is None else 1, 0)
+        return row
+
+    async def fetchmany(self, *args, **kwargs):
+        inicio = perf_counter()
+        rows = await self._wrapped.fetchmany(*args, **kwargs)
+        self._stats.add_fetch(perf_counter() - inicio, len(rows), self._wrapped.arraysize)
+        return rows
+
+    async def fetchall(self):
+        inicio = perf_counter()
+        rows = await self._wrapped.fetchall()
+        self._stats.add_fetch(perf_counter() - inicio, len(rows), self._wrapped.arraysize)
+        return rows
+
+    async def __aiter__(self):
+        stats = self._stats
+        arraysize = self._wrapped.arraysize
+        rows = 0
+        inicio = perf_counter()
+        try:
+            async for row in self._wrapped:
+                stats.fetch_time += perf_counter() - inicio
+                rows += 1
+                yield row
+                inicio = perf_counter()
+            stats.fetch_time += perf_counter() - inicio
+        finally:
+            stats.add_fetch(0.0, rows, arraysize)
+
+class InstrumentedAsyncConnection(_Wrapper):
+    __slots__ = ()
+
+    def cursor(self, *args, **kwargs) -> InstrumentedAsyncCursor:
+        return InstrumentedAsyncCursor(self._wrapped.cursor(*args, **kwargs), self._stats)
+
+    async def commit(self) -> None:
+        self._stats.round_trips += 1
+        await self._wrapped.commit()
+
+    async def rollback(self) -> None:
+        self._stats.round_trips += 1
+        await self._wrapped.rollback()
+
+def instrument(conn: Any) -> Any:
+    """
+    Envolve a conexão para contabilizar no request atual. Fora de um request
+    instrumentado (middleware desligado, tarefas de fundo) devolve a conexão original.
+    """
+    stats = current_db_stats.get()
+    if stats is None:
+        return conn
+    return InstrumentedConnection(conn, stats)
+
+def instrument_async(conn: Any) -> Any:
+    """Equivalente de instrument para conexões do pool assíncrono."""
+    stats = current_db_stats.get()
+    if stats is None:
+        return conn
+    return InstrumentedAsyncConnection(conn, stats)
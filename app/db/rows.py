@@ -0,0 +1,54 @@
+import dataclasses
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Tuple
+
+def _asdict(self) -> Dict[str, Any]:
+    return {name: getattr(self, name) for name in self.__slots__}
+
+def _getitem(self, key: str) -> Any:
+    # Mantém compatível o código que ainda acessa a linha como dicionário
+    return getattr(self, key)
+
+@lru_cache(maxsize=256)
+def record_class(columns: Tuple[str, ...]) -> type:
+    """
+    Classe de registro com __slots__ para um conjunto de colunas.
+    Criada uma vez por formato de SELECT e reaproveitada por todos os cursores.
+    """
+    return dataclasses.make_dataclass(
+        "Row",
+        columns,
+        slots=True,
+        namespace={"_asdict": _asdict, "__getitem__": _getitem}
+    )
+
+def column_names(cursor: Any) -> Tuple[str, ...]:
+    """Nomes das colunas do cursor em minúsculas (mesmas chaves do db_row_to_dict)."""
+    return tuple(col[0].lower() for col in cursor.description)
+
+def row_factory(cursor: Any, date_columns: Iterable[str] = ()) -> Callable[..., Any]:
+    """
+    Fábrica de registros para o `cursor.rowfactory`, resolvendo os nomes das
+    colunas uma única vez por execução em vez de uma vez por linha.
+
+    `date_columns` são colunas DATE do Oracle expostas como `date` na API:
+    o driver as entrega como datetime à meia-noite.
+    """
+    columns = column_names(cursor)
+    cls = record_class(columns)
+    indices = [i for i, name in enumerate(columns) if name in date_columns]
+    if not indices:
+        return cls
+
+    def factory(*row):
+        valores = list(row)
+        for i in indices:
+            if valores[i] is not None:
+                valores[i] = valores[i].date()
+        return cls(*valores)
+
+    return factory
+
+def use_records(cursor: Any, date_columns: Iterable[str] = ()) -> None:
+    """Configura o cursor, já executado, para produzir registros compactos."""
+    cursor.rowfactory = row_factory(cursor, date_columns)
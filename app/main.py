@@ -1,24 +1,142 @@
-from contextlib import asynccontextmanager 
-from fastapi import FastAPI
+import asyncio
+import time
+import anyio.to_thread
+from contextlib import asynccontextmanager, suppress
+from typing import Dict, List
+from fastapi import FastAPI, Request
+from fastapi.exception_handlers import http_exception_handler
+from starlette.exceptions import HTTPException as StarletteHTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.api import api_router 
-from app.db.database import create_db_pool, close_db_pool_on_shutdown 
+from app.core.config import settings
+from app.db.database import (
+    create_db_pool, create_db_read_pool, close_db_pool_on_shutdown, warm_db_pool,
+    create_async_db_pool, create_async_db_read_pool, close_async_db_pool_on_shutdown, warm_async_db_pool,
+    threadpool_tokens, pool_disponivel
+)
+from app.crud.reference_cache import reference_cache
+from app.crud.schedule_index import schedule_index
+from app.core.server_timing import ServerTimingMiddleware
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.metrics import MetricsMiddleware, count_http_exception, metrics_endpoint
+from app.core.responses import FastJSONResponse
+from app.core.readiness import startup_state
+
+try:
+    # Versões do FastAPI que mantêm os routers incluídos aninhados
+    from fastapi.routing import iter_route_contexts
+except ImportError:
+    iter_route_contexts = None
+
+async def _criar_pools() -> None:
+    # Os pools síncronos existem nos dois modos: os routers aio reaproveitam os
+    # handlers síncronos de exportação e de cargas em lote
+    await asyncio.to_thread(create_db_pool)
+    await asyncio.to_thread(create_db_read_pool)
+    # Threadpool dos endpoints síncronos dimensionado pelos pools e filas de admissão
+    tokens = threadpool_tokens()
+    anyio.to_thread.current_default_thread_limiter().total_tokens = tokens
+    print(f"🧵 Threadpool: {tokens} threads.")
+    if settings.DB_ASYNC:
+        await create_async_db_pool()
+        await create_async_db_read_pool()
+
+async def _aquecer_pools() -> Dict[str, int]:
+    abertas = await asyncio.to_thread(warm_db_pool)
+    if settings.DB_ASYNC:
+        for nome, quantidade in (await warm_async_db_pool()).items():
+            abertas[f"{nome} assíncrono"] = quantidade
+    return abertas
+
+def _rotas_sem_pool() -> List[str]:
+    """
+    Rotas com alguma dependência de conexão cujo pool não foi criado, por exemplo
+    um handler síncrono montado em um router aio sem o pool síncrono.
+    """
+    rotas = iter_route_contexts(app.routes) if iter_route_contexts is not None else app.routes
+    faltando = []
+    for rota in rotas:
+        pendentes = [getattr(rota, "dependant", None)]
+        while pendentes:
+            dependant = pendentes.pop()
+            if dependant is None:
+                continue
+            if not pool_disponivel(dependant.call):
+                faltando.append(f"{','.join(sorted(rota.methods))} {rota.path_format}")
+                break
+            pendentes.extend(dependant.dependencies)
+    return faltando
+
+async def preparar_aplicacao() -> None:
+    """
+    Inicialização em segundo plano: cria e aquece os pools (de novo a cada
+    STARTUP_RETRY_SECONDS enquanto o banco não responde), pré-carrega os dados de
+    referência e o índice de agenda e só então marca a aplicação como pronta.
+    """
+    while True:
+        startup_state.tentativas += 1
+        try:
+            inicio = time.perf_counter()
+            await _criar_pools()
+            startup_state.etapa("pools", inicio)
+
+            inicio = time.perf_counter()
+            abertas = await _aquecer_pools()
+            startup_state.etapa("aquecimento", inicio)
+            for nome, quantidade in abertas.items():
+                print(f"🔥 Pool de {nome} aquecido: {quantidade} conexões abertas.")
+
+            # Não fica pronta enquanto alguma rota não consegue obter conexão
+            faltando = _rotas_sem_pool()
+            if faltando:
+                raise RuntimeError(f"Rotas sem pool de conexões: {', '.join(faltando)}")
+            break
+        except Exception as e:
+            startup_state.ultimo_erro = str(e)
+            print(f"❌ Erro ao preparar pools de conexões: {e}")
+            await asyncio.sleep(settings.STARTUP_RETRY_SECONDS)
+
+    # Falha nas cargas não impede o ready: os CRUDs consultam o banco até a próxima recarga
+    inicio = time.perf_counter()
+    await asyncio.gather(reference_cache.refresh_async(), schedule_index.refresh_async())
+    startup_state.etapa("dados_de_referencia", inicio)
+    reference_cache.start_background_refresh(settings.REFERENCE_CACHE_REFRESH_SECONDS)
+    schedule_index.start_background_refresh(settings.SCHEDULE_INDEX_REFRESH_SECONDS)
+
+    startup_state.marcar_pronto()
+    print(f"✅ Aplicação pronta em {startup_state.snapshot()['segundos_desde_o_inicio']:.3f}s.")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("🚀 Application startup: starting process...")
-    create_db_pool()
+    startup_state.iniciar()
+    # O servidor aceita conexões já; o /ready fica verde quando preparar_aplicacao terminar
+    preparo = asyncio.create_task(preparar_aplicacao())
     yield 
+    preparo.cancel()
+    with suppress(asyncio.CancelledError):
+        await preparo
+    await schedule_index.stop_background_refresh()
+    await reference_cache.stop_background_refresh()
+    await close_async_db_pool_on_shutdown()
     close_db_pool_on_shutdown()
-    print("🛑 Application shutdown: database pool closed.")
+    print("🛑 Application shutdown: database pools closed.")
 
 app = FastAPI(
     title="PathMed API",
     description="API RESTful para gerenciamento de consultas médicas.",
     version="1.0.0",
-    lifespan=lifespan 
+    lifespan=lifespan,
+    # Serialização com orjson em todas as rotas (ver app/core/responses.py)
+    default_response_class=FastJSONResponse
 )
 
+# Retries com Idempotency-Key recebem a resposta guardada sem executar o endpoint de novo.
+# Adicionado antes do CORS para ficar dentro dele: os 400/409/422 próprios também
+# recebem os cabeçalhos CORS
+if settings.IDEMPOTENCY_ENABLED:
+    app.add_middleware(IdempotencyMiddleware)
+
 # ✅ CONFIGURAÇÃO CORS MAIS PERMISSIVA (PARA DESENVOLVIMENTO)
 app.add_middleware(
     CORSMiddleware,
@@ -28,8 +146,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Instrumentação de banco por request; desligada, nem o middleware nem os wrappers entram no caminho
+if settings.DB_INSTRUMENTATION_ENABLED:
+    app.add_middleware(ServerTimingMiddleware)
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+    @app.exception_handler(StarletteHTTPException)
+    async def http_exception_with_metrics(request: Request, exc: StarletteHTTPException):
+        # Conta por módulo de endpoints e status, depois responde como o handler padrão
+        count_http_exception(request, exc.status_code)
+        return await http_exception_handler(request, exc)
+
+    app.add_api_route("/metrics", metrics_endpoint, methods=["GET"], include_in_schema=False)
+
 app.include_router(api_router, prefix="/api/v1")
 
 @app.get("/")
 async def root():
-    return {"message": "PathMed API está rodando! 🩺"}
\ No newline at end of file
+    return {"message": "PathMed API está rodando! 🩺"}
+
+@app.get("/ready", include_in_schema=False)
+async def ready():
+    """Readiness: 200 com os pools aquecidos, 503 enquanto a inicialização não terminou."""
+    estado = startup_state.snapshot()
+    return FastJSONResponse(estado, status_code=200 if estado["pronto"] else 503)
\ No newline at end of file
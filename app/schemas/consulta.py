@@ -1,5 +1,6 @@
 from pydantic import BaseModel, ConfigDict
 from datetime import datetime
+from typing import List, Literal, Optional
 
 class ConsultaBase(BaseModel):
     id_paciente: int
@@ -30,4 +31,17 @@ class ConsultaDetalhada(BaseModel):
     descricao_especialidade: str
     descricao_status: str
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class ConsultaBulkResultado(BaseModel):
+    indice: int
+    status: Literal["agendada", "conflito", "referencia_invalida", "erro"]
+    id_consulta: Optional[int] = None
+    detalhe: Optional[str] = None
+
+class ConsultaBulkResponse(BaseModel):
+    agendadas: int
+    conflitos: int
+    referencias_invalidas: int
+    erros: int
+    resultados: List[ConsultaBulkResultado]
@@ -37,4 +37,15 @@ class DisponibilidadeDia(BaseModel):
 
     class Config:
         populate_by_name = True
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class HorarioLivre(BaseModel):
+    data_hora: datetime
+    profissional: ProfissionalResumido
+
+class ProximosHorarios(BaseModel):
+    id_especialidade: int
+    nome_especialidade: str
+    a_partir_de: datetime
+    dias_verificados: int
+    horarios: List[HorarioLivre] = Field(default_factory=list)
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from datetime import date
-from typing import Optional
+from typing import List, Literal, Optional
 
 class PacienteBase(BaseModel):
     identificador_rghc: str
@@ -29,4 +29,16 @@ class PacienteRead(BaseModel):
     email_paciente: Optional[str] = None
     telefone_paciente: Optional[str] = None
     
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class PacienteBulkResultado(BaseModel):
+    indice: int
+    status: Literal["criado", "conflito", "erro"]
+    id_paciente: Optional[int] = None
+    detalhe: Optional[str] = None
+
+class PacienteBulkResponse(BaseModel):
+    criados: int
+    conflitos: int
+    erros: int
+    resultados: List[PacienteBulkResultado]
@@ -0,0 +1,7 @@
+from pydantic import BaseModel, ConfigDict
+
+class StatusConsultaRead(BaseModel):
+    id_status: int
+    descricao_status: str
+
+    model_config = ConfigDict(from_attributes=True)
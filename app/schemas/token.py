@@ -6,4 +6,6 @@ class Token(BaseModel):
     token_type: str
 
 class TokenData(BaseModel):
-    username: Optional[str] = None
\ No newline at end of file
+    username: Optional[str] = None
+    role: Optional[str] = None
+    id: Optional[int] = None
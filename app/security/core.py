@@ -1,7 +1,20 @@
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.metrics import metrics
+from app.schemas.token import TokenData
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
+
+# token -> (exp em epoch, TokenData); a verificação de assinatura e claims só
+# acontece na primeira vez que o token aparece
+token_cache = TTLCache(settings.TOKEN_CACHE_MAX_ENTRIES, settings.TOKEN_CACHE_TTL_SECONDS)
+metrics.register_cache("tokens", token_cache.stats)
 
 def verify_password_simple(plain_password: str, db_password: str) -> bool:
     """
@@ -19,4 +32,43 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
\ No newline at end of file
+    return encoded_jwt
+
+def decode_access_token(token: str) -> TokenData:
+    """
+    Verifica assinatura e expiração do token, usando o cache de tokens já
+    verificados. Lança JWTError se o token for inválido ou expirado.
+    """
+    cached = token_cache.get(token)
+    if cached is not None:
+        exp, token_data = cached
+        if time.time() < exp:
+            return token_data
+        token_cache.pop(token)
+        raise JWTError("Signature has expired.")
+
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    username = payload.get("sub")
+    exp = payload.get("exp")
+    if username is None or exp is None:
+        raise JWTError("Token sem 'sub' ou 'exp'.")
+
+    token_data = TokenData(username=username, role=payload.get("role"), id=payload.get("id"))
+    restante = exp - time.time()
+    if restante > 0:
+        token_cache.set(token, (exp, token_data), min(restante, settings.TOKEN_CACHE_TTL_SECONDS))
+    return token_data
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenData:
+    """
+    Dependência das rotas protegidas. É 'async def' porque não faz I/O: com o
+    token em cache a checagem custa microssegundos, sem passar pelo threadpool.
+    """
+    try:
+        return decode_access_token(token)
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Não foi possível validar as credenciais",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
@@ -0,0 +1 @@
+"""Micro-benchmarks da PathMed API (ver benchmarks/run.py)."""
@@ -0,0 +1,541 @@
+"""
+Substituto em memória da API de conexão/cursor/pool do oracledb, usado pelos
+benchmarks para medir o custo do código da aplicação sem um Oracle de verdade.
+
+O fake reconhece as instruções SQL que os CRUDs emitem (pelas tabelas e binds
+usados) e responde a partir de um Dataset sintético. Ele não é um interpretador
+de SQL: uma instrução nova precisa de um handler em FakeConnection._dispatch.
+"""
+
+import random
+import re
+from datetime import date, datetime, time, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import oracledb
+
+DESCRICOES_STATUS = {1: "Agendada", 2: "Confirmada", 3: "Realizada", 4: "Cancelada"}
+TIPOS_SANGUINEOS = ("A+", "A-", "B+", "B-", "AB+", "AB-", "O+", "O-")
+NOMES = ("Ana", "Bruno", "Carla", "Diego", "Elisa", "Fábio", "Gabriela", "Heitor", "Iara", "João")
+SOBRENOMES = ("Silva", "Souza", "Oliveira", "Santos", "Lima", "Pereira", "Costa", "Rodrigues")
+
+# Mesma grade de CRUDDisponibilidade._gerar_horarios_do_dia
+HORARIOS_DO_DIA = [time(8 + i // 2, 30 * (i % 2)) for i in range(20)]
+
+COLS_PACIENTE = (
+    "ID_PACIENTE", "IDENTIFICADOR_RGHC", "CPF_PACIENTE", "NOME_PACIENTE",
+    "DATA_NASCIMENTO", "TIPO_SANGUINEO", "EMAIL_PACIENTE", "TELEFONE_PACIENTE",
+)
+COLS_CONSULTA = ("ID_CONSULTA", "ID_PACIENTE", "ID_PROFISSIONAL", "ID_STATUS", "DATA_HORA_CONSULTA")
+COLS_CONSULTA_DETALHADA = COLS_CONSULTA + (
+    "NOME_PACIENTE", "NOME_PROFISSIONAL_SAUDE", "DESCRICAO_ESPECIALIDADE", "DESCRICAO_STATUS",
+)
+
+class FakeError:
+    """Imita o objeto _Error de oracledb (args[0] das exceções e itens de getbatcherrors)."""
+
+    def __init__(self, code: int, message: str, offset: int = 0):
+        self.code = code
+        self.message = message
+        self.full_code = f"ORA-{code:05d}"
+        self.offset = offset
+
+    def __str__(self) -> str:
+        return self.message
+
+def _unique(constraint: str) -> oracledb.IntegrityError:
+    return oracledb.IntegrityError(FakeError(1, f"ORA-00001: unique constraint (PATHMED.{constraint}) violated"))
+
+def _parent_not_found(constraint: str) -> oracledb.IntegrityError:
+    return oracledb.IntegrityError(
+        FakeError(2291, f"ORA-02291: integrity constraint (PATHMED.{constraint}) violated - parent key not found")
+    )
+
+class Dataset:
+    """
+    Tabelas sintéticas do PathMed. Os tamanhos são configuráveis; a geração é
+    determinística para um mesmo `seed`. As consultas ficam nos próximos `dias`
+    dias, na grade de 30 minutos, sem conflito de horário por profissional.
+    """
+
+    def __init__(
+        self,
+        pacientes: int = 1000,
+        profissionais: int = 40,
+        especialidades: int = 8,
+        consultas: int = 10000,
+        dias: int = 30,
+        seed: int = 42,
+        inicio: Optional[date] = None,
+    ):
+        rnd = random.Random(seed)
+        self.inicio = inicio or date.today()
+
+        self.especialidades: Dict[int, str] = {i: f"Especialidade {i}" for i in range(1, especialidades + 1)}
+        self.status: Dict[int, str] = dict(DESCRICOES_STATUS)
+
+        # id -> (id, id_especialidade, nome, email)
+        self.profissionais: Dict[int, Tuple[int, int, str, str]] = {}
+        for i in range(1, profissionais + 1):
+            nome = f"Dr(a). {rnd.choice(NOMES)} {rnd.choice(SOBRENOMES)} {i}"
+            self.profissionais[i] = (i, (i - 1) % especialidades + 1, nome, f"prof{i}@pathmed.com")
+
+        # id -> linha de COLS_PACIENTE (com o contato); None quando excluído
+        self.pacientes: List[Optional[list]] = [None]
+        self.cpfs: Dict[str, int] = {}
+        self.emails: Dict[str, int] = {}
+        self.logins: Dict[str, Tuple[str, int]] = {}
+        self.colaboradores: Dict[str, Tuple[str, int]] = {"admin@pathmed.com": ("admin", 1)}
+        for i in range(1, pacientes + 1):
+            email = f"paciente{i}@email.com"
+            self._add_paciente([
+                i, f"RGHC{i:07d}", f"{i:011d}",
+                f"{rnd.choice(NOMES)} {rnd.choice(SOBRENOMES)}",
+                datetime(1950 + rnd.randrange(60), rnd.randrange(1, 13), rnd.randrange(1, 29)),
+                rnd.choice(TIPOS_SANGUINEOS), email, f"1199{i:07d}",
+            ])
+            self.logins[email] = ("senha123", i)
+
+        # id -> [id, paciente, profissional, status, data_hora]; o índice é o próprio id
+        self.consultas: List[Optional[list]] = [None]
+        self.agenda: Dict[Tuple[int, datetime], int] = {}
+        self.consultas_por_paciente: Dict[int, List[int]] = {}
+        capacidade = profissionais * dias * len(HORARIOS_DO_DIA)
+        while len(self.consultas) - 1 < min(consultas, capacidade):
+            id_prof = rnd.randrange(1, profissionais + 1)
+            dia = self.inicio + timedelta(days=rnd.randrange(dias))
+            data_hora = datetime.combine(dia, rnd.choice(HORARIOS_DO_DIA))
+            if (id_prof, data_hora) in self.agenda:
+                continue
+            self._add_consulta(rnd.randrange(1, pacientes + 1), id_prof, rnd.choice((1, 1, 2, 3, 4)), data_hora)
+
+    def _add_paciente(self, row: list) -> None:
+        self.pacientes.append(row)
+        self.cpfs[row[2]] = row[0]
+        if row[6]:
+            self.emails[row[6]] = row[0]
+
+    def _add_consulta(self, id_paciente: int, id_profissional: int, id_status: int, data_hora: datetime) -> list:
+        row = [len(self.consultas), id_paciente, id_profissional, id_status, data_hora]
+        self.consultas.append(row)
+        self.agenda[(id_profissional, data_hora)] = row[0]
+        self.consultas_por_paciente.setdefault(id_paciente, []).append(row[0])
+        return row
+
+    def paciente_existe(self, id_paciente: int) -> bool:
+        return 0 < id_paciente < len(self.pacientes) and self.pacientes[id_paciente] is not None
+
+class FakeVar:
+    """Variável de bind (cursor.var). getvalue(pos) devolve a lista retornada pela linha `pos`."""
+
+    def __init__(self, typ: Any = None, size: int = 0, arraysize: int = 1, **kwargs):
+        self.type = typ
+        self._values: Dict[int, Any] = {}
+
+    def setvalue(self, pos: int, value: Any) -> None:
+        self._values[pos] = value
+
+    def getvalue(self, pos: int = 0) -> Any:
+        return self._values.get(pos)
+
+class FakeCursor:
+    def __init__(self, connection: "FakeConnection"):
+        self.connection = connection
+        self.arraysize = 100
+        self.prefetchrows = 2
+        self.rowfactory: Optional[Callable[..., Any]] = None
+        self.description: Optional[List[tuple]] = None
+        self.rowcount = 0
+        self._rows: List[tuple] = []
+        self._pos = 0
+        self._input_vars: Dict[str, FakeVar] = {}
+        self._batch_errors: List[FakeError] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self) -> None:
+        self._rows = []
+
+    def var(self, typ: Any, size: int = 0, arraysize: int = 1, **kwargs) -> FakeVar:
+        return FakeVar(typ, size, arraysize, **kwargs)
+
+    def setinputsizes(self, *args, **kwargs) -> None:
+        self._input_vars = {k: v for k, v in kwargs.items() if isinstance(v, FakeVar)}
+
+    def _set_result(self, result: Optional[Tuple[Tuple[str, ...], List[tuple]]]) -> None:
+        if result is None:
+            self.description = None
+            self._rows = []
+        else:
+            columns, rows = result
+            self.description = [(name, None, None, None, None, None, True) for name in columns]
+            self._rows = rows
+            self.rowcount = 0
+        self._pos = 0
+
+    def execute(self, statement: str, parameters: Optional[Any] = None, **kwargs):
+        if isinstance(parameters, (list, tuple)):
+            # Binds posicionais: associados aos nomes na ordem em que aparecem no SQL
+            nomes = list(dict.fromkeys(re.findall(r":(\w+)", statement)))
+            parameters = dict(zip(nomes, parameters))
+        params = dict(parameters or {})
+        params.update(kwargs)
+        params.update(self._input_vars)
+        self.connection.round_trips += 1
+        self.rowcount = 0
+        result = self.connection._dispatch(self, statement, params, 0)
+        self._set_result(result)
+        return self if result is not None else None
+
+    def executemany(self, statement: str, parameters: List[Dict[str, Any]], batcherrors: bool = False, **kwargs):
+        self.connection.round_trips += 1
+        self._batch_errors = []
+        total = 0
+        for pos, row_params in enumerate(parameters):
+            params = dict(row_params)
+            params.update(self._input_vars)
+            self.rowcount = 0
+            try:
+                self.connection._dispatch(self, statement, params, pos)
+            except oracledb.IntegrityError as e:
+                if not batcherrors:
+                    raise
+                error = e.args[0]
+                self._batch_errors.append(FakeError(error.code, error.message, pos))
+                continue
+            total += self.rowcount
+        self.rowcount = total
+        self._set_result(None)
+
+    def getbatcherrors(self) -> List[FakeError]:
+        return self._batch_errors
+
+    def _wrap(self, rows: List[tuple]) -> List[Any]:
+        factory = self.rowfactory
+        return [factory(*row) for row in rows] if factory else rows
+
+    def fetchone(self) -> Any:
+        if self._pos >= len(self._rows):
+            return None
+        row = self._rows[self._pos]
+        self._pos += 1
+        return self.rowfactory(*row) if self.rowfactory else row
+
+    def fetchmany(self, size: Optional[int] = None) -> List[Any]:
+        size = size or self.arraysize
+        rows = self._rows[self._pos:self._pos + size]
+        self._pos += len(rows)
+        if rows:
+            self.connection.round_trips += 1
+        return self._wrap(rows)
+
+    def fetchall(self) -> List[Any]:
+        rows = self._rows[self._pos:]
+        self._pos = len(self._rows)
+        self.connection.round_trips += len(rows) // self.arraysize
+        return self._wrap(rows)
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+class FakeConnection:
+    def __init__(self, dataset: Dataset):
+        self.dataset = dataset
+        self.round_trips = 0
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self) -> FakeCursor:
+        return FakeCursor(self)
+
+    def begin(self) -> None:
+        pass
+
+    def commit(self) -> None:
+        self.round_trips += 1
+        self.commits += 1
+
+    def rollback(self) -> None:
+        # O fake não desfaz escritas; os benchmarks não dependem disso
+        self.round_trips += 1
+        self.rollbacks += 1
+
+    def close(self) -> None:
+        pass
+
+    # -------------------------------------------------------------- SQL
+
+    def _dispatch(self, cursor: FakeCursor, statement: str, params: Dict[str, Any], pos: int):
+        sql = " ".join(statement.split()).upper()
+        ds = self.dataset
+
+        if sql.startswith("INSERT INTO TB_PATHMED_TELECONSULTA"):
+            return self._insert_consulta(cursor, params, pos)
+        if sql.startswith("UPDATE TB_PATHMED_TELECONSULTA"):
+            return self._update_status(cursor, params, pos)
+        if sql.startswith("INSERT INTO TB_PATHMED_PACIENTE"):
+            return self._insert_paciente(cursor, params, pos)
+        if sql.startswith("INSERT INTO TB_PATHMED_CONTATO_PACIENTE"):
+            return self._insert_contato(cursor, params)
+        if sql.startswith("INSERT INTO TB_PATHMED_LOGIN_PACIENTE"):
+            ds.logins[params["user"]] = (params["pass"], params["id_pac"])
+            cursor.rowcount = 1
+            return None
+        if sql.startswith("DELETE FROM TB_PATHMED_CONTATO_PACIENTE"):
+            row = ds.pacientes[params["id_pac"]]
+            if row is not None:
+                ds.emails.pop(row[6], None)
+                row[6] = row[7] = None
+            return None
+        if sql.startswith("DELETE FROM TB_PATHMED_PACIENTE"):
+            row = ds.pacientes[params["id_pac"]]
+            if row is not None:
+                ds.cpfs.pop(row[2], None)
+                ds.pacientes[params["id_pac"]] = None
+            return None
+        if sql.startswith("UPDATE TB_PATHMED_PACIENTE"):
+            row = ds.pacientes[params["id"]] if ds.paciente_existe(params["id"]) else None
+            if row is not None:
+                row[3] = params["nome"]
+                cursor.rowcount = 1
+            return None
+        if sql.startswith("UPDATE TB_PATHMED_CONTATO_PACIENTE"):
+            row = ds.pacientes[params["id"]] if ds.paciente_existe(params["id"]) else None
+            if row is not None:
+                if "email" in params:
+                    row[6] = params["email"]
+                if "tel" in params:
+                    row[7] = params["tel"]
+                cursor.rowcount = 1
+            return None
+
+        if "FROM TB_PATHMED_TELECONSULTA C" in sql and "JOIN TB_PATHMED_PACIENTE" in sql:
+            return self._consultas_do_paciente(params)
+        if "FROM TB_PATHMED_TELECONSULTA TC" in sql:
+            return self._horarios_ocupados(params)
+        if "FROM TB_PATHMED_TELECONSULTA" in sql and "ID_STATUS IN (1, 2)" in sql:
+            return self._agenda_ativa(params)
+        if "FROM TB_PATHMED_TELECONSULTA" in sql:
+            return self._consultas(params)
+        if "FROM TB_PATHMED_PACIENTE P" in sql:
+            return self._pacientes(params)
+        if "FROM TB_PATHMED_PROFISSIONAL_SAUDE PS" in sql:
+            return self._profissionais_da_especialidade(params, "NOT EXISTS" in sql)
+        if "FROM TB_PATHMED_PROFISSIONAL_SAUDE" in sql:
+            rows = [tuple(p) for p in ds.profissionais.values()]
+            if "ORDER BY NOME_PROFISSIONAL_SAUDE" in sql:
+                rows.sort(key=lambda p: p[2])
+            return (("ID_PROFISSIONAL", "ID_ESPECIALIDADE", "NOME_PROFISSIONAL_SAUDE", "EMAIL_CORPORATIVO_PROFISSIONAL"), rows)
+        if "FROM TB_PATHMED_ESPECIALIDADE WHERE" in sql:
+            nome = ds.especialidades.get(params["id_especialidade"])
+            return (("DESCRICAO_ESPECIALIDADE",), [(nome,)] if nome else [])
+        if "FROM TB_PATHMED_ESPECIALIDADE" in sql:
+            return (("ID_ESPECIALIDADE", "DESCRICAO_ESPECIALIDADE"), sorted(ds.especialidades.items()))
+        if "FROM TB_PATHMED_STATUS_CONSULTA" in sql:
+            return (("ID_STATUS", "DESCRICAO_STATUS"), sorted(ds.status.items()))
+        if "FROM TB_PATHMED_LOGIN_PACIENTE" in sql or "FROM TB_PATHMED_LOGIN_COLABORADOR" in sql:
+            return self._login(sql, params)
+
+        raise NotImplementedError(f"SQL não suportado pelo fake: {sql[:120]}")
+
+    @staticmethod
+    def _out(params: Dict[str, Any], name: str, value: Any, pos: int) -> None:
+        var = params.get(name)
+        if isinstance(var, FakeVar):
+            var.setvalue(pos, [value])
+
+    def _insert_consulta(self, cursor: FakeCursor, params: Dict[str, Any], pos: int):
+        ds = self.dataset
+        if not ds.paciente_existe(params["id_pac"]):
+            raise _parent_not_found("FK_TELECONSULTA_PACIENTE")
+        if params["id_prof"] not in ds.profissionais:
+            raise _parent_not_found("FK_TELECONSULTA_PROFISSIONAL")
+        if (params["id_prof"], params["dt_hora"]) in ds.agenda:
+            raise _unique("UK_TELECONSULTA_PROF_HORARIO")
+        row = ds._add_consulta(params["id_pac"], params["id_prof"], params["id_status"], params["dt_hora"])
+        for name, value in zip(("out_id", "out_pac", "out_prof", "out_status", "out_dt_hora"), row):
+            self._out(params, name, value, pos)
+        self._out(params, "id", row[0], pos)
+        cursor.rowcount = 1
+        return None
+
+    def _update_status(self, cursor: FakeCursor, params: Dict[str, Any], pos: int):
+        ds = self.dataset
+        id_consulta = params["id"]
+        if 0 < id_consulta < len(ds.consultas) and ds.consultas[id_consulta] is not None:
+            row = ds.consultas[id_consulta]
+            row[3] = params["status"]
+            self._out(params, "id_prof", row[2], pos)
+            self._out(params, "dt_hora", row[4], pos)
+            cursor.rowcount = 1
+        return None
+
+    def _insert_paciente(self, cursor: FakeCursor, params: Dict[str, Any], pos: int):
+        ds = self.dataset
+        if params["cpf"] in ds.cpfs:
+            raise _unique("TB_PACIENTE_CPF_PAC_UC")
+        id_paciente = len(ds.pacientes)
+        ds._add_paciente([
+            id_paciente, params["rghc"], params["cpf"], params["nome"],
+            datetime.combine(params["dt_nasc"], time.min), params["sangue"], None, None,
+        ])
+        self._out(params, "id", id_paciente, pos)
+        cursor.rowcount = 1
+        return None
+
+    def _insert_contato(self, cursor: FakeCursor, params: Dict[str, Any]):
+        ds = self.dataset
+        if params["email"] in ds.emails:
+            raise _unique("TB_CTT_PACIENTE_EMAIL_PA_UC")
+        row = ds.pacientes[params["id_pac"]]
+        row[6], row[7] = params["email"], params["tel"]
+        ds.emails[params["email"]] = row[0]
+        cursor.rowcount = 1
+        return None
+
+    def _consultas(self, params: Dict[str, Any]):
+        ds = self.dataset
+        after_id = params.get("after_id", 0)
+        limit = params.get("limit")
+        id_prof = params.get("id_prof")
+        id_status = params.get("id_status")
+        inicio = params.get("inicio")
+        fim = params.get("fim")
+        rows = []
+        for row in ds.consultas[after_id + 1:]:
+            if row is None:
+                continue
+            if id_prof is not None and row[2] != id_prof:
+                continue
+            if id_status is not None and row[3] != id_status:
+                continue
+            if inicio is not None and row[4] < inicio:
+                continue
+            if fim is not None and row[4] >= fim:
+                continue
+            rows.append(tuple(row))
+            if limit is not None and len(rows) >= limit:
+                break
+        return COLS_CONSULTA, rows
+
+    def _agenda_ativa(self, params: Dict[str, Any]):
+        inicio, fim = params["inicio"], params["fim"]
+        rows = [
+            (row[0], row[2], row[4]) for row in self.dataset.consultas[1:]
+            if row is not None and row[3] in (1, 2) and inicio <= row[4] < fim
+        ]
+        return ("ID_CONSULTA", "ID_PROFISSIONAL", "DATA_HORA_CONSULTA"), rows
+
+    def _consultas_do_paciente(self, params: Dict[str, Any]):
+        ds = self.dataset
+        id_paciente = params["paciente_id"]
+        paciente = ds.pacientes[id_paciente] if ds.paciente_existe(id_paciente) else None
+        if paciente is None:
+            return COLS_CONSULTA_DETALHADA, []
+        rows = []
+        for id_consulta in ds.consultas_por_paciente.get(id_paciente, []):
+            c = ds.consultas[id_consulta]
+            prof = ds.profissionais[c[2]]
+            rows.append(tuple(c) + (paciente[3], prof[2], ds.especialidades[prof[1]], ds.status[c[3]]))
+        rows.sort(key=lambda r: r[4], reverse=True)
+        return COLS_CONSULTA_DETALHADA, rows
+
+    def _horarios_ocupados(self, params: Dict[str, Any]):
+        ds = self.dataset
+        id_especialidade = params["id_especialidade"]
+        inicio, fim = params["inicio"], params["fim"]
+        rows = []
+        for prof in ds.profissionais.values():
+            if prof[1] != id_especialidade:
+                continue
+            dia = inicio
+            while dia < fim:
+                for horario in HORARIOS_DO_DIA:
+                    data_hora = datetime.combine(dia.date(), horario)
+                    id_consulta = ds.agenda.get((prof[0], data_hora))
+                    if id_consulta is not None and ds.consultas[id_consulta][3] in (1, 2):
+                        rows.append((prof[0], data_hora))
+                dia += timedelta(days=1)
+        return ("ID_PROFISSIONAL", "DATA_HORA_CONSULTA"), rows
+
+    def _profissionais_da_especialidade(self, params: Dict[str, Any], livres_no_horario: bool):
+        ds = self.dataset
+        id_especialidade = params["id_especialidade"]
+        descricao = ds.especialidades.get(id_especialidade)
+        rows = []
+        for prof in ds.profissionais.values():
+            if prof[1] != id_especialidade or descricao is None:
+                continue
+            if livres_no_horario:
+                id_consulta = ds.agenda.get((prof[0], params["data_hora"]))
+                if id_consulta is not None and ds.consultas[id_consulta][3] in (1, 2):
+                    continue
+            rows.append((prof[0], prof[2], descricao))
+        rows.sort(key=lambda r: r[1])
+        return ("ID_PROFISSIONAL", "NOME_PROFISSIONAL_SAUDE", "DESCRICAO_ESPECIALIDADE"), rows
+
+    def _pacientes(self, params: Dict[str, Any]):
+        ds = self.dataset
+        if "id" in params:
+            row = ds.pacientes[params["id"]] if ds.paciente_existe(params["id"]) else None
+            # SQL_GET_BY_ID usa JOIN (não LEFT JOIN) com o contato
+            return COLS_PACIENTE, [tuple(row)] if row is not None and row[6] is not None else []
+        after_id = params.get("after_id", 0)
+        limit = params.get("limit")
+        rows = []
+        for row in ds.pacientes[after_id + 1:]:
+            if row is None:
+                continue
+            rows.append(tuple(row))
+            if limit is not None and len(rows) >= limit:
+                break
+        return COLS_PACIENTE, rows
+
+    def _login(self, sql: str, params: Dict[str, Any]):
+        ds = self.dataset
+        username = params["username"]
+        rows = []
+        if "FROM TB_PATHMED_LOGIN_PACIENTE" in sql and username in ds.logins:
+            senha, id_paciente = ds.logins[username]
+            rows.append((senha, id_paciente, "paciente", 1))
+        if "FROM TB_PATHMED_LOGIN_COLABORADOR" in sql and username in ds.colaboradores:
+            senha, id_colaborador = ds.colaboradores[username]
+            rows.append((senha, id_colaborador, "colaborador", 2))
+        return ("SENHA_LOGIN", "ID_USUARIO", "TIPO_USUARIO", "PRIORIDADE"), rows
+
+class FakePool:
+    """Pool com a interface usada por app.db.database (acquire/release e atributos de ocupação)."""
+
+    def __init__(self, dataset: Dataset, min: int = 1, max: int = 10, increment: int = 1):
+        self.dataset = dataset
+        self.min = min
+        self.max = max
+        self.increment = increment
+        self.busy = 0
+        self.opened = 0
+        self.wait_timeout = 0
+        self.stmtcachesize = 0
+        self.ping_interval = 0
+        self._free: List[FakeConnection] = []
+
+    def acquire(self) -> FakeConnection:
+        self.busy += 1
+        if self._free:
+            return self._free.pop()
+        self.opened += 1
+        return FakeConnection(self.dataset)
+
+    def release(self, conn: FakeConnection) -> None:
+        self.busy -= 1
+        self._free.append(conn)
+
+    def close(self, force: bool = False) -> None:
+        self._free.clear()
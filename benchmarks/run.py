@@ -0,0 +1,544 @@
+"""
+Micro-benchmarks dos CRUDs, dos schemas, da montagem de disponibilidade e dos
+endpoints, usando o banco em memória de benchmarks/fake_oracledb.py.
+
+Uso (na raiz do repositório):
+
+    python -m benchmarks.run                                  # grava benchmarks/baseline.json
+    python -m benchmarks.run --output /tmp/atual.json --compare benchmarks/baseline.json
+    python -m benchmarks.run --consultas 100000 --filter disponibilidade
+
+Os tempos são por chamada, em milissegundos. O número de chamadas por amostra é
+calibrado para que cada amostra dure pelo menos --min-time segundos.
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import time as _time
+from datetime import date, datetime, time, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+# Settings exige estas variáveis; os benchmarks nunca abrem conexão real
+for _name, _value in (("SECRET_KEY", "benchmark"), ("DB_USER", "benchmark"),
+                      ("DB_PASSWORD", "benchmark"), ("DB_DSN", "localhost:1521/BENCHMARK")):
+    os.environ.setdefault(_name, _value)
+
+from benchmarks.fake_oracledb import Dataset, FakeConnection, FakePool, COLS_CONSULTA, COLS_PACIENTE
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+class Context:
+    """Dados e objetos compartilhados pelos casos, criados uma vez por execução."""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.dataset = Dataset(
+            pacientes=args.pacientes,
+            profissionais=args.profissionais,
+            especialidades=args.especialidades,
+            consultas=args.consultas,
+            dias=args.dias,
+        )
+        self.conn = FakeConnection(self.dataset)
+        self.dia = self.dataset.inicio + timedelta(days=1)
+        self._client = None
+        # Horários livres para os casos que agendam (bem depois da janela do dataset)
+        self._slots = itertools.count()
+
+    def proximo_horario(self) -> datetime:
+        n = next(self._slots)
+        dia = self.dataset.inicio + timedelta(days=self.args.dias + 1 + n // 20)
+        return datetime.combine(dia, time(8 + (n % 20) // 2, 30 * (n % 2)))
+
+    @property
+    def client(self):
+        if self._client is None:
+            from fastapi.testclient import TestClient
+            from app.db import database
+            from app.main import app
+            from app.security.core import create_access_token
+            # Pools de escrita e de leitura separados, como com DB_READ_DSN configurado
+            database.db_pool = FakePool(self.dataset)
+            database.db_read_pool = FakePool(self.dataset)
+            token = create_access_token({"sub": "admin@pathmed.com", "role": "colaborador", "id": 1})
+            # Sem o lifespan: os pools fake já estão no lugar e nada tenta conectar
+            self._client = TestClient(app, headers={"Authorization": f"Bearer {token}"})
+        return self._client
+
+CASES: List[Dict[str, Any]] = []
+
+def case(name: str, group: str):
+    """Registra um caso. A função recebe o Context e devolve o callable a ser medido."""
+    def decorator(factory: Callable[[Context], Callable[[], Any]]):
+        CASES.append({"name": name, "group": group, "factory": factory})
+        return factory
+    return decorator
+
+# ------------------------------------------------------------------ linhas
+
+@case("rows.db_row_to_dict[pagina]", "rows")
+def _(ctx: Context):
+    from app.crud.crud_paciente import db_row_to_dict
+    cursor = ctx.conn.cursor()
+
+    def run():
+        cursor.execute("SELECT * FROM TB_PATHMED_TELECONSULTA WHERE ID_CONSULTA > :after_id", after_id=0)
+        return [db_row_to_dict(cursor, row) for row in cursor.fetchall()]
+    return run
+
+@case("rows.use_records[pagina]", "rows")
+def _(ctx: Context):
+    from app.db.rows import use_records
+    cursor = ctx.conn.cursor()
+
+    def run():
+        cursor.execute("SELECT * FROM TB_PATHMED_TELECONSULTA WHERE ID_CONSULTA > :after_id", after_id=0)
+        use_records(cursor)
+        return cursor.fetchall()
+    return run
+
+# --------------------------------------------------------------- respostas
+
+def _consultas_em_registros(ctx: Context):
+    from app.db.rows import use_records
+    cursor = ctx.conn.cursor()
+    cursor.execute("SELECT * FROM TB_PATHMED_TELECONSULTA WHERE ID_CONSULTA > :after_id", after_id=0)
+    use_records(cursor)
+    return cursor.fetchall()
+
+@case("respostas.render[consultas todos, json]", "respostas")
+def _(ctx: Context):
+    from app.core import responses
+    registros = _consultas_em_registros(ctx)
+
+    def run():
+        orjson, responses.orjson = responses.orjson, None
+        try:
+            return responses.dumps(registros)
+        finally:
+            responses.orjson = orjson
+    return run
+
+@case("respostas.render[consultas todos, orjson]", "respostas")
+def _(ctx: Context):
+    from app.core import responses
+    registros = _consultas_em_registros(ctx)
+    return lambda: responses.dumps(registros)
+
+@case("respostas.render[consultas todos, response_model]", "respostas")
+def _(ctx: Context):
+    # O que o FastAPI faria sem RecordsJSONResponse: validar e serializar pelo response_model
+    from typing import List
+    from pydantic import TypeAdapter
+    from app.schemas.consulta import ConsultaRead
+    adapter = TypeAdapter(List[ConsultaRead])
+    linhas = [r._asdict() for r in _consultas_em_registros(ctx)]
+    return lambda: adapter.dump_json(adapter.validate_python(linhas))
+
+# ----------------------------------------------------------------- schemas
+
+@case("schemas.PacienteRead.validate[1000]", "schemas")
+def _(ctx: Context):
+    from app.schemas.paciente import PacienteRead
+    nomes = [c.lower() for c in COLS_PACIENTE]
+    linhas = [dict(zip(nomes, row)) for row in ctx.dataset.pacientes[1:1001] if row is not None]
+    return lambda: [PacienteRead.model_validate(linha) for linha in linhas]
+
+@case("schemas.ConsultaRead.validate[1000]", "schemas")
+def _(ctx: Context):
+    from app.schemas.consulta import ConsultaRead
+    nomes = [c.lower() for c in COLS_CONSULTA]
+    linhas = [dict(zip(nomes, row)) for row in ctx.dataset.consultas[1:1001] if row is not None]
+    return lambda: [ConsultaRead.model_validate(linha) for linha in linhas]
+
+# ------------------------------------------------------------ crud_paciente
+
+@case("crud_paciente.get_page[50]", "crud_paciente")
+def _(ctx: Context):
+    from app.crud import crud_paciente
+    return lambda: crud_paciente.get_page(ctx.conn, 0, 51)
+
+@case("crud_paciente.get_page[todos]", "crud_paciente")
+def _(ctx: Context):
+    from app.crud import crud_paciente
+    return lambda: crud_paciente.get_page(ctx.conn, 0, None)
+
+@case("crud_paciente.get_by_id", "crud_paciente")
+def _(ctx: Context):
+    from app.crud import crud_paciente
+    return lambda: crud_paciente.get_by_id(ctx.conn, 1)
+
+# ------------------------------------------------------------ crud_consulta
+
+@case("crud_consulta.get_page[50]", "crud_consulta")
+def _(ctx: Context):
+    from app.crud import crud_consulta
+    return lambda: crud_consulta.get_page(ctx.conn, 0, 51)
+
+@case("crud_consulta.get_page[todos]", "crud_consulta")
+def _(ctx: Context):
+    from app.crud import crud_consulta
+    return lambda: crud_consulta.get_page(ctx.conn, 0, None)
+
+@case("crud_consulta.get_page[filtro profissional+datas]", "crud_consulta")
+def _(ctx: Context):
+    from app.crud import crud_consulta
+    inicio = ctx.dataset.inicio
+    return lambda: crud_consulta.get_page(
+        ctx.conn, 0, 51, id_profissional=1, data_inicio=inicio, data_fim=inicio + timedelta(days=7)
+    )
+
+@case("crud_consulta.get_by_paciente_id", "crud_consulta")
+def _(ctx: Context):
+    from app.crud import crud_consulta
+    return lambda: crud_consulta.get_by_paciente_id(ctx.conn, 1)
+
+# -------------------------------------------------------------------- login
+
+@case("crud_user.get_user_from_db[colaborador]", "login")
+def _(ctx: Context):
+    from app.crud import crud_user
+    return lambda: crud_user.get_user_from_db(ctx.conn, "admin@pathmed.com")
+
+@case("crud_user.get_user_cached[quente]", "login")
+def _(ctx: Context):
+    from app.crud import crud_user
+    crud_user.get_user_cached(ctx.conn, "admin@pathmed.com")
+    return lambda: crud_user.get_user_cached(ctx.conn, "admin@pathmed.com")
+
+@case("crud_user.get_user_cached[inexistente, quente]", "login")
+def _(ctx: Context):
+    from app.crud import crud_user
+    crud_user.get_user_cached(ctx.conn, "ninguem@pathmed.com")
+    return lambda: crud_user.get_user_cached(ctx.conn, "ninguem@pathmed.com")
+
+@case("security.decode_access_token[sem cache]", "login")
+def _(ctx: Context):
+    from app.security.core import create_access_token, decode_access_token, token_cache
+    token = create_access_token({"sub": "admin@pathmed.com", "role": "colaborador", "id": 1})
+
+    def run():
+        token_cache.clear()
+        return decode_access_token(token)
+    return run
+
+@case("security.decode_access_token[quente]", "login")
+def _(ctx: Context):
+    from app.security.core import create_access_token, decode_access_token
+    token = create_access_token({"sub": "admin@pathmed.com", "role": "colaborador", "id": 1})
+    decode_access_token(token)
+    return lambda: decode_access_token(token)
+
+# ---------------------------------------------------------- disponibilidade
+
+def _sem_cache_de_referencia():
+    from app.crud.reference_cache import reference_cache
+    reference_cache._snapshot = None
+
+def _com_cache_de_referencia(ctx: Context):
+    from app.crud.reference_cache import reference_cache
+    reference_cache.load(ctx.conn)
+
+def _indice_de_agenda(ctx: Context, carregado: bool):
+    from app.crud.schedule_index import schedule_index
+    if carregado:
+        schedule_index.load(ctx.conn)
+    else:
+        schedule_index._janela = None
+
+@case("disponibilidade.dia[sem cache de referência]", "disponibilidade")
+def _(ctx: Context):
+    from app.crud.crud_disponibilidade import crud_disponibilidade
+    _sem_cache_de_referencia()
+    _indice_de_agenda(ctx, False)
+    return lambda: crud_disponibilidade.get_disponibilidade_do_dia(ctx.conn, ctx.dia, 1)
+
+@case("disponibilidade.dia[com cache de referência]", "disponibilidade")
+def _(ctx: Context):
+    from app.crud.crud_disponibilidade import crud_disponibilidade
+    _com_cache_de_referencia(ctx)
+    _indice_de_agenda(ctx, False)
+    return lambda: crud_disponibilidade.get_disponibilidade_do_dia(ctx.conn, ctx.dia, 1)
+
+@case("disponibilidade.dia[índice de agenda]", "disponibilidade")
+def _(ctx: Context):
+    from app.crud.crud_disponibilidade import crud_disponibilidade
+    _com_cache_de_referencia(ctx)
+    _indice_de_agenda(ctx, True)
+    return lambda: crud_disponibilidade.get_disponibilidade_do_dia(ctx.conn, ctx.dia, 1)
+
+@case("schedule_index.load[janela]", "disponibilidade")
+def _(ctx: Context):
+    from app.crud.schedule_index import schedule_index
+    return lambda: schedule_index.load(ctx.conn)
+
+@case("disponibilidade.dia[cache TTL quente]", "disponibilidade")
+def _(ctx: Context):
+    from app.crud.crud_disponibilidade import crud_disponibilidade
+    _com_cache_de_referencia(ctx)
+    crud_disponibilidade.get_disponibilidade_do_dia_cached(ctx.conn, ctx.dia, 1)
+    return lambda: crud_disponibilidade.get_disponibilidade_do_dia_cached(ctx.conn, ctx.dia, 1)
+
+@case("disponibilidade.intervalo[7 dias]", "disponibilidade")
+def _(ctx: Context):
+    from app.crud.crud_disponibilidade import crud_disponibilidade
+    _com_cache_de_referencia(ctx)
+    _indice_de_agenda(ctx, False)
+    fim = ctx.dia + timedelta(days=6)
+    return lambda: list(crud_disponibilidade.get_disponibilidade_intervalo(ctx.conn, ctx.dia, fim, 1))
+
+@case("disponibilidade.intervalo[7 dias, índice de agenda]", "disponibilidade")
+def _(ctx: Context):
+    from app.crud.crud_disponibilidade import crud_disponibilidade
+    _com_cache_de_referencia(ctx)
+    _indice_de_agenda(ctx, True)
+    fim = ctx.dia + timedelta(days=6)
+    return lambda: list(crud_disponibilidade.get_disponibilidade_intervalo(ctx.conn, ctx.dia, fim, 1))
+
+@case("disponibilidade.proximos[20]", "disponibilidade")
+def _(ctx: Context):
+    from app.crud.crud_disponibilidade import crud_disponibilidade
+    _com_cache_de_referencia(ctx)
+    _indice_de_agenda(ctx, False)
+    inicio = datetime.combine(ctx.dia, time(8, 0))
+    return lambda: crud_disponibilidade.get_proximos_horarios(ctx.conn, 1, inicio, 20)
+
+@case("disponibilidade.proximos[20, índice de agenda]", "disponibilidade")
+def _(ctx: Context):
+    from app.crud.crud_disponibilidade import crud_disponibilidade
+    _com_cache_de_referencia(ctx)
+    _indice_de_agenda(ctx, True)
+    inicio = datetime.combine(ctx.dia, time(8, 0))
+    return lambda: crud_disponibilidade.get_proximos_horarios(ctx.conn, 1, inicio, 20)
+
+# ---------------------------------------------------------------- endpoints
+
+def _get(ctx: Context, url: str) -> Callable[[], Any]:
+    client = ctx.client
+
+    def run():
+        response = client.get(url)
+        assert response.status_code == 200, (url, response.status_code, response.text[:200])
+        return response.content
+    return run
+
+@case("endpoint.GET /pacientes[50]", "endpoints")
+def _(ctx: Context):
+    return _get(ctx, "/api/v1/pacientes?limit=50")
+
+@case("endpoint.GET /pacientes[todos]", "endpoints")
+def _(ctx: Context):
+    return _get(ctx, "/api/v1/pacientes?todos=true")
+
+@case("endpoint.GET /consultas[50]", "endpoints")
+def _(ctx: Context):
+    return _get(ctx, "/api/v1/consultas?limit=50")
+
+@case("endpoint.GET /consultas[todos]", "endpoints")
+def _(ctx: Context):
+    return _get(ctx, "/api/v1/consultas?todos=true")
+
+@case("endpoint.GET /consultas/paciente/{id}", "endpoints")
+def _(ctx: Context):
+    return _get(ctx, "/api/v1/consultas/paciente/1")
+
+@case("endpoint.GET /especialidades/disponibilidade", "endpoints")
+def _(ctx: Context):
+    from app.crud.crud_disponibilidade import crud_disponibilidade
+    _com_cache_de_referencia(ctx)
+    run = _get(ctx, f"/api/v1/especialidades/disponibilidade?especialidade=1&data={ctx.dia.isoformat()}")
+
+    def sem_cache_ttl():
+        crud_disponibilidade.cache.clear()
+        return run()
+    return sem_cache_ttl
+
+# ---------------------------------------------------------------- escritas
+# Por último: as escritas aumentam o dataset e alterariam os casos de leitura
+
+@case("crud_paciente.create_many[100]", "escritas")
+def _(ctx: Context):
+    from app.crud import crud_paciente
+    from app.schemas.paciente import PacienteCreate
+    contador = itertools.count(10_000_000)
+
+    def run():
+        lote = []
+        for _ in range(100):
+            n = next(contador)
+            lote.append(PacienteCreate(
+                identificador_rghc=f"B{n}", cpf_paciente=f"{n:011d}", nome_paciente="Benchmark",
+                data_nascimento=date(1990, 1, 1), tipo_sanguineo="O+",
+                email_paciente=f"bench{n}@email.com", telefone_paciente="11999999999", password="x",
+            ))
+        return crud_paciente.create_many(ctx.conn, lote)
+    return run
+
+@case("crud_consulta.create", "escritas")
+def _(ctx: Context):
+    from app.crud import crud_consulta
+    from app.schemas.consulta import ConsultaCreate
+    return lambda: crud_consulta.create(ctx.conn, ConsultaCreate(
+        id_paciente=2, id_profissional=1, data_hora_consulta=ctx.proximo_horario()
+    ))
+
+@case("crud_consulta.create_many[100]", "escritas")
+def _(ctx: Context):
+    from app.crud import crud_consulta
+    from app.schemas.consulta import ConsultaCreate
+    return lambda: crud_consulta.create_many(ctx.conn, [
+        ConsultaCreate(id_paciente=2, id_profissional=2, data_hora_consulta=ctx.proximo_horario())
+        for _ in range(100)
+    ])
+
+@case("endpoint.POST /consultas", "escritas")
+def _(ctx: Context):
+    client = ctx.client
+
+    def run():
+        response = client.post("/api/v1/consultas/", json={
+            "id_paciente": 2, "id_profissional": 3, "data_hora_consulta": ctx.proximo_horario().isoformat()
+        })
+        assert response.status_code == 201, response.text[:200]
+        return response.content
+    return run
+
+@case("endpoint.POST /consultas[retry com Idempotency-Key]", "escritas")
+def _(ctx: Context):
+    client = ctx.client
+    headers = {"Idempotency-Key": "bench-retry"}
+    body = {"id_paciente": 2, "id_profissional": 3, "data_hora_consulta": ctx.proximo_horario().isoformat()}
+    assert client.post("/api/v1/consultas/", json=body, headers=headers).status_code == 201
+
+    def run():
+        response = client.post("/api/v1/consultas/", json=body, headers=headers)
+        assert response.headers.get("idempotent-replayed") == "true", response.text[:200]
+        return response.content
+    return run
+
+# --------------------------------------------------------------------- pool
+
+def _acquire_release(ctx: Context, admissao: bool):
+    from app.core.config import settings
+    from app.db import database
+    ctx.client  # instala os pools fake
+
+    def run():
+        anterior = settings.DB_ADMISSION_ENABLED
+        settings.DB_ADMISSION_ENABLED = admissao
+        try:
+            with database.acquire_connection() as conn:
+                return conn
+        finally:
+            settings.DB_ADMISSION_ENABLED = anterior
+    return run
+
+@case("database.acquire_connection[sem admissão]", "pool")
+def _(ctx: Context):
+    return _acquire_release(ctx, admissao=False)
+
+@case("database.acquire_connection[com admissão]", "pool")
+def _(ctx: Context):
+    return _acquire_release(ctx, admissao=True)
+
+# -------------------------------------------------------------------- medição
+
+def measure(fn: Callable[[], Any], repeat: int, min_time: float) -> Dict[str, Any]:
+    """Calibra o número de chamadas por amostra e devolve estatísticas por chamada (ms)."""
+    loops = 1
+    while True:
+        inicio = _time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = _time.perf_counter() - inicio
+        if elapsed >= min_time or loops >= 1_000_000:
+            break
+        loops *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    amostras = []
+    for _ in range(repeat):
+        inicio = _time.perf_counter()
+        for _ in range(loops):
+            fn()
+        amostras.append((_time.perf_counter() - inicio) / loops * 1000)
+
+    return {
+        "loops": loops,
+        "repeat": repeat,
+        "min_ms": round(min(amostras), 6),
+        "median_ms": round(statistics.median(amostras), 6),
+        "mean_ms": round(statistics.fmean(amostras), 6),
+        "stdev_ms": round(statistics.stdev(amostras), 6) if len(amostras) > 1 else 0.0,
+    }
+
+def compare(atual: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Imprime a variação da mediana de cada caso em relação ao baseline."""
+    print(f"\n{'caso':58} {'baseline':>12} {'atual':>12} {'variação':>9}")
+    for name, result in atual["results"].items():
+        anterior = baseline.get("results", {}).get(name)
+        if anterior is None:
+            print(f"{name:58} {'-':>12} {result['median_ms']:>10.3f}ms {'novo':>9}")
+            continue
+        delta = (result["median_ms"] - anterior["median_ms"]) / anterior["median_ms"] * 100 if anterior["median_ms"] else 0.0
+        print(f"{name:58} {anterior['median_ms']:>10.3f}ms {result['median_ms']:>10.3f}ms {delta:>+8.1f}%")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks da PathMed API com Oracle em memória")
+    parser.add_argument("--pacientes", type=int, default=2000)
+    parser.add_argument("--profissionais", type=int, default=40)
+    parser.add_argument("--especialidades", type=int, default=8)
+    parser.add_argument("--consultas", type=int, default=20000)
+    parser.add_argument("--dias", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=5, help="Amostras por caso")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Duração mínima de cada amostra (s)")
+    parser.add_argument("--filter", default=None, help="Só os casos cujo nome contém este texto")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Arquivo JSON de resultados")
+    parser.add_argument("--compare", default=None, help="Baseline JSON para comparar")
+    args = parser.parse_args(argv)
+
+    ctx = Context(args)
+    results: Dict[str, Any] = {}
+    for item in CASES:
+        if args.filter and args.filter not in item["name"]:
+            continue
+        # Os CRUDs registram cada operação com print; isso não entra na medição
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn = item["factory"](ctx)
+            result = measure(fn, args.repeat, args.min_time)
+        result["group"] = item["group"]
+        results[item["name"]] = result
+        print(f"{item['name']:58} {result['median_ms']:>10.3f}ms  (±{result['stdev_ms']:.3f}, {result['loops']} loops)")
+
+    saida = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "dataset": {
+                "pacientes": args.pacientes, "profissionais": args.profissionais,
+                "especialidades": args.especialidades, "consultas": args.consultas, "dias": args.dias,
+            },
+            "repeat": args.repeat,
+            "min_time": args.min_time,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(saida, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    print(f"\n📄 Resultados gravados em {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(saida, json.load(f))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
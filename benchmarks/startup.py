@@ -0,0 +1,158 @@
+"""
+Benchmark de inicialização: tempo de import do pacote `app`, construção de
+Settings e tempo até o /ready ficar verde, cada amostra em um processo novo.
+Usa os pools de benchmarks/fake_oracledb.py, então mede o custo da aplicação
+(import, aquecimento, carga dos dados de referência e do índice de agenda), não
+o tempo de conexão com o Oracle.
+
+Uso (na raiz do repositório, com as variáveis de ambiente da aplicação):
+
+    python -m benchmarks.startup                                   # grava benchmarks/startup.json
+    python -m benchmarks.startup --output /tmp/atual.json --compare benchmarks/startup.json
+    python -m benchmarks.startup --importtime 30                   # mostra os 30 imports mais caros
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time as _time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), "startup.json")
+
+def _filho(args: argparse.Namespace) -> None:
+    """Uma inicialização completa; imprime as medidas em JSON na última linha."""
+    inicio = _time.perf_counter()
+    with contextlib.redirect_stdout(sys.stderr):
+        import app.main
+        importado = _time.perf_counter()
+
+        from app.core.config import Settings
+        antes_settings = _time.perf_counter()
+        Settings()
+        settings_ms = (_time.perf_counter() - antes_settings) * 1000
+
+        from fastapi.testclient import TestClient
+        from app.db import database
+        from benchmarks.fake_oracledb import Dataset, FakePool
+        dataset = Dataset(
+            pacientes=args.pacientes, profissionais=args.profissionais,
+            especialidades=args.especialidades, consultas=args.consultas, dias=args.dias,
+        )
+        database.db_pool = FakePool(dataset)
+
+        antes_lifespan = _time.perf_counter()
+        with TestClient(app.main.app) as client:
+            while client.get("/ready").status_code != 200:
+                _time.sleep(0.0005)
+            pronto = _time.perf_counter()
+            estado = client.get("/ready").json()
+
+    print(json.dumps({
+        "import app.main": (importado - inicio) * 1000,
+        "Settings()": settings_ms,
+        "lifespan até /ready": (pronto - antes_lifespan) * 1000,
+        "processo até /ready": (pronto - inicio) * 1000,
+        **{f"etapa {nome}": segundos * 1000 for nome, segundos in estado["etapas"].items()},
+    }))
+
+def _comando_filho(args: argparse.Namespace) -> List[str]:
+    return [
+        sys.executable, "-m", "benchmarks.startup", "--filho",
+        "--pacientes", str(args.pacientes), "--profissionais", str(args.profissionais),
+        "--especialidades", str(args.especialidades), "--consultas", str(args.consultas), "--dias", str(args.dias),
+    ]
+
+def importtime(top: int) -> List[Dict[str, Any]]:
+    """Os `top` módulos com maior tempo de import acumulado (python -X importtime)."""
+    saida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True, text=True, check=True
+    ).stderr
+    modulos = []
+    for linha in saida.splitlines():
+        if not linha.startswith("import time:") or "self [us]" in linha:
+            continue
+        proprio, acumulado, nome = linha[len("import time:"):].split("|")
+        modulos.append({"modulo": nome.strip(), "self_ms": int(proprio) / 1000, "acumulado_ms": int(acumulado) / 1000})
+    modulos.sort(key=lambda m: m["acumulado_ms"], reverse=True)
+    return modulos[:top]
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de inicialização da PathMed API")
+    parser.add_argument("--pacientes", type=int, default=2000)
+    parser.add_argument("--profissionais", type=int, default=40)
+    parser.add_argument("--especialidades", type=int, default=8)
+    parser.add_argument("--consultas", type=int, default=20000)
+    parser.add_argument("--dias", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=5, help="Processos medidos")
+    parser.add_argument("--importtime", type=int, default=15, help="Quantos imports mais caros listar")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Arquivo JSON de resultados")
+    parser.add_argument("--compare", default=None, help="Baseline JSON para comparar")
+    parser.add_argument("--filho", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.filho:
+        _filho(args)
+        return 0
+
+    # Só no processo pai: benchmarks.run importa o oracledb e define as variáveis de
+    # ambiente de Settings, herdadas pelos processos medidos
+    from benchmarks.run import compare
+
+    amostras: Dict[str, List[float]] = {}
+    for _ in range(args.repeat):
+        saida = subprocess.run(_comando_filho(args), capture_output=True, text=True, check=True).stdout
+        for nome, ms in json.loads(saida.strip().splitlines()[-1]).items():
+            amostras.setdefault(nome, []).append(ms)
+
+    results: Dict[str, Any] = {}
+    for nome, valores in amostras.items():
+        results[f"startup.{nome}"] = {
+            "repeat": len(valores),
+            "min_ms": round(min(valores), 6),
+            "median_ms": round(statistics.median(valores), 6),
+            "mean_ms": round(statistics.fmean(valores), 6),
+            "stdev_ms": round(statistics.stdev(valores), 6) if len(valores) > 1 else 0.0,
+            "group": "startup",
+        }
+        resultado = results[f"startup.{nome}"]
+        print(f"{'startup.' + nome:58} {resultado['median_ms']:>10.3f}ms  (±{resultado['stdev_ms']:.3f}, {len(valores)} processos)")
+
+    modulos = importtime(args.importtime)
+    print(f"\n{'import (acumulado)':58} {'acumulado':>12} {'próprio':>10}")
+    for modulo in modulos:
+        print(f"{modulo['modulo']:58} {modulo['acumulado_ms']:>10.1f}ms {modulo['self_ms']:>8.1f}ms")
+
+    saida = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "dataset": {
+                "pacientes": args.pacientes, "profissionais": args.profissionais,
+                "especialidades": args.especialidades, "consultas": args.consultas, "dias": args.dias,
+            },
+            "repeat": args.repeat,
+        },
+        "results": results,
+        "importtime": modulos,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(saida, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    print(f"\n📄 Resultados gravados em {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(saida, json.load(f))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())